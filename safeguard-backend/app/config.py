@@ -13,10 +13,14 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./database.db"
+    SQLITE_PROFILE: str = "performance"  # see app.core.sqlite_profile.SQLITE_PROFILES
     
     # CORS
     BACKEND_CORS_ORIGINS: list = ["http://localhost:3000", "http://127.0.0.1:3000"]
     
+    # Country code assumed for phone numbers entered without one
+    DEFAULT_PHONE_COUNTRY_CODE: str = "1"
+    
     # File Upload
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
@@ -0,0 +1,31 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.sqlite_profile import apply_sqlite_profile
+
+# asyncio drivers for the sync URLs accepted in DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql"
+}
+
+def async_database_url(url: str) -> str:
+    """sqlite:///./database.db -> sqlite+aiosqlite:///./database.db; URLs naming a driver are kept"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver:
+        parsed = parsed.set(drivername=f"{parsed.drivername}+{driver}")
+    return parsed.render_as_string(hide_password=False)
+
+def create_async_db_engine(url: str, sqlite_profile: str = "default") -> AsyncEngine:
+    """Async engine for DATABASE_URL, with the same SQLite pragmas as the sync engine"""
+    parsed = make_url(async_database_url(url))
+    options = {}
+    if parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:"):
+        # aiosqlite defaults to NullPool for files: every checkout would start a
+        # connection thread and rerun the profile's pragmas
+        options["poolclass"] = AsyncAdaptedQueuePool
+    engine = create_async_engine(parsed, **options)
+    apply_sqlite_profile(engine.sync_engine, sqlite_profile)
+    return engine
@@ -0,0 +1,36 @@
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+class IdempotencyCache:
+    """Remembers responses by (user, Idempotency-Key) for a limited time"""
+
+    def __init__(self, ttl: float = 600.0, max_entries: int = 50_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, user_id: str, key: str, now: float = None) -> Optional[Any]:
+        if now is None:
+            now = time.monotonic()
+        entry = self._entries.get((user_id, key))
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at < now:
+            del self._entries[(user_id, key)]
+            return None
+        return response
+
+    def put(self, user_id: str, key: str, response: Any, now: float = None):
+        if now is None:
+            now = time.monotonic()
+        self._entries[(user_id, key)] = (now + self.ttl, response)
+        self._entries.move_to_end((user_id, key))
+
+        # Entries are in insertion order, so expired ones sit at the front
+        while self._entries:
+            oldest_key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at >= now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[oldest_key]
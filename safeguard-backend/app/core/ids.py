@@ -0,0 +1,64 @@
+import os
+import threading
+import time
+import uuid
+from typing import Optional
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+def uuid7(unix_ms: Optional[int] = None) -> uuid.UUID:
+    """RFC 9562 UUIDv7: 48-bit Unix milliseconds, a 12-bit counter, 62 random bits
+
+    Ids made by this process without `unix_ms` strictly increase: the counter
+    starts at a random value each millisecond and counts up within it, and a
+    clock step backwards keeps using the last millisecond seen.
+    """
+    global _last_ms, _counter
+    rand = int.from_bytes(os.urandom(10), "big")
+    if unix_ms is None:
+        with _lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > _last_ms:
+                # Half the counter range, so a busy millisecond rarely spills into the next
+                _last_ms, _counter = now_ms, rand >> 69
+            else:
+                _counter += 1
+                if _counter > 0xFFF:
+                    _last_ms, _counter = _last_ms + 1, 0
+            unix_ms, counter = _last_ms, _counter
+    else:
+        counter = rand >> 68
+    return uuid.UUID(int=(
+        (unix_ms & 0xFFFF_FFFF_FFFF) << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | rand & (1 << 62) - 1
+    ))
+
+def new_id() -> str:
+    return str(uuid7())
+
+class UUIDBlob(TypeDecorator):
+    """UUID stored as 16 raw bytes, read and written as the usual 36-character string
+
+    Accepts str or uuid.UUID. A string that is not a UUID (an id echoed back by
+    a client or webhook) binds as its own bytes, which never equal a stored
+    key, so lookups with it find nothing instead of raising.
+    """
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, bytes):
+            return value
+        if isinstance(value, uuid.UUID):
+            return value.bytes
+        try:
+            return uuid.UUID(value).bytes
+        except ValueError:
+            return value.encode()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return str(uuid.UUID(bytes=bytes(value)))
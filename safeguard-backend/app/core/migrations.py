@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Sequence, Set
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, insert, select
+from sqlalchemy.engine import Connection, Engine
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+# Kept out of the application metadata so create_all and the models never touch it
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False)
+)
+
+def _begin(connection: Connection):
+    # pysqlite opens a transaction only before DML, so DDL would commit statement by
+    # statement; BEGIN IMMEDIATE makes each step atomic and serializes concurrent starters
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+def applied_versions(connection: Connection) -> Set[int]:
+    if not inspect(connection).has_table(schema_migrations.name):
+        return set()
+    return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+def upgrade(engine: Engine, metadata: MetaData, migrations: Sequence[Migration]) -> List[Migration]:
+    """Bring the database up to the models and return the migrations that ran
+
+    A database with none of the model tables is created from `metadata` and
+    every migration is recorded as applied, since the models already include
+    their changes. Otherwise create_all adds only tables that are missing and
+    the pending migrations run in version order, each in its own transaction
+    with its version row, so a failure leaves the earlier ones recorded.
+    """
+    versions = [migration.version for migration in migrations]
+    if versions != sorted(set(versions)):
+        raise ValueError("Migration versions must be unique and in ascending order")
+
+    with engine.begin() as connection:
+        _begin(connection)
+        fresh = not set(metadata.tables) & set(inspect(connection).get_table_names())
+        metadata.create_all(connection)
+        schema_migrations.create(connection, checkfirst=True)
+        if fresh:
+            now = datetime.utcnow()
+            if migrations:
+                connection.execute(insert(schema_migrations), [
+                    {"version": m.version, "name": m.name, "applied_at": now} for m in migrations
+                ])
+            return []
+        applied = applied_versions(connection)
+
+    ran = []
+    for migration in migrations:
+        if migration.version in applied:
+            continue
+        with engine.begin() as connection:
+            _begin(connection)
+            # Another process may have applied it since the versions were read
+            if migration.version in applied_versions(connection):
+                continue
+            migration.upgrade(connection)
+            connection.execute(insert(schema_migrations).values(
+                version=migration.version, name=migration.name, applied_at=datetime.utcnow()
+            ))
+        ran.append(migration)
+    return ran
@@ -0,0 +1,233 @@
+import asyncio
+import json
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Route priorities (lower value = more important)
+PRIORITY_CRITICAL = 0  # never limited or shed (emergency trigger/dismiss)
+PRIORITY_NORMAL = 1    # rate limited, shed only under severe overload
+PRIORITY_LOW = 2       # rate limited, shed first under overload
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def consume(self, now: float, cost: float = 1.0) -> float:
+        """Take `cost` tokens; return 0 on success or seconds until enough tokens"""
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+
+        return (cost - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def refund(self, cost: float = 1.0):
+        """Give back tokens taken for a request that was rejected elsewhere"""
+        self.tokens = min(self.capacity, self.tokens + cost)
+
+    def is_idle(self, now: float) -> bool:
+        """Bucket would be full again, so it can be dropped and recreated lazily"""
+        return self.tokens + (now - self.updated_at) * self.rate >= self.capacity
+
+class RoutePolicy:
+    __slots__ = ("priority", "user_rate", "user_burst", "route_rate", "route_burst")
+
+    def __init__(
+        self,
+        priority: int = PRIORITY_NORMAL,
+        user_rate: float = 5.0,
+        user_burst: float = 20.0,
+        route_rate: Optional[float] = None,
+        route_burst: Optional[float] = None
+    ):
+        self.priority = priority
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.route_rate = route_rate
+        self.route_burst = route_burst if route_burst is not None else route_rate
+
+class RateLimiter:
+    """Per-user and per-route token buckets kept in process memory"""
+
+    def __init__(self, max_buckets: int = 100_000):
+        self.max_buckets = max_buckets
+        self.user_buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self.route_buckets: Dict[str, TokenBucket] = {}
+
+    def check(self, route: str, identity: str, policy: RoutePolicy, now: float = None) -> float:
+        """Return 0 if the request may proceed, otherwise the retry-after delay"""
+        if now is None:
+            now = time.monotonic()
+
+        # The user's own bucket first: one user flooding a route must not spend the
+        # route's shared tokens on requests that their own limit rejects anyway
+        key = (route, identity)
+        user_bucket = self.user_buckets.get(key)
+        if user_bucket is None:
+            if len(self.user_buckets) >= self.max_buckets:
+                self._evict_idle(now)
+            user_bucket = self.user_buckets[key] = TokenBucket(policy.user_rate, policy.user_burst, now)
+        wait = user_bucket.consume(now)
+        if wait or not policy.route_rate:
+            return wait
+
+        bucket = self.route_buckets.get(route)
+        if bucket is None:
+            bucket = self.route_buckets[route] = TokenBucket(policy.route_rate, policy.route_burst, now)
+        wait = bucket.consume(now)
+        if wait:
+            user_bucket.refund()
+        return wait
+
+    def _evict_idle(self, now: float):
+        idle = [key for key, bucket in self.user_buckets.items() if bucket.is_idle(now)]
+        for key in idle:
+            del self.user_buckets[key]
+
+        # Everyone is active: drop the oldest half rather than growing unbounded
+        if len(self.user_buckets) >= self.max_buckets:
+            for key in list(self.user_buckets)[: self.max_buckets // 2]:
+                del self.user_buckets[key]
+
+class LoadShedder:
+    """Tracks event-loop lag and in-flight requests to decide what to reject"""
+
+    def __init__(
+        self,
+        max_lag: float = 0.2,
+        max_in_flight: int = 200,
+        sample_interval: float = 0.1
+    ):
+        self.max_lag = max_lag
+        self.max_in_flight = max_in_flight
+        self.sample_interval = sample_interval
+        self.lag = 0.0
+        self.max_observed_lag = 0.0
+        self.in_flight = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._monitor_lag())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _monitor_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.sample_interval
+            await asyncio.sleep(self.sample_interval)
+            lag = max(0.0, loop.time() - expected)
+            # Rise immediately, decay smoothly so one quiet sample doesn't reopen the gate
+            self.lag = lag if lag > self.lag else self.lag * 0.7 + lag * 0.3
+            self.max_observed_lag = max(self.max_observed_lag, lag)
+
+    def overload(self) -> float:
+        """Overload factor: >= 1 means a threshold has been crossed"""
+        return max(self.lag / self.max_lag, self.in_flight / self.max_in_flight)
+
+    def should_shed(self, priority: int) -> bool:
+        if priority == PRIORITY_CRITICAL:
+            return False
+
+        overload = self.overload()
+        if priority >= PRIORITY_LOW:
+            return overload >= 1.0
+        return overload >= 2.0
+
+class RateLimitMiddleware:
+    """ASGI middleware applying route priorities, token buckets and load shedding"""
+
+    def __init__(
+        self,
+        app,
+        limiter: RateLimiter,
+        shedder: LoadShedder,
+        policies: Dict[str, RoutePolicy],
+        default_policy: RoutePolicy = None,
+        exempt_prefixes: Iterable[str] = (),
+        verify_token: Callable[[str], Optional[str]] = None
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.shedder = shedder
+        self.policies = policies
+        self.default_policy = default_policy or RoutePolicy()
+        self.exempt_prefixes = tuple(exempt_prefixes)
+        self.verify_token = verify_token  # bearer token -> user id, or None when invalid
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if self.exempt_prefixes and path.startswith(self.exempt_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        policy = self.policies.get(path, self.default_policy)
+
+        if policy.priority != PRIORITY_CRITICAL:
+            if self.shedder.should_shed(policy.priority):
+                await self._reject(send, 503, "Server busy, please retry shortly", 1.0)
+                return
+
+            retry_after = self.limiter.check(path, self._identity(scope), policy)
+            if retry_after:
+                await self._reject(send, 429, "Too many requests", retry_after)
+                return
+
+        self.shedder.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.shedder.in_flight -= 1
+
+    def _identity(self, scope) -> str:
+        """Bucket key: the user a valid bearer token belongs to, otherwise the client address
+
+        Keying on the raw header would hand every made-up or re-issued token a
+        fresh bucket, so a missing or invalid token counts against the address.
+        """
+        if self.verify_token is not None:
+            for name, value in scope["headers"]:
+                if name == b"authorization":
+                    scheme, _, token = value.decode("latin-1").partition(" ")
+                    if scheme.lower() == "bearer" and token:
+                        user_id = self.verify_token(token.strip())
+                        if user_id:
+                            return f"user:{user_id}"
+                    break
+        client = scope.get("client")
+        return client[0] if client else "anonymous"
+
+    @staticmethod
+    async def _reject(send, status_code: int, detail: str, retry_after: float):
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, int(retry_after + 0.999))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
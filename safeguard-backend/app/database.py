@@ -1,19 +1,31 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from app.config import settings
+from app.core.sqlite_profile import apply_sqlite_profile
+from app.core.async_db import create_async_db_engine
 
 engine = create_engine(
     settings.DATABASE_URL, 
     connect_args={"check_same_thread": False}  # For SQLite
 )
+apply_sqlite_profile(engine, settings.SQLITE_PROFILE)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Async sessions for handlers running on the event loop
+async_engine = create_async_db_engine(settings.DATABASE_URL, settings.SQLITE_PROFILE)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
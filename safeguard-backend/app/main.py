@@ -1,23 +1,51 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Request
+from fastapi import FastAPI, Depends, HTTPException, Query, status, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy.orm import Session
-from sqlalchemy import create_engine, Column, String, DateTime, Boolean, Text, Integer, ForeignKey, Float
+from sqlalchemy import create_engine, select, insert, update, delete, bindparam, case, text, Column, String, DateTime, Boolean, Text, Integer, ForeignKey, Float, LargeBinary, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.sql import func
 from pydantic import BaseModel, EmailStr
 from pydantic_settings import BaseSettings
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import os
 import uuid
 import json
+import base64
+import binascii
 import socketio
 from jose import jwt
 from passlib.context import CryptContext
 import httpx
 import asyncio
+from collections import OrderedDict
+from app.core.idempotency import IdempotencyCache
+from app.core.locks import KeyedLocks
+from app.core.rate_limit import (
+    RateLimiter, LoadShedder, RateLimitMiddleware, RoutePolicy,
+    PRIORITY_CRITICAL, PRIORITY_NORMAL, PRIORITY_LOW
+)
+from app.core.sqlite_profile import WalCheckpointer, apply_sqlite_profile
+from app.core.async_db import create_async_db_engine
+from app.core.ids import UUIDBlob, new_id
+from app.core.migrations import upgrade
+from app.migrations import MIGRATIONS
+from app.utils.helpers import normalize_phone
+from app.services.sms_transport import SMSTransport, TwilioProvider
+from app.services.emergency_registry import EmergencyRegistry, ActiveEmergency
+from app.services.receipt_batcher import STATUS_RANK, DeliveryReceiptBatcher
+from app.services.live_tracking import LiveTracker
+from app.services.safe_walk import SafeWalk, SafeWalkTracker
+from app.services.phrase_matcher import CompiledPhrase, PhraseAutomaton, PhraseCache, PhraseSet, TranscriptStream
+from app.services.segment_store import SEQ_LIMIT, SegmentStore, SegmentTooLarge
+from app.services.keyword_spotter import KeywordSpotter, KeywordStream, MFCCExtractor
+from app.services.recording_upload import (
+    ChunkedUploadStore, UploadClosed, UploadOffsetMismatch, UploadTooLarge
+)
+from app.utils.timer_wheel import TimerWheel, Timer
+from app.utils.range_file import RangeFileResponse
 
 # Configuration
 class Settings(BaseSettings):
@@ -27,6 +55,8 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "safeguard-secret-key-change-in-production"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
     DATABASE_URL: str = "sqlite:///./database.db"
+    SQLITE_PROFILE: str = "performance"  # see app.core.sqlite_profile.SQLITE_PROFILES
+    SQLITE_CHECKPOINT_INTERVAL: float = 60.0  # seconds between WAL checkpoints
     BACKEND_CORS_ORIGINS: list = ["http://localhost:3000", "http://127.0.0.1:3000", "https://localhost:3000"]
     
     # Google OAuth (Free tier)
@@ -37,6 +67,70 @@ class Settings(BaseSettings):
     TWILIO_ACCOUNT_SID: str = "your-twilio-sid"
     TWILIO_AUTH_TOKEN: str = "your-twilio-token"
     TWILIO_PHONE: str = "your-twilio-phone"
+    TWILIO_API_BASE: str = "https://api.twilio.com"  # point at app.services.fake_sms_provider for local runs
+    SMS_MAX_PARALLEL: int = 10
+    SMS_MAX_CONNECTIONS: int = 20
+    SMS_MAX_RETRIES: int = 3
+    TWILIO_VALIDATE_WEBHOOKS: bool = True
+    
+    # Public URL of this API, used to build provider status-callback URLs (empty = no callbacks)
+    PUBLIC_BASE_URL: str = ""
+    
+    # Country code assumed for phone numbers entered without one
+    DEFAULT_PHONE_COUNTRY_CODE: str = "1"
+    
+    # Rate limiting and load shedding
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_DEFAULT_RATE: float = 5.0  # requests per second per user and route
+    RATE_LIMIT_DEFAULT_BURST: float = 20.0
+    LOAD_SHED_MAX_LAG: float = 0.2  # seconds of event-loop lag
+    LOAD_SHED_MAX_IN_FLIGHT: int = 200
+    
+    # Repeat triggers while a session is active are folded into it; recipients
+    # get at most one "emergency_updated" push per window
+    TRIGGER_COALESCE_WINDOW: int = 10  # seconds
+    IDEMPOTENCY_KEY_TTL: int = 600  # seconds
+    
+    # Background alert delivery
+    ALERT_DISPATCH_WORKERS: int = 4
+    ALERT_DISPATCH_CONCURRENCY: int = 20  # simultaneous SMS/socket sends
+    
+    # Delivery receipts are coalesced and written in bulk
+    RECEIPT_BATCH_SIZE: int = 500
+    RECEIPT_FLUSH_DELAY: float = 0.25  # seconds
+    
+    # Live tracking of the victim during an active emergency
+    LIVE_TRAIL_SIZE: int = 120  # fixes kept per session
+    LIVE_PUSH_INTERVAL: float = 1.0  # seconds between pushes to responders
+    LIVE_PERSIST_INTERVAL: float = 5.0  # seconds between history writes
+    
+    # Escalation of unacknowledged emergencies
+    NEARBY_ALERT_RADIUS_KM: float = 3.0  # widened by this much on every escalation step
+    NEARBY_ALERT_LIMIT: int = 10
+    NEARBY_RADIUS_KM: float = 3.0  # widest search clients may make for active emergencies
+    ESCALATION_INTERVAL: int = 180  # seconds between steps (one alarm duration)
+    ESCALATION_MAX_STEPS: int = 5
+    EMERGENCY_SESSION_TTL: int = 6 * 60 * 60  # active sessions older than this are expired
+    
+    # Emergency recordings, uploaded in resumable chunks
+    UPLOAD_DIR: str = "uploads"
+    MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 15 minutes of recorded audio with headroom
+    MAX_UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    LIVE_AUDIO_MAX_SEGMENT_SIZE: int = 512 * 1024  # one socket message
+    
+    # Server-side keyword spotting on streamed audio (16 kHz mono PCM16)
+    KEYWORD_SPOTTING_ENABLED: bool = False
+    KEYWORD_SPOTTING_MAX_TAKES: int = 5  # enrollment recordings per phrase
+    KEYWORD_SPOTTING_MAX_TAKE_SECONDS: float = 5.0
+    
+    # Several safety phrases per user, each with its own action
+    VOICE_MAX_ACTIVE_PHRASES: int = 10
+    VOICE_CACHE_MAX_USERS: int = 10_000  # users whose compiled phrases and spotters stay in memory
+    
+    # Safe walks: a missed check-in triggers an automatic emergency
+    SAFE_WALK_MIN_INTERVAL: int = 60  # seconds
+    SAFE_WALK_MAX_INTERVAL: int = 60 * 60
+    SAFE_WALK_GRACE_PERIOD: int = 60  # seconds after a due reminder before triggering
     
     class Config:
         case_sensitive = True
@@ -45,15 +139,19 @@ settings = Settings()
 
 # Database Setup
 engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False})
+apply_sqlite_profile(engine, settings.SQLITE_PROFILE)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+# Request handlers and background tasks await their queries on the async engine, so a slow
+# query no longer stalls sockets and timers; the sync engine is for schema setup and startup loads
+async_engine = create_async_db_engine(settings.DATABASE_URL, settings.SQLITE_PROFILE)
+# Objects stay readable after commit; expiring them would mean a lazy load outside an await
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # Security
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -87,7 +185,7 @@ class User(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     email = Column(String, unique=True, index=True, nullable=False)
     name = Column(String, nullable=False)
-    phone = Column(String)
+    phone = Column(String, index=True)  # E.164
     date_of_birth = Column(String)
     gender = Column(String)
     address = Column(Text)
@@ -100,15 +198,16 @@ class User(Base):
     emergency_contacts = relationship("EmergencyContact", back_populates="user", cascade="all, delete-orphan")
     voice_phrases = relationship("VoicePhrase", back_populates="user", cascade="all, delete-orphan")
     emergency_sessions = relationship("EmergencySession", back_populates="user", cascade="all, delete-orphan")
+    safe_walks = relationship("SafeWalkSession", back_populates="user", cascade="all, delete-orphan")
     locations = relationship("UserLocation", back_populates="user", cascade="all, delete-orphan")
 
 class EmergencyContact(Base):
     __tablename__ = "emergency_contacts"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
-    phone = Column(String, nullable=False)
+    phone = Column(String, nullable=False)  # E.164
     priority_order = Column(Integer, default=1)
     created_at = Column(DateTime, default=func.now())
     
@@ -121,11 +220,29 @@ class VoicePhrase(Base):
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     phrase = Column(String, nullable=False)
     phrase_password_hash = Column(String, nullable=False)
+    action = Column(String, default="alarm")  # one of PHRASE_ACTIONS
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
     user = relationship("User", back_populates="voice_phrases")
+    
+    # Only active phrases are ever looked up; retired ones stay out of the index
+    __table_args__ = (
+        Index("ix_voice_phrases_active_user", "user_id", sqlite_where=is_active == True),
+    )
+
+# "alarm" sounds the device alarm; "silent" alerts contacts without any sound on the device
+PHRASE_ACTIONS = ("alarm", "silent")
+
+class VoicePhraseKeyword(Base):
+    __tablename__ = "voice_phrase_keywords"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    phrase_id = Column(String, ForeignKey("voice_phrases.id"), nullable=False, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    templates = Column(LargeBinary, nullable=False)  # KeywordSpotter.to_bytes()
+    created_at = Column(DateTime, default=func.now())
 
 class EmergencySession(Base):
     __tablename__ = "emergency_sessions"
@@ -142,19 +259,109 @@ class EmergencySession(Base):
     emergency_metadata = Column(Text)
     
     user = relationship("User", back_populates="emergency_sessions")
+    alerts = relationship("EmergencyAlert", back_populates="emergency_session", cascade="all, delete-orphan")
+    
+    # A user's active session is looked up on every trigger
+    __table_args__ = (
+        Index("ix_emergency_sessions_user_status", "user_id", "status"),
+    )
+
+class EmergencyAlert(Base):
+    __tablename__ = "emergency_alerts"
+    
+    # Time-ordered 16-byte keys: inserts append to the primary key index instead of splitting random pages
+    id = Column(UUIDBlob, primary_key=True, default=new_id)
+    emergency_session_id = Column(String, ForeignKey("emergency_sessions.id"), nullable=False, index=True)
+    recipient_type = Column(String, nullable=False)  # 'contact', 'contact_user', 'nearby_user'
+    recipient_id = Column(String, nullable=False)
+    alert_method = Column(String, nullable=False)  # 'sms', 'push'
+    status = Column(String, default="pending")  # 'pending', 'sent', 'delivered', 'failed'
+    sent_at = Column(DateTime, default=func.now())
+    delivered_at = Column(DateTime)
+    
+    emergency_session = relationship("EmergencySession", back_populates="alerts")
 
 class UserLocation(Base):
     __tablename__ = "user_locations"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDBlob, primary_key=True, default=new_id)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
     accuracy = Column(Float)
-    timestamp = Column(DateTime, default=func.now())
+    timestamp = Column(DateTime, default=func.now(), index=True)
     is_emergency = Column(Boolean, default=False)
     
     user = relationship("User", back_populates="locations")
+    
+    # Latest fix per user; the timestamp index serves the proximity window
+    __table_args__ = (
+        Index("ix_user_locations_user_timestamp", "user_id", "timestamp"),
+    )
+
+class RecordingUpload(Base):
+    __tablename__ = "recording_uploads"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    emergency_session_id = Column(String, ForeignKey("emergency_sessions.id"), nullable=False, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    content_type = Column(String, nullable=False)
+    total_size = Column(Integer)  # declared by the client, if known
+    status = Column(String, default="uploading")  # 'uploading', 'complete'
+    created_at = Column(DateTime, default=func.now())
+    completed_at = Column(DateTime)
+
+class SafeWalkSession(Base):
+    __tablename__ = "safe_walk_sessions"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    status = Column(String, default="active", index=True)  # 'active', 'completed', 'missed'
+    check_in_interval = Column(Integer, nullable=False)  # seconds
+    next_deadline = Column(DateTime, nullable=False)
+    last_check_in_at = Column(DateTime)
+    last_lat = Column(Float)
+    last_lng = Column(Float)
+    emergency_session_id = Column(String, ForeignKey("emergency_sessions.id"))
+    started_at = Column(DateTime, default=func.now())
+    ended_at = Column(DateTime)
+    
+    user = relationship("User", back_populates="safe_walks")
+
+# Hot lookups, built once: executing a prebuilt statement skips constructing it
+# and reuses its memoized compiled-cache key on every call
+USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+ACTIVE_USER_BY_ID = USER_BY_ID.where(User.is_active == True)
+CONTACTS_BY_USER = select(EmergencyContact).where(EmergencyContact.user_id == bindparam("user_id"))
+ACTIVE_PHRASES_BY_USER = select(VoicePhrase).where(
+    VoicePhrase.user_id == bindparam("user_id"),
+    VoicePhrase.is_active == True
+).order_by(VoicePhrase.created_at)
+ACTIVE_SESSION_FOR_USER = select(EmergencySession).where(
+    EmergencySession.id == bindparam("session_id"),
+    EmergencySession.user_id == bindparam("user_id"),
+    EmergencySession.status == "active"
+)
+
+# Active users seen since :recent_time within :radius km, nearest first. CROSS JOIN
+# keeps user_locations as SQLite's outer loop, so only the recent window is read
+# (ix_user_locations_timestamp) instead of every user's history.
+NEARBY_USERS_SQL = text("""
+    SELECT u.id, MIN(
+           (6371 * acos(cos(radians(:lat)) * cos(radians(ul.latitude)) * 
+           cos(radians(ul.longitude) - radians(:lng)) + 
+           sin(radians(:lat)) * sin(radians(ul.latitude))))) AS distance
+    FROM user_locations ul
+    CROSS JOIN users u
+    WHERE u.id = ul.user_id
+    AND ul.timestamp > :recent_time
+    AND u.id != :user_id
+    AND u.is_active = 1
+    GROUP BY u.id
+    HAVING distance < :radius
+    ORDER BY distance
+    LIMIT :limit
+""")
 
 # Schemas
 class GoogleAuthRequest(BaseModel):
@@ -180,11 +387,17 @@ class EmergencyContactCreate(BaseModel):
 class VoicePhraseCreate(BaseModel):
     phrase: str
     phrase_password: str
+    action: str = "alarm"
+    # Optional takes of the phrase for server-side spotting: base64 16 kHz mono PCM16
+    enrollment_audio: Optional[List[str]] = None
 
 class VoicePhraseUpdate(BaseModel):
     phrase: str
     old_password: str
     new_password: str
+    # Required once the user has more than one active phrase
+    phrase_id: Optional[str] = None
+    action: Optional[str] = None
 
 class LocationData(BaseModel):
     latitude: float
@@ -196,16 +409,58 @@ class EmergencyTrigger(BaseModel):
     location: Optional[LocationData] = None
     phrase: Optional[str] = None
     confidence: Optional[float] = None
+    action: Optional[str] = None
+
+class RecordingUploadCreate(BaseModel):
+    session_id: str
+    content_type: str = "audio/webm"
+    total_size: Optional[int] = None
+
+class SafeWalkStart(BaseModel):
+    check_in_interval: int = 300  # seconds
+    location: Optional[LocationData] = None
+
+class SafeWalkCheckIn(BaseModel):
+    walk_id: str
+    location: Optional[LocationData] = None
+
+class DeliveryReceipt(BaseModel):
+    alert_id: str
+    status: str  # 'sent', 'delivered', 'failed'
+    delivered_at: Optional[datetime] = None
+
+class DeliveryReceiptBatch(BaseModel):
+    receipts: List[DeliveryReceipt]
 
 # WebSocket Manager
+def emergency_room(session_id: str) -> str:
+    """Socket.IO room holding everyone alerted about an emergency session"""
+    return f"emergency:{session_id}"
+
 class SocketManager:
-    def __init__(self):
+    def __init__(
+        self,
+        emergency_registry: EmergencyRegistry,
+        receipt_batcher: DeliveryReceiptBatcher,
+        live_tracker: LiveTracker,
+        segment_store: SegmentStore
+    ):
         self.sio = socketio.AsyncServer(
             cors_allowed_origins=settings.BACKEND_CORS_ORIGINS,
             async_mode='asgi'
         )
+        self.emergency_registry = emergency_registry
+        self.receipt_batcher = receipt_batcher
+        self.live_tracker = live_tracker
+        self.segment_store = segment_store
+        # Set once the trigger path exists; see VoiceTriggerService
+        self.voice_trigger = None
+        # Set once the dispatcher exists; redelivers alerts missed while offline
+        self.alert_dispatcher = None
         self.connected_users: Dict[str, str] = {}
         self.user_sessions: Dict[str, str] = {}
+        self.transcript_streams: Dict[str, TranscriptStream] = {}
+        self.keyword_streams: Dict[str, List[KeywordStream]] = {}
         self.setup_handlers()
     
     def setup_handlers(self):
@@ -221,6 +476,8 @@ class SocketManager:
                 if user_id in self.connected_users:
                     del self.connected_users[user_id]
                 del self.user_sessions[sid]
+            self.transcript_streams.pop(sid, None)
+            self.keyword_streams.pop(sid, None)
         
         @self.sio.event
         async def authenticate(sid, data):
@@ -231,12 +488,100 @@ class SocketManager:
                 if user_id:
                     self.connected_users[user_id] = sid
                     self.user_sessions[sid] = user_id
+                    # Rejoin rooms of active emergencies this user was alerted about, and
+                    # deliver the alerts that were held back while they were offline
+                    for session_id in self.emergency_registry.sessions_for_recipient(user_id):
+                        self.sio.enter_room(sid, emergency_room(session_id))
+                        if self.alert_dispatcher is not None:
+                            self.alert_dispatcher.enqueue(session_id, user_id)
                     await self.sio.emit('authenticated', {'success': True}, sid)
                 else:
                     await self.sio.emit('authentication_error', {'error': 'Invalid token'}, sid)
             except Exception as e:
                 await self.sio.emit('authentication_error', {'error': str(e)}, sid)
         
+        @self.sio.event
+        async def alert_ack(sid, data):
+            # Clients auto-ack every emergency_alert; acks join the bulk receipt writer
+            if sid not in self.user_sessions or not data or not data.get('alert_id'):
+                return
+            
+            self.receipt_batcher.add(data['alert_id'], 'delivered', recipient_id=self.user_sessions[sid])
+        
+        @self.sio.event
+        async def emergency_location(sid, data):
+            # Fast path for the victim's position during an active emergency
+            if sid not in self.user_sessions or not data:
+                return
+            
+            user_id = self.user_sessions[sid]
+            entry = self.emergency_registry.get_by_user(user_id)
+            if not entry or data.get('session_id', entry.session_id) != entry.session_id:
+                return
+            
+            try:
+                latitude = float(data['latitude'])
+                longitude = float(data['longitude'])
+                accuracy = float(data['accuracy']) if data.get('accuracy') is not None else None
+            except (KeyError, TypeError, ValueError):
+                return
+            
+            self.live_tracker.record(entry.session_id, user_id, latitude, longitude, accuracy)
+            self.emergency_registry.update_location(entry.session_id, latitude, longitude)
+        
+        @self.sio.event
+        async def audio_segment(sid, data):
+            # Live evidence from the victim; the return value is the client's ack
+            if sid not in self.user_sessions or not isinstance(data, dict):
+                return {"stored": False, "error": "not_authenticated"}
+            
+            user_id = self.user_sessions[sid]
+            entry = self.emergency_registry.get_by_user(user_id)
+            if not entry or data.get('session_id', entry.session_id) != entry.session_id:
+                return {"stored": False, "error": "no_active_emergency"}
+            
+            payload = data.get('data')
+            try:
+                seq = int(data['seq'])
+            except (KeyError, TypeError, ValueError):
+                return {"stored": False, "error": "invalid_segment"}
+            if not isinstance(payload, (bytes, bytearray)) or not 0 <= seq < SEQ_LIMIT:
+                return {"stored": False, "error": "invalid_segment"}
+            
+            try:
+                segment = await self.segment_store.append(entry.session_id, seq, payload, data.get('mime_type'))
+            except SegmentTooLarge as e:
+                return {"stored": False, "seq": seq, "error": str(e)}
+            except OSError as e:
+                print(f"Live audio write error for session {entry.session_id}: {e}")
+                return {"stored": False, "seq": seq, "error": "write_failed", "retry": True}
+            if segment is None:
+                return {"stored": True, "seq": seq, "duplicate": True}
+            
+            await self.sio.emit('emergency_audio_segment', {
+                'session_id': entry.session_id,
+                **segment
+            }, room=emergency_room(entry.session_id))
+            return {"stored": True, "seq": seq}
+        
+        @self.sio.event
+        async def join_emergency(sid, data):
+            # Responders (late) joining get the buffered trail in one message
+            if sid not in self.user_sessions or not data:
+                return
+            
+            user_id = self.user_sessions[sid]
+            entry = self.emergency_registry.get(data.get('session_id'))
+            if not entry or (user_id not in entry.recipients and user_id != entry.user_id):
+                await self.sio.emit('emergency_join_error', {'error': 'Not a recipient of this emergency'}, sid)
+                return
+            
+            self.sio.enter_room(sid, emergency_room(entry.session_id))
+            await self.sio.emit('emergency_trail', {
+                'session_id': entry.session_id,
+                'fixes': self.live_tracker.trail(entry.session_id)
+            }, sid)
+        
         @self.sio.event
         async def location_update(sid, data):
             if sid not in self.user_sessions:
@@ -249,6 +594,106 @@ class SocketManager:
                 'timestamp': data.get('timestamp')
             })
         
+        @self.sio.event
+        async def transcript_delta(sid, data):
+            # Interim speech results; words from `offset` on replace the utterance's tail
+            if sid not in self.user_sessions or not isinstance(data, dict) or self.voice_trigger is None:
+                return
+            
+            user_id = self.user_sessions[sid]
+            automaton = await self.voice_trigger.automaton(user_id)
+            if automaton.empty:
+                return {"listening": False}
+            
+            stream = self.transcript_streams.get(sid)
+            if stream is None or stream.automaton is not automaton:
+                stream = self.transcript_streams[sid] = TranscriptStream(automaton)
+            try:
+                offset = int(data.get('offset', 0))
+            except (TypeError, ValueError):
+                return {"listening": True, "error": "invalid_offset"}
+            try:
+                confidence = float(data.get('confidence') or 0.8)
+            except (TypeError, ValueError):
+                return {"listening": True, "error": "invalid_confidence"}
+            if not 0.0 <= confidence <= 1.0:
+                return {"listening": True, "error": "invalid_confidence"}
+            
+            utterance = str(data.get('utterance', ''))
+            phrase = stream.feed(utterance, offset, str(data.get('text') or ''), bool(data.get('final')))
+            # One trigger per utterance; a new one may trigger again (it attaches to an active session)
+            if phrase is None or stream.triggered == utterance or confidence < 0.6:
+                return {"listening": True, "matched": False}
+            
+            stream.triggered = utterance
+            result = await self.voice_trigger.trigger(user_id, phrase, confidence)
+            if result is None:
+                stream.triggered = None
+                return {"listening": True, "matched": True, "triggered": False}
+            
+            await self.sio.emit('emergency_trigger', {
+                'type': 'voice',
+                'user_id': user_id,
+                'session_id': result['session_id'],
+                'phrase': phrase.source,
+                'action': phrase.action,
+                'confidence': confidence,
+                'timestamp': datetime.utcnow().isoformat()
+            }, sid)
+            return {"listening": False, "matched": True, "triggered": True, "session_id": result['session_id']}
+        
+        @self.sio.event
+        async def audio_frames(sid, data):
+            # Raw microphone audio for server-side spotting, when the browser has no speech recognition
+            if sid not in self.user_sessions or not isinstance(data, dict) or self.voice_trigger is None:
+                return
+            if not settings.KEYWORD_SPOTTING_ENABLED:
+                return {"listening": False}
+            
+            user_id = self.user_sessions[sid]
+            spotters = await self.voice_trigger.spotters_for(user_id)
+            if not spotters:
+                return {"listening": False}
+            
+            streams = self.keyword_streams.get(sid)
+            if streams is None or tuple(stream.spotter for stream in streams) != spotters:
+                streams = self.keyword_streams[sid] = [KeywordStream(spotter, keyword_extractor) for spotter in spotters]
+            pcm = data.get('pcm')
+            if not isinstance(pcm, (bytes, bytearray)):
+                return {"listening": True, "error": "invalid_audio"}
+            
+            # A 100 ms chunk costs well under a millisecond per enrolled phrase, so it runs inline
+            pcm = bytes(pcm)
+            heard = None
+            for stream in streams:
+                score = stream.feed(pcm)
+                if score is not None and (heard is None or score < heard[1]):
+                    heard = (stream.spotter, score)
+            if heard is None:
+                return {"listening": True, "matched": False}
+            
+            spotter, score = heard
+            phrase = (await self.voice_trigger.phrases(user_id)).get(spotter.phrase_id)
+            if phrase is None:
+                # Deleted or deactivated since the spotters were loaded: reload them and never trigger on it
+                self.voice_trigger.spotters.pop(user_id, None)
+                self.keyword_streams[sid] = [stream for stream in streams if stream.spotter is not spotter]
+                return {"listening": True, "matched": False}
+            result = await self.voice_trigger.trigger(user_id, phrase, None)
+            if result is None:
+                return {"listening": True, "matched": True, "triggered": False}
+            
+            await self.sio.emit('emergency_trigger', {
+                'type': 'voice',
+                'user_id': user_id,
+                'session_id': result['session_id'],
+                'phrase': phrase.source,
+                'action': phrase.action,
+                'score': round(score, 3),
+                'timestamp': datetime.utcnow().isoformat()
+            }, sid)
+            return {"listening": False, "matched": True, "triggered": True, "session_id": result['session_id']}
+        
         @self.sio.event
         async def voice_phrase_detected(sid, data):
             if sid not in self.user_sessions:
@@ -263,10 +708,24 @@ class SocketManager:
                 'timestamp': data.get('timestamp')
             }, sid)
     
-    async def emit_to_user(self, user_id: str, event: str, data: Any):
+    async def emit_to_user(self, user_id: str, event: str, data: Any) -> bool:
         if user_id in self.connected_users:
             sid = self.connected_users[user_id]
             await self.sio.emit(event, data, sid)
+            return True
+        return False
+    
+    def join_room(self, user_id: str, room: str) -> bool:
+        if user_id in self.connected_users:
+            self.sio.enter_room(self.connected_users[user_id], room)
+            return True
+        return False
+    
+    async def emit_to_room(self, room: str, event: str, data: Any):
+        await self.sio.emit(event, data, room=room)
+    
+    async def close_room(self, room: str):
+        await self.sio.close_room(room)
     
     async def broadcast(self, event: str, data: Any):
         await self.sio.emit(event, data)
@@ -277,7 +736,7 @@ class SocketManager:
 # Services
 class AuthService:
     @staticmethod
-    async def google_auth(db: Session, access_token: str) -> dict:
+    async def google_auth(db: AsyncSession, access_token: str) -> dict:
         """Real Google OAuth authentication"""
         try:
             # Verify Google token
@@ -295,10 +754,10 @@ class AuthService:
                 google_data = response.json()
                 
                 # Check if user exists
-                user = db.query(User).filter(
+                user = (await db.scalars(select(User).where(
                     (User.email == google_data["email"]) | 
                     (User.google_id == google_data["id"])
-                ).first()
+                ))).first()
                 
                 if not user:
                     # Create new user
@@ -310,8 +769,8 @@ class AuthService:
                         google_id=google_data["id"]
                     )
                     db.add(user)
-                    db.commit()
-                    db.refresh(user)
+                    await db.commit()
+                    await db.refresh(user)
                 
                 # Generate token
                 access_token = create_access_token(subject=user.id)
@@ -339,170 +798,615 @@ class AuthService:
             )
 
 class NotificationService:
-    @staticmethod
-    async def send_emergency_sms(phone: str, message: str, location_url: str = None):
-        """Send emergency SMS using Twilio (free tier)"""
-        try:
-            from twilio.rest import Client
-            
-            client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-            
-            full_message = f"🚨 EMERGENCY ALERT: {message}"
-            if location_url:
-                full_message += f"\n📍 Location: {location_url}"
-            
-            message = client.messages.create(
-                body=full_message,
-                from_=settings.TWILIO_PHONE,
-                to=phone
+    transport: Optional[SMSTransport] = None
+    
+    @classmethod
+    def get_transport(cls) -> SMSTransport:
+        if cls.transport is None:
+            cls.transport = SMSTransport(
+                TwilioProvider(
+                    settings.TWILIO_ACCOUNT_SID,
+                    settings.TWILIO_AUTH_TOKEN,
+                    settings.TWILIO_PHONE,
+                    base_url=settings.TWILIO_API_BASE
+                ),
+                max_parallel=settings.SMS_MAX_PARALLEL,
+                max_connections=settings.SMS_MAX_CONNECTIONS,
+                max_retries=settings.SMS_MAX_RETRIES
             )
-            
-            return {"success": True, "message_sid": message.sid}
-        except Exception as e:
-            print(f"SMS error: {e}")
-            return {"success": False, "error": str(e)}
+        return cls.transport
+    
+    @classmethod
+    async def close(cls):
+        if cls.transport is not None:
+            await cls.transport.aclose()
+    
+    @staticmethod
+    async def send_emergency_sms(
+        phone: str,
+        message: str,
+        location_url: str = None,
+        status_callback: str = None
+    ):
+        """Send emergency SMS over the shared async transport"""
+        full_message = f"🚨 EMERGENCY ALERT: {message}"
+        if location_url:
+            full_message += f"\n📍 Location: {location_url}"
+        
+        result = await NotificationService.get_transport().send(phone, full_message, status_callback)
+        if not result["success"]:
+            print(f"SMS error: {result['error']}")
+        return result
+
+async def find_nearby_user_ids(
+    db: AsyncSession,
+    lat: float,
+    lng: float,
+    exclude_user_id: str,
+    radius_km: float = None,
+    limit: int = None
+) -> List[str]:
+    """Active users seen within radius_km in the last 5 minutes, nearest first"""
+    result = await db.execute(NEARBY_USERS_SQL, {
+        "lat": lat,
+        "lng": lng,
+        "recent_time": datetime.utcnow() - timedelta(minutes=5),
+        "user_id": exclude_user_id,
+        "radius": radius_km or settings.NEARBY_ALERT_RADIUS_KM,
+        "limit": limit or settings.NEARBY_ALERT_LIMIT
+    })
+    return [row.id for row in result]
 
 class EmergencyService:
     @staticmethod
     async def trigger_emergency(
-        db: Session, 
+        db: AsyncSession, 
         user: User, 
         emergency_data: EmergencyTrigger,
-        socket_manager: SocketManager
+        alert_dispatcher: "AlertDispatcher",
+        emergency_registry: EmergencyRegistry
     ) -> Dict[str, Any]:
-        """Trigger emergency alert with real notifications"""
+        """Record emergency session and pending alerts in one commit, then hand off to the dispatcher"""
         
-        # Create emergency session
-        session = EmergencySession(
-            id=str(uuid.uuid4()),
-            user_id=user.id,
-            trigger_type=emergency_data.trigger_type,
-            location_lat=emergency_data.location.latitude if emergency_data.location else None,
-            location_lng=emergency_data.location.longitude if emergency_data.location else None,
-            emergency_metadata=json.dumps({
-                "phrase": emergency_data.phrase,
-                "confidence": emergency_data.confidence
-            }) if emergency_data.phrase else None
-        )
+        # IDs and timestamps are generated here so nothing has to be read back after the insert
+        session_id = str(uuid.uuid4())
+        now = datetime.utcnow()
         
-        db.add(session)
-        db.commit()
-        db.refresh(session)
+        # Get emergency contacts
+        emergency_contacts = (await db.scalars(CONTACTS_BY_USER, {"user_id": user.id})).all()
         
-        # Save emergency location
+        # Get nearby users (within 3km from last 5 minutes)
+        nearby_user_ids = []
         if emergency_data.location:
-            location = UserLocation(
-                id=str(uuid.uuid4()),
-                user_id=user.id,
-                latitude=emergency_data.location.latitude,
-                longitude=emergency_data.location.longitude,
-                accuracy=emergency_data.location.accuracy,
-                is_emergency=True
+            nearby_user_ids = await find_nearby_user_ids(
+                db, emergency_data.location.latitude, emergency_data.location.longitude, user.id
             )
-            db.add(location)
-            db.commit()
         
-        # Get emergency contacts
-        emergency_contacts = user.emergency_contacts
+        # Emergency contacts that are app users (single indexed IN lookup)
+        contact_phones = {
+            normalize_phone(contact.phone, settings.DEFAULT_PHONE_COUNTRY_CODE)
+            for contact in emergency_contacts
+        }
+        contact_phones.discard(None)
+        contact_user_ids = []
+        if contact_phones:
+            contact_user_ids = [
+                user_id for user_id in await db.scalars(select(User.id).where(User.phone.in_(contact_phones)))
+                if user_id != user.id
+            ]
+        
+        # One pending alert per recipient; the dispatcher delivers them after commit
+        recipients = (
+            [("contact", contact.id, "sms") for contact in emergency_contacts if contact.phone]
+            + [("contact_user", contact_user_id, "push") for contact_user_id in contact_user_ids]
+            + [("nearby_user", nearby_user_id, "push") for nearby_user_id in nearby_user_ids]
+        )
+        alert_rows = [
+            {
+                "id": new_id(),
+                "emergency_session_id": session_id,
+                "recipient_type": recipient_type,
+                "recipient_id": recipient_id,
+                "alert_method": alert_method,
+                "status": "pending",
+                "sent_at": now
+            }
+            for recipient_type, recipient_id, alert_method in recipients
+        ]
+        
+        # One INSERT per table and a single commit: session, location and alerts become durable together
+        await db.execute(insert(EmergencySession), [{
+            "id": session_id,
+            "user_id": user.id,
+            "trigger_type": emergency_data.trigger_type,
+            "location_lat": emergency_data.location.latitude if emergency_data.location else None,
+            "location_lng": emergency_data.location.longitude if emergency_data.location else None,
+            "status": "active",
+            "triggered_at": now,
+            "emergency_metadata": json.dumps({
+                "phrase": emergency_data.phrase,
+                "confidence": emergency_data.confidence,
+                "action": emergency_data.action
+            }) if emergency_data.phrase else None
+        }])
         
-        # Get nearby users (within 3km from last 5 minutes)
-        nearby_users = []
         if emergency_data.location:
-            recent_time = datetime.utcnow() - timedelta(minutes=5)
-            from sqlalchemy import text
-            
-            query = text("""
-                SELECT DISTINCT u.*, 
-                       (6371 * acos(cos(radians(:lat)) * cos(radians(ul.latitude)) * 
-                       cos(radians(ul.longitude) - radians(:lng)) + 
-                       sin(radians(:lat)) * sin(radians(ul.latitude)))) AS distance
-                FROM users u
-                JOIN user_locations ul ON u.id = ul.user_id
-                WHERE ul.timestamp > :recent_time
-                AND u.id != :user_id
-                AND u.is_active = 1
-                HAVING distance < 3
-                ORDER BY distance
-                LIMIT 10
-            """)
-            
-            result = db.execute(query, {
-                "lat": emergency_data.location.latitude,
-                "lng": emergency_data.location.longitude,
-                "recent_time": recent_time,
-                "user_id": user.id
-            })
-            
-            for row in result:
-                nearby_user = db.query(User).filter(User.id == row.id).first()
-                if nearby_user:
-                    nearby_users.append(nearby_user)
+            await db.execute(insert(UserLocation), [{
+                "id": new_id(),
+                "user_id": user.id,
+                "latitude": emergency_data.location.latitude,
+                "longitude": emergency_data.location.longitude,
+                "accuracy": emergency_data.location.accuracy,
+                "timestamp": now,
+                "is_emergency": True
+            }])
+        
+        if alert_rows:
+            await db.execute(insert(EmergencyAlert), alert_rows)
+        
+        user_id, user_name = user.id, user.name
+        await db.commit()
+        emergency_registry.add(ActiveEmergency(
+            session_id=session_id,
+            user_id=user_id,
+            user_name=user_name,
+            trigger_type=emergency_data.trigger_type,
+            triggered_at=now,
+            latitude=emergency_data.location.latitude if emergency_data.location else None,
+            longitude=emergency_data.location.longitude if emergency_data.location else None,
+            recipients=contact_user_ids + nearby_user_ids
+        ))
+        alert_dispatcher.enqueue(session_id)
         
         # Create location URL for Google Maps
         location_url = None
         if emergency_data.location:
             location_url = f"https://maps.google.com/?q={emergency_data.location.latitude},{emergency_data.location.longitude}"
         
-        # Send SMS to emergency contacts
-        sms_tasks = []
-        for contact in emergency_contacts:
-            if contact.phone:
-                message = f"{user.name} needs immediate help! Emergency triggered via SafeGuard app."
-                sms_tasks.append(
-                    NotificationService.send_emergency_sms(
-                        contact.phone, 
-                        message, 
-                        location_url
-                    )
-                )
-        
-        # Execute SMS sending
-        if sms_tasks:
-            await asyncio.gather(*sms_tasks, return_exceptions=True)
-        
-        # Broadcast via WebSocket to nearby users
-        emergency_broadcast = {
-            "session_id": session.id,
-            "user": {
-                "id": user.id,
-                "name": user.name,
-                "phone": user.phone
-            },
-            "location": {
-                "latitude": emergency_data.location.latitude,
-                "longitude": emergency_data.location.longitude
-            } if emergency_data.location else None,
-            "trigger_type": emergency_data.trigger_type,
-            "timestamp": session.triggered_at.isoformat(),
+        return {
+            "success": True,
+            "session_id": session_id,
+            "message": "Emergency alert triggered successfully",
+            "contacts_notified": len(emergency_contacts),
+            "nearby_users_notified": len(nearby_user_ids),
             "location_url": location_url
         }
+
+    @staticmethod
+    async def attach_to_emergency(
+        db: AsyncSession,
+        user: User,
+        entry: ActiveEmergency,
+        emergency_data: EmergencyTrigger,
+        emergency_registry: EmergencyRegistry,
+        socket_manager: SocketManager
+    ) -> Dict[str, Any]:
+        """Fold a repeat trigger into the user's active session instead of fanning out again"""
+        now = datetime.utcnow()
+        values = {}
+        if emergency_data.location:
+            values["location_lat"] = emergency_data.location.latitude
+            values["location_lng"] = emergency_data.location.longitude
+        if emergency_data.trigger_type != entry.trigger_type:
+            values["trigger_type"] = emergency_data.trigger_type
         
-        # Notify nearby users via WebSocket
-        for nearby_user in nearby_users:
-            await socket_manager.emit_to_user(nearby_user.id, "emergency_alert", emergency_broadcast)
+        if values:
+            await db.execute(
+                update(EmergencySession).where(EmergencySession.id == entry.session_id).values(**values)
+            )
+            if emergency_data.location:
+                await db.execute(insert(UserLocation), [{
+                    "id": new_id(),
+                    "user_id": user.id,
+                    "latitude": emergency_data.location.latitude,
+                    "longitude": emergency_data.location.longitude,
+                    "accuracy": emergency_data.location.accuracy,
+                    "timestamp": now,
+                    "is_emergency": True
+                }])
+            await db.commit()
+            
+            entry.trigger_type = emergency_data.trigger_type
+            if emergency_data.location:
+                emergency_registry.update_location(
+                    entry.session_id, emergency_data.location.latitude, emergency_data.location.longitude
+                )
+            
+            # Throttle pushes so a burst of repeat triggers produces one update per window
+            if (
+                entry.last_update_at is None
+                or (now - entry.last_update_at).total_seconds() >= settings.TRIGGER_COALESCE_WINDOW
+            ):
+                entry.last_update_at = now
+                await socket_manager.emit_to_room(emergency_room(entry.session_id), "emergency_updated", {
+                    "session_id": entry.session_id,
+                    "user_id": user.id,
+                    "trigger_type": entry.trigger_type,
+                    "location": {
+                        "latitude": entry.latitude,
+                        "longitude": entry.longitude
+                    } if entry.has_location else None,
+                    "timestamp": now.isoformat()
+                })
         
-        # Notify emergency contacts if they're app users
-        for contact in emergency_contacts:
-            contact_user = db.query(User).filter(User.phone == contact.phone).first()
-            if contact_user:
-                await socket_manager.emit_to_user(contact_user.id, "emergency_alert", emergency_broadcast)
+        location_url = None
+        if entry.has_location:
+            location_url = f"https://maps.google.com/?q={entry.latitude},{entry.longitude}"
         
         return {
             "success": True,
-            "session_id": session.id,
-            "message": "Emergency alert triggered successfully",
-            "contacts_notified": len(emergency_contacts),
-            "nearby_users_notified": len(nearby_users),
+            "session_id": entry.session_id,
+            "message": "Attached to active emergency session",
+            "coalesced": True,
             "location_url": location_url
         }
 
+alerts_table = EmergencyAlert.__table__
+
+ALERT_DISPATCH_UPDATE = (
+    update(alerts_table)
+    .where(alerts_table.c.id == bindparam("alert_id"))
+    .where(alerts_table.c.status == "pending")
+    .values(status=bindparam("new_status"), sent_at=bindparam("sent_at"))
+)
+
+# Receipts only move an alert forward (pending < sent < failed < delivered), whatever order they arrive in
+ALERT_RECEIPT_UPDATE = (
+    update(alerts_table)
+    .where(alerts_table.c.id == bindparam("alert_id"))
+    .where(
+        case(STATUS_RANK, value=alerts_table.c.status, else_=0)
+        < case(STATUS_RANK, value=bindparam("new_status"), else_=0)
+    )
+    .values(status=bindparam("new_status"), delivered_at=bindparam("receipt_at"))
+)
+ALERT_ACK_UPDATE = ALERT_RECEIPT_UPDATE.where(alerts_table.c.recipient_id == bindparam("acked_by"))
+
+async def write_delivery_receipts(batch: List[dict]) -> int:
+    """Apply a batch of receipts with one executemany UPDATE per kind, in one transaction"""
+    provider_receipts = [r for r in batch if r["acked_by"] is None]
+    user_acks = [r for r in batch if r["acked_by"] is not None]
+    
+    async with AsyncSessionLocal() as db:
+        if provider_receipts:
+            await db.execute(ALERT_RECEIPT_UPDATE, provider_receipts)
+        if user_acks:
+            await db.execute(ALERT_ACK_UPDATE, user_acks)
+        await db.commit()
+    return len(batch)
+
+class AlertDispatcher:
+    """Background delivery of pending EmergencyAlert rows with bounded concurrency"""
+    
+    def __init__(self, socket_manager: SocketManager, workers: int = 4, concurrency: int = 20):
+        self.socket_manager = socket_manager
+        self.workers = workers
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.queued: set = set()
+        self._tasks: List[asyncio.Task] = []
+    
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+    
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    def enqueue(self, session_id: str, recipient_id: Optional[str] = None):
+        """Deliver the session's pending alerts, or only one app user's push alerts"""
+        key = (session_id, recipient_id)
+        if key not in self.queued:
+            self.queued.add(key)
+            self.queue.put_nowait(key)
+    
+    def resume(self):
+        """Re-enqueue sessions whose alerts were never delivered (e.g. after a restart)"""
+        db = SessionLocal()
+        try:
+            pending = db.query(EmergencyAlert.emergency_session_id).filter(
+                EmergencyAlert.status == "pending"
+            ).distinct().all()
+        finally:
+            db.close()
+        
+        for row in pending:
+            self.enqueue(row.emergency_session_id)
+        return len(pending)
+    
+    async def _worker(self):
+        while True:
+            key = await self.queue.get()
+            self.queued.discard(key)
+            session_id, recipient_id = key
+            try:
+                await self.dispatch_session(session_id, recipient_id)
+            except Exception as e:
+                print(f"Alert dispatch error for session {session_id}: {e}")
+            finally:
+                self.queue.task_done()
+    
+    async def dispatch_session(self, session_id: str, recipient_id: Optional[str] = None):
+        # Everything is read up front and the connection returned to the pool before any
+        # network await, so slow SMS sends cannot starve request handlers of connections
+        async with AsyncSessionLocal() as db:
+            session = await db.scalar(select(EmergencySession).where(EmergencySession.id == session_id))
+            if not session:
+                return
+            
+            query = select(EmergencyAlert).where(
+                EmergencyAlert.emergency_session_id == session_id,
+                EmergencyAlert.status == "pending"
+            )
+            if recipient_id is not None:
+                query = query.where(EmergencyAlert.recipient_id == recipient_id, EmergencyAlert.alert_method == "push")
+            if session.status != "active":
+                # A held-back push alert is stale once the emergency is over
+                query = query.where(EmergencyAlert.alert_method != "push")
+            alerts = (await db.scalars(query)).all()
+            if not alerts:
+                return
+            
+            user = await db.scalar(USER_BY_ID, {"user_id": session.user_id})
+            contact_ids = [a.recipient_id for a in alerts if a.recipient_type == "contact"]
+            contacts_by_id = {}
+            if contact_ids:
+                contacts_by_id = {
+                    c.id: c for c in await db.scalars(select(EmergencyContact).where(EmergencyContact.id.in_(contact_ids)))
+                }
+            
+            location_url = None
+            if session.location_lat is not None and session.location_lng is not None:
+                location_url = f"https://maps.google.com/?q={session.location_lat},{session.location_lng}"
+            
+            emergency_broadcast = {
+                "session_id": session.id,
+                "user": {
+                    "id": user.id,
+                    "name": user.name,
+                    "phone": user.phone
+                },
+                "location": {
+                    "latitude": session.location_lat,
+                    "longitude": session.location_lng
+                } if session.location_lat is not None and session.location_lng is not None else None,
+                "trigger_type": session.trigger_type,
+                "timestamp": session.triggered_at.isoformat(),
+                "location_url": location_url
+            }
+            sms_message = f"{user.name} needs immediate help! Emergency triggered via SafeGuard app."
+        
+        results = await asyncio.gather(*(
+            self._deliver(alert, contacts_by_id, sms_message, location_url, emergency_broadcast)
+            for alert in alerts
+        ), return_exceptions=True)
+        
+        # Only pending rows are touched, so receipts that arrived meanwhile are not overwritten.
+        # Push alerts for offline recipients stay pending until they authenticate.
+        now = datetime.utcnow()
+        updates = [
+            {
+                "alert_id": alert.id,
+                "new_status": "sent" if delivered is True else "failed",
+                "sent_at": now
+            }
+            for alert, delivered in zip(alerts, results)
+            if delivered is not None
+        ]
+        if not updates:
+            return
+        async with AsyncSessionLocal() as db:
+            await db.execute(ALERT_DISPATCH_UPDATE, updates)
+            await db.commit()
+    
+    async def _deliver(
+        self,
+        alert: "EmergencyAlert",
+        contacts_by_id: Dict[str, "EmergencyContact"],
+        sms_message: str,
+        location_url: Optional[str],
+        emergency_broadcast: Dict[str, Any]
+    ) -> Optional[bool]:
+        """True if sent, False if it failed, None if the push recipient is offline"""
+        async with self.semaphore:
+            if alert.alert_method == "sms":
+                contact = contacts_by_id.get(alert.recipient_id)
+                if not contact:
+                    return False
+                status_callback = None
+                if settings.PUBLIC_BASE_URL:
+                    status_callback = (
+                        f"{settings.PUBLIC_BASE_URL}{settings.API_V1_STR}/webhooks/sms/status?alert_id={alert.id}"
+                    )
+                result = await NotificationService.send_emergency_sms(
+                    contact.phone, sms_message, location_url, status_callback
+                )
+                return result.get("success", False)
+            
+            # Recipients join the session room so later updates and the dismissal reach only them
+            self.socket_manager.join_room(alert.recipient_id, emergency_room(emergency_broadcast["session_id"]))
+            delivered = await self.socket_manager.emit_to_user(
+                alert.recipient_id, "emergency_alert", {**emergency_broadcast, "alert_id": alert.id}
+            )
+            return True if delivered else None
+
+class EscalationScheduler:
+    """Escalates and expires active emergencies from timers on a hierarchical timer wheel
+    
+    Each active session holds at most one pending escalation timer and one expiry
+    timer, so scheduling and cancelling are O(1) however many sessions are open.
+    Timers live only in memory and are rebuilt from the registry on startup.
+    """
+    
+    def __init__(
+        self,
+        wheel: TimerWheel,
+        emergency_registry: EmergencyRegistry,
+        alert_dispatcher: AlertDispatcher,
+        socket_manager: SocketManager,
+        live_tracker: LiveTracker,
+        segment_store: SegmentStore,
+        interval: float = 180,
+        max_steps: int = 5,
+        session_ttl: float = 6 * 60 * 60
+    ):
+        self.wheel = wheel
+        self.emergency_registry = emergency_registry
+        self.alert_dispatcher = alert_dispatcher
+        self.socket_manager = socket_manager
+        self.live_tracker = live_tracker
+        self.segment_store = segment_store
+        self.interval = interval
+        self.max_steps = max_steps
+        self.session_ttl = session_ttl
+        self.escalations: Dict[str, Timer] = {}
+        self.expiries: Dict[str, Timer] = {}
+    
+    def schedule(self, entry: ActiveEmergency, now: datetime = None):
+        """Arm the next escalation step and the expiry, derived from the trigger time"""
+        self.cancel(entry.session_id)
+        elapsed = ((now or datetime.utcnow()) - entry.triggered_at).total_seconds()
+        step = max(1, int(elapsed // self.interval) + 1)
+        if step <= self.max_steps:
+            self.escalations[entry.session_id] = self.wheel.schedule(
+                step * self.interval - elapsed, self.escalate, entry.session_id, step
+            )
+        self.expiries[entry.session_id] = self.wheel.schedule(
+            self.session_ttl - elapsed, self.expire, entry.session_id
+        )
+    
+    def cancel(self, session_id: str):
+        self.wheel.cancel(self.escalations.pop(session_id, None))
+        self.wheel.cancel(self.expiries.pop(session_id, None))
+    
+    def rebuild(self) -> int:
+        now = datetime.utcnow()
+        for entry in list(self.emergency_registry.by_session.values()):
+            self.schedule(entry, now)
+        return len(self.emergency_registry.by_session)
+    
+    async def escalate(self, session_id: str, step: int):
+        self.escalations.pop(session_id, None)
+        entry = self.emergency_registry.get(session_id)
+        if not entry:
+            return
+        
+        radius_km = settings.NEARBY_ALERT_RADIUS_KM * (step + 1)
+        try:
+            realerted, nearby_user_ids = await self._add_escalation_alerts(entry, step, radius_km)
+        except Exception as e:
+            print(f"Escalation error for session {session_id}: {e}")
+            realerted, nearby_user_ids = None, []
+        
+        if step < self.max_steps and session_id in self.emergency_registry.by_session:
+            self.escalations[session_id] = self.wheel.schedule(self.interval, self.escalate, session_id, step + 1)
+        
+        if realerted or nearby_user_ids:
+            self.emergency_registry.add_recipients(session_id, nearby_user_ids)
+            self.alert_dispatcher.enqueue(session_id)
+            await self.socket_manager.emit_to_user(entry.user_id, "emergency_escalated", {
+                "session_id": session_id,
+                "step": step,
+                "contact_realerted": realerted,
+                "nearby_users_added": len(nearby_user_ids),
+                "radius_km": radius_km
+            })
+    
+    async def _add_escalation_alerts(self, entry: ActiveEmergency, step: int, radius_km: float):
+        """Queue a re-send to the next unacknowledged contact and alerts for newly in-range users"""
+        async with AsyncSessionLocal() as db:
+            alerts = (await db.execute(select(
+                EmergencyAlert.recipient_type, EmergencyAlert.recipient_id, EmergencyAlert.status
+            ).where(EmergencyAlert.emergency_session_id == entry.session_id))).all()
+            
+            # A delivery receipt or socket ack from any contact stops the contact ladder
+            acknowledged = any(
+                alert.status == "delivered" and alert.recipient_type in ("contact", "contact_user")
+                for alert in alerts
+            )
+            now = datetime.utcnow()
+            rows = []
+            
+            realerted = None
+            if not acknowledged:
+                contacts = (await db.scalars(select(EmergencyContact.id).where(
+                    EmergencyContact.user_id == entry.user_id
+                ).order_by(EmergencyContact.priority_order, EmergencyContact.created_at))).all()
+                # Every contact was texted at trigger time; each step re-texts the next one down the list, once
+                if step < len(contacts):
+                    realerted = contacts[step]
+                    rows.append(("contact", realerted, "sms"))
+            
+            nearby_user_ids = []
+            if entry.has_location:
+                already_alerted = {alert.recipient_id for alert in alerts} | entry.recipients
+                candidates = await find_nearby_user_ids(
+                    db, entry.latitude, entry.longitude, entry.user_id,
+                    radius_km=radius_km,
+                    limit=settings.NEARBY_ALERT_LIMIT + len(already_alerted)
+                )
+                nearby_user_ids = [
+                    user_id for user_id in candidates if user_id not in already_alerted
+                ][:settings.NEARBY_ALERT_LIMIT]
+                rows.extend(("nearby_user", user_id, "push") for user_id in nearby_user_ids)
+            
+            if rows:
+                await db.execute(insert(EmergencyAlert), [
+                    {
+                        "id": new_id(),
+                        "emergency_session_id": entry.session_id,
+                        "recipient_type": recipient_type,
+                        "recipient_id": recipient_id,
+                        "alert_method": alert_method,
+                        "status": "pending",
+                        "sent_at": now
+                    }
+                    for recipient_type, recipient_id, alert_method in rows
+                ])
+                await db.commit()
+            return realerted, nearby_user_ids
+    
+    async def expire(self, session_id: str):
+        """Close a session that has been active longer than the TTL"""
+        self.cancel(session_id)
+        entry = self.emergency_registry.get(session_id)
+        now = datetime.utcnow()
+        
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(EmergencySession)
+                .where(EmergencySession.id == session_id, EmergencySession.status == "active")
+                .values(status="expired", resolved_at=now)
+            )
+            await db.commit()
+        
+        self.emergency_registry.remove(session_id)
+        self.live_tracker.end(session_id)
+        await self.segment_store.close(session_id)
+        
+        expiry_data = {
+            "session_id": session_id,
+            "user_id": entry.user_id if entry else None,
+            "expired_at": now.isoformat()
+        }
+        if entry:
+            await self.socket_manager.emit_to_user(entry.user_id, "emergency_expired", expiry_data)
+        room = emergency_room(session_id)
+        await self.socket_manager.emit_to_room(room, "emergency_expired", expiry_data)
+        await self.socket_manager.close_room(room)
+
 # Dependencies
 from fastapi.security import HTTPBearer
 from fastapi import Depends
 
 security = HTTPBearer()
 
-def get_current_user(token: str = Depends(security), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str = Depends(security), db: AsyncSession = Depends(get_db)) -> User:
+    # Runs on the event loop with the handler: as a threadpool dependency it checked out a
+    # connection and held it until the handler got scheduled, exhausting the pool under bursts
     user_id = verify_token(token.credentials)
     if user_id is None:
         raise HTTPException(
@@ -510,7 +1414,7 @@ def get_current_user(token: str = Depends(security), db: Session = Depends(get_d
             detail="Invalid authentication token"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(USER_BY_ID, {"user_id": user_id})
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -519,6 +1423,16 @@ def get_current_user(token: str = Depends(security), db: Session = Depends(get_d
     
     return user
 
+def get_current_user_id(token: str = Depends(security)) -> str:
+    """Token-only authentication for hot read paths that must not touch the database"""
+    user_id = verify_token(token.credentials)
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication token"
+        )
+    return user_id
+
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -526,24 +1440,399 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json"
 )
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.BACKEND_CORS_ORIGINS,
+# Rate limiting and priority load shedding (added before CORS so rejections still carry CORS headers)
+rate_limiter = RateLimiter()
+load_shedder = LoadShedder(
+    max_lag=settings.LOAD_SHED_MAX_LAG,
+    max_in_flight=settings.LOAD_SHED_MAX_IN_FLIGHT
+)
+
+route_policies = {
+    f"{settings.API_V1_STR}/emergency/trigger": RoutePolicy(PRIORITY_CRITICAL),
+    f"{settings.API_V1_STR}/emergency/dismiss": RoutePolicy(PRIORITY_CRITICAL),
+    f"{settings.API_V1_STR}/emergency/status": RoutePolicy(PRIORITY_NORMAL, user_rate=1.0, user_burst=5),
+    # A shed check-in would turn into a false automatic emergency
+    f"{settings.API_V1_STR}/safe-walk/check-in": RoutePolicy(PRIORITY_CRITICAL),
+    f"{settings.API_V1_STR}/location/update": RoutePolicy(
+        PRIORITY_LOW, user_rate=1.0, user_burst=5, route_rate=500.0, route_burst=1000.0
+    ),
+    f"{settings.API_V1_STR}/location/nearby-users": RoutePolicy(
+        PRIORITY_LOW, user_rate=0.5, user_burst=5, route_rate=200.0, route_burst=400.0
+    ),
+    f"{settings.API_V1_STR}/voice/status": RoutePolicy(PRIORITY_LOW, user_rate=0.5, user_burst=5),
+    # Receipts arrive in bursts from one provider address during an incident
+    f"{settings.API_V1_STR}/emergency/alerts/receipts": RoutePolicy(PRIORITY_NORMAL, user_rate=20.0, user_burst=100),
+    f"{settings.API_V1_STR}/webhooks/sms/status": RoutePolicy(PRIORITY_NORMAL, user_rate=500.0, user_burst=2000),
+}
+
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        limiter=rate_limiter,
+        shedder=load_shedder,
+        policies=route_policies,
+        default_policy=RoutePolicy(
+            PRIORITY_NORMAL,
+            user_rate=settings.RATE_LIMIT_DEFAULT_RATE,
+            user_burst=settings.RATE_LIMIT_DEFAULT_BURST
+        ),
+        exempt_prefixes=("/socket.io", "/health"),
+        verify_token=verify_token
+    )
+
+# CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.BACKEND_CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables and apply pending schema migrations
+for migration in upgrade(engine, Base.metadata, MIGRATIONS):
+    print(f"Applied migration {migration.version}: {migration.name}")
+
+# Keeps the write-ahead log short when the profile enables WAL
+wal_checkpointer = WalCheckpointer(engine, interval=settings.SQLITE_CHECKPOINT_INTERVAL)
+
+# Active emergencies, authoritative in memory
+emergency_registry = EmergencyRegistry()
+trigger_idempotency = IdempotencyCache(ttl=settings.IDEMPOTENCY_KEY_TTL)
+
+# Compiled voice phrases per user
+phrase_cache = PhraseCache(max_users=settings.VOICE_CACHE_MAX_USERS)
+keyword_extractor = MFCCExtractor()
+
+# Emergency recordings are stored under UPLOAD_DIR/recordings/<session id>/
+recording_store = ChunkedUploadStore(
+    os.path.join(settings.UPLOAD_DIR, "recordings"),
+    max_size=settings.MAX_FILE_SIZE,
+    max_chunk_size=settings.MAX_UPLOAD_CHUNK_SIZE
+)
+RECORDING_EXTENSIONS = {
+    "audio/webm": ".webm",
+    "audio/ogg": ".ogg",
+    "audio/mp4": ".m4a",
+    "audio/mpeg": ".mp3",
+    "audio/wav": ".wav",
+}
+
+async def publish_live_fixes(session_id: str, fixes: List[dict]):
+    await socket_manager.emit_to_room(emergency_room(session_id), "emergency_location_update", {
+        "session_id": session_id,
+        "fixes": fixes
+    })
+
+async def persist_live_fixes(rows: List[dict]):
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(UserLocation), [
+            {**row, "id": new_id(), "is_emergency": True} for row in rows
+        ])
+        await db.commit()
+
+live_tracker = LiveTracker(
+    publish_live_fixes,
+    persist_live_fixes,
+    trail_size=settings.LIVE_TRAIL_SIZE,
+    push_interval=settings.LIVE_PUSH_INTERVAL,
+    persist_interval=settings.LIVE_PERSIST_INTERVAL
+)
+
+# Delivery receipts from the API, SMS webhooks and socket acks share one bulk writer
+receipt_batcher = DeliveryReceiptBatcher(
+    write_delivery_receipts,
+    max_batch=settings.RECEIPT_BATCH_SIZE,
+    max_delay=settings.RECEIPT_FLUSH_DELAY
+)
 
 # Initialize WebSocket manager
-socket_manager = SocketManager()
+# Live audio evidence, one segmented file per session under UPLOAD_DIR/live/<session id>/
+segment_store = SegmentStore(
+    os.path.join(settings.UPLOAD_DIR, "live"),
+    max_segment_size=settings.LIVE_AUDIO_MAX_SEGMENT_SIZE,
+    max_session_size=settings.MAX_FILE_SIZE
+)
+
+socket_manager = SocketManager(emergency_registry, receipt_batcher, live_tracker, segment_store)
+
+def load_active_emergencies() -> int:
+    db = SessionLocal()
+    try:
+        rows = db.query(EmergencySession, User.name).join(User, User.id == EmergencySession.user_id).filter(
+            EmergencySession.status == "active"
+        ).all()
+        
+        recipients: Dict[str, List[str]] = {}
+        push_alerts = db.query(EmergencyAlert.emergency_session_id, EmergencyAlert.recipient_id).join(
+            EmergencySession, EmergencySession.id == EmergencyAlert.emergency_session_id
+        ).filter(
+            EmergencySession.status == "active",
+            EmergencyAlert.alert_method == "push"
+        )
+        for session_id, recipient_id in push_alerts:
+            recipients.setdefault(session_id, []).append(recipient_id)
+        
+        return emergency_registry.load(
+            ActiveEmergency(
+                session_id=session.id,
+                user_id=session.user_id,
+                user_name=user_name,
+                trigger_type=session.trigger_type,
+                triggered_at=session.triggered_at,
+                latitude=session.location_lat,
+                longitude=session.location_lng,
+                recipients=recipients.get(session.id, ())
+            )
+            for session, user_name in rows
+        )
+    finally:
+        db.close()
+
+# Background alert delivery
+alert_dispatcher = AlertDispatcher(
+    socket_manager,
+    workers=settings.ALERT_DISPATCH_WORKERS,
+    concurrency=settings.ALERT_DISPATCH_CONCURRENCY
+)
+socket_manager.alert_dispatcher = alert_dispatcher
+
+# One timer wheel drives escalations, session expiry and safe-walk deadlines
+timer_wheel = TimerWheel(tick=1.0)
+escalation_scheduler = EscalationScheduler(
+    timer_wheel,
+    emergency_registry,
+    alert_dispatcher,
+    socket_manager,
+    live_tracker,
+    segment_store,
+    interval=settings.ESCALATION_INTERVAL,
+    max_steps=settings.ESCALATION_MAX_STEPS,
+    session_ttl=settings.EMERGENCY_SESSION_TTL
+)
+
+# Creating a session awaits the database between the registry check and the registry add, so a
+# user's concurrent triggers take turns and the later ones attach to the session just created
+trigger_locks = KeyedLocks()
+
+async def start_or_attach_emergency(db: AsyncSession, user: User, emergency_data: EmergencyTrigger) -> Dict[str, Any]:
+    """Shared trigger path for the API and automatic triggers"""
+    async with trigger_locks.hold(user.id):
+        active = emergency_registry.get_by_user(user.id)
+        if active:
+            return await EmergencyService.attach_to_emergency(
+                db, user, active, emergency_data, emergency_registry, socket_manager
+            )
+        
+        result = await EmergencyService.trigger_emergency(
+            db, user, emergency_data, alert_dispatcher, emergency_registry
+        )
+        escalation_scheduler.schedule(emergency_registry.get(result["session_id"]))
+        return result
+
+async def notify_check_in_due(walk: SafeWalk):
+    await socket_manager.emit_to_user(walk.user_id, "safe_walk_check_in_due", {
+        "walk_id": walk.walk_id,
+        "deadline": walk.deadline.isoformat(),
+        "grace_period": settings.SAFE_WALK_GRACE_PERIOD
+    })
+
+async def trigger_missed_check_in(walk: SafeWalk):
+    """A safe walk went unanswered past its grace period: raise an automatic emergency"""
+    try:
+        async with AsyncSessionLocal() as db:
+            user = await db.scalar(ACTIVE_USER_BY_ID, {"user_id": walk.user_id})
+            result = None
+            if user:
+                result = await start_or_attach_emergency(db, user, EmergencyTrigger(
+                    trigger_type="automatic",
+                    location=LocationData(latitude=walk.latitude, longitude=walk.longitude)
+                    if walk.has_location else None
+                ))
+            
+            await db.execute(
+                update(SafeWalkSession)
+                .where(SafeWalkSession.id == walk.walk_id, SafeWalkSession.status == "active")
+                .values(
+                    status="missed",
+                    ended_at=datetime.utcnow(),
+                    emergency_session_id=result["session_id"] if result else None
+                )
+            )
+            await db.commit()
+    except Exception as e:
+        print(f"Safe walk auto-trigger error for walk {walk.walk_id}: {e}")
+        return
+    
+    await socket_manager.emit_to_user(walk.user_id, "safe_walk_missed", {
+        "walk_id": walk.walk_id,
+        "session_id": result["session_id"] if result else None
+    })
+
+safe_walk_tracker = SafeWalkTracker(
+    timer_wheel,
+    notify_check_in_due,
+    trigger_missed_check_in,
+    grace=settings.SAFE_WALK_GRACE_PERIOD
+)
+
+def load_active_safe_walks() -> int:
+    db = SessionLocal()
+    try:
+        rows = db.query(SafeWalkSession).filter(SafeWalkSession.status == "active").all()
+        for row in rows:
+            safe_walk_tracker.start(SafeWalk(
+                walk_id=row.id,
+                user_id=row.user_id,
+                interval=row.check_in_interval,
+                deadline=row.next_deadline,
+                latitude=row.last_lat,
+                longitude=row.last_lng
+            ))
+        return len(rows)
+    finally:
+        db.close()
+
+class VoiceTriggerService:
+    """Phrase automata for streamed transcripts and the voice trigger they fire"""
+    
+    def __init__(self, phrase_cache: PhraseCache, max_users: int = 10_000):
+        self.phrase_cache = phrase_cache
+        self.max_users = max_users
+        # user id -> keyword templates of the active phrases enrolled with audio, least recently used first
+        self.spotters: "OrderedDict[str, Tuple[KeywordSpotter, ...]]" = OrderedDict()
+    
+    def invalidate(self, user_id: str):
+        self.phrase_cache.invalidate(user_id)
+        self.spotters.pop(user_id, None)
+    
+    async def phrases(self, user_id: str) -> PhraseSet:
+        """The user's compiled active phrases; only a cache miss touches the database"""
+        return await self.phrase_cache.load_active(user_id, self._load_active_phrases)
+    
+    @staticmethod
+    async def _load_active_phrases(user_id: str) -> List[tuple]:
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(select(VoicePhrase.id, VoicePhrase.phrase, VoicePhrase.action).where(
+                VoicePhrase.user_id == user_id,
+                VoicePhrase.is_active == True
+            ).order_by(VoicePhrase.created_at))).all()
+    
+    async def automaton(self, user_id: str) -> PhraseAutomaton:
+        return (await self.phrases(user_id)).automaton
+    
+    async def spotters_for(self, user_id: str) -> Tuple[KeywordSpotter, ...]:
+        if user_id in self.spotters:
+            self.spotters.move_to_end(user_id)
+            return self.spotters[user_id]
+        
+        generation = self.phrase_cache.generation
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(select(VoicePhrase.id, VoicePhraseKeyword.templates).join(
+                VoicePhraseKeyword, VoicePhraseKeyword.phrase_id == VoicePhrase.id
+            ).where(
+                VoicePhrase.user_id == user_id,
+                VoicePhrase.is_active == True
+            ))).all()
+        spotters = tuple(KeywordSpotter.from_bytes(row.id, row.templates) for row in rows)
+        if generation == self.phrase_cache.generation:
+            self.spotters[user_id] = spotters
+            while len(self.spotters) > self.max_users:
+                self.spotters.popitem(last=False)
+        return spotters
+    
+    async def trigger(
+        self, user_id: str, phrase: Optional[CompiledPhrase], confidence: Optional[float]
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            async with AsyncSessionLocal() as db:
+                user = await db.scalar(ACTIVE_USER_BY_ID, {"user_id": user_id})
+                if not user:
+                    return None
+                last_fix = await db.scalar(select(UserLocation).where(
+                    UserLocation.user_id == user_id
+                ).order_by(UserLocation.timestamp.desc()).limit(1))
+                return await start_or_attach_emergency(db, user, EmergencyTrigger(
+                    trigger_type="voice",
+                    phrase=phrase.source if phrase else None,
+                    confidence=confidence,
+                    action=phrase.action if phrase else None,
+                    location=LocationData(latitude=last_fix.latitude, longitude=last_fix.longitude)
+                    if last_fix else None
+                ))
+        except Exception as e:
+            print(f"Voice trigger error for user {user_id}: {e}")
+            return None
+
+voice_trigger_service = VoiceTriggerService(phrase_cache, max_users=settings.VOICE_CACHE_MAX_USERS)
+socket_manager.voice_trigger = voice_trigger_service
+
+def enroll_keyword_spotter(phrase_id: str, enrollment_audio: List[str]) -> KeywordSpotter:
+    """Decode and validate enrollment takes; raises HTTPException on bad input"""
+    if not settings.KEYWORD_SPOTTING_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Server-side keyword spotting is not enabled"
+        )
+    if len(enrollment_audio) > settings.KEYWORD_SPOTTING_MAX_TAKES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.KEYWORD_SPOTTING_MAX_TAKES} enrollment recordings are allowed"
+        )
+    
+    max_bytes = int(settings.KEYWORD_SPOTTING_MAX_TAKE_SECONDS * keyword_extractor.sample_rate) * 2
+    try:
+        takes = [base64.b64decode(take, validate=True) for take in enrollment_audio]
+    except (binascii.Error, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Enrollment audio must be base64-encoded PCM16"
+        )
+    if any(len(take) > max_bytes for take in takes):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Enrollment recordings are limited to {settings.KEYWORD_SPOTTING_MAX_TAKE_SECONDS:g} seconds"
+        )
+    
+    try:
+        return KeywordSpotter.enroll(phrase_id, takes, keyword_extractor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@app.on_event("startup")
+async def start_background_tasks():
+    active = load_active_emergencies()
+    print(f"Loaded {active} active emergency session(s)")
+    load_shedder.start()
+    live_tracker.start()
+    alert_dispatcher.start()
+    resumed = alert_dispatcher.resume()
+    if resumed:
+        print(f"Resumed alert delivery for {resumed} emergency session(s)")
+    escalation_scheduler.rebuild()
+    walks = load_active_safe_walks()
+    if walks:
+        print(f"Restored {walks} active safe walk(s)")
+    timer_wheel.start()
+    wal_checkpointer.start()
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    await load_shedder.stop()
+    await timer_wheel.stop()
+    await alert_dispatcher.stop()
+    await live_tracker.stop()
+    await receipt_batcher.flush()
+    await segment_store.close_all()
+    await NotificationService.close()
+    await wal_checkpointer.stop()
 
 # API Routes
 @app.post(f"{settings.API_V1_STR}/auth/google", response_model=TokenResponse)
-async def google_auth(auth_request: GoogleAuthRequest, db: Session = Depends(get_db)):
+async def google_auth(auth_request: GoogleAuthRequest, db: AsyncSession = Depends(get_db)):
     """Real Google OAuth authentication"""
     result = await AuthService.google_auth(db, auth_request.access_token)
     return result
@@ -568,17 +1857,25 @@ async def get_profile(current_user: User = Depends(get_current_user)):
 async def update_profile(
     profile_update: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update user profile"""
     update_data = profile_update.dict(exclude_unset=True)
     
+    if update_data.get("phone"):
+        update_data["phone"] = normalize_phone(update_data["phone"], settings.DEFAULT_PHONE_COUNTRY_CODE)
+        if update_data["phone"] is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid phone number"
+            )
+    
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
     current_user.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
     
     return {
         "success": True,
@@ -596,8 +1893,12 @@ async def update_profile(
     }
 
 @app.get(f"{settings.API_V1_STR}/users/emergency-contacts")
-async def get_emergency_contacts(current_user: User = Depends(get_current_user)):
+async def get_emergency_contacts(
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
     """Get user's emergency contacts"""
+    contacts = await db.scalars(CONTACTS_BY_USER, {"user_id": current_user_id})
     return [
         {
             "id": contact.id,
@@ -607,25 +1908,32 @@ async def get_emergency_contacts(current_user: User = Depends(get_current_user))
             "priority_order": contact.priority_order,
             "created_at": contact.created_at.isoformat()
         }
-        for contact in current_user.emergency_contacts
+        for contact in contacts
     ]
 
 @app.post(f"{settings.API_V1_STR}/users/emergency-contacts")
 async def add_emergency_contact(
     contact_data: EmergencyContactCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Add emergency contact"""
+    phone = normalize_phone(contact_data.phone, settings.DEFAULT_PHONE_COUNTRY_CODE)
+    if phone is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid phone number"
+        )
+    
     contact = EmergencyContact(
         id=str(uuid.uuid4()),
         user_id=current_user.id,
-        **contact_data.dict()
+        **{**contact_data.dict(), "phone": phone}
     )
     
     db.add(contact)
-    db.commit()
-    db.refresh(contact)
+    await db.commit()
+    await db.refresh(contact)
     
     return {
         "id": contact.id,
@@ -640,13 +1948,13 @@ async def add_emergency_contact(
 async def remove_emergency_contact(
     contact_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Remove emergency contact"""
-    contact = db.query(EmergencyContact).filter(
+    contact = await db.scalar(select(EmergencyContact).where(
         EmergencyContact.id == contact_id,
         EmergencyContact.user_id == current_user.id
-    ).first()
+    ))
     
     if not contact:
         raise HTTPException(
@@ -654,77 +1962,124 @@ async def remove_emergency_contact(
             detail="Emergency contact not found"
         )
     
-    db.delete(contact)
-    db.commit()
+    await db.delete(contact)
+    await db.commit()
     return {"success": True, "message": "Emergency contact removed"}
 
+async def get_active_phrases(db: AsyncSession, user_id: str) -> List[VoicePhrase]:
+    """Uses the partial index on active phrases instead of loading the user's history"""
+    return (await db.scalars(ACTIVE_PHRASES_BY_USER, {"user_id": user_id})).all()
+
+def validate_phrase_action(action: str):
+    if action not in PHRASE_ACTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Phrase action must be one of: {', '.join(PHRASE_ACTIONS)}"
+        )
+
 @app.post(f"{settings.API_V1_STR}/voice/train-phrase")
 async def train_phrase(
     phrase_data: VoicePhraseCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Train new voice phrase"""
-    # Deactivate existing phrases
-    db.query(VoicePhrase).filter(VoicePhrase.user_id == current_user.id).update(
-        {"is_active": False}
-    )
+    validate_phrase_action(phrase_data.action)
+    phrase = phrase_data.phrase.lower().strip()
+    
+    # Retraining the same words replaces that phrase; other phrases stay active
+    active_phrases = [p for p in await get_active_phrases(db, current_user.id) if p.phrase != phrase]
+    if len(active_phrases) >= settings.VOICE_MAX_ACTIVE_PHRASES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.VOICE_MAX_ACTIVE_PHRASES} voice phrases can be active"
+        )
+    
+    phrase_id = str(uuid.uuid4())
+    spotter = None
+    if phrase_data.enrollment_audio:
+        spotter = enroll_keyword_spotter(phrase_id, phrase_data.enrollment_audio)
+    
+    await db.execute(update(VoicePhrase).where(
+        VoicePhrase.user_id == current_user.id,
+        VoicePhrase.is_active == True,
+        VoicePhrase.phrase == phrase
+    ).values(is_active=False))
     
     # Create new phrase
     voice_phrase = VoicePhrase(
-        id=str(uuid.uuid4()),
+        id=phrase_id,
         user_id=current_user.id,
-        phrase=phrase_data.phrase.lower().strip(),
+        phrase=phrase,
         phrase_password_hash=get_password_hash(phrase_data.phrase_password),
+        action=phrase_data.action,
         is_active=True
     )
     
     db.add(voice_phrase)
-    db.commit()
-    db.refresh(voice_phrase)
+    if spotter:
+        db.add(VoicePhraseKeyword(phrase_id=phrase_id, user_id=current_user.id, templates=spotter.to_bytes()))
+    await db.commit()
+    await db.refresh(voice_phrase)
+    voice_trigger_service.invalidate(current_user.id)
     
     return {
         "success": True,
         "phrase_id": voice_phrase.id,
+        "action": voice_phrase.action,
+        "keyword_spotting": spotter is not None,
         "message": "Voice phrase trained successfully"
     }
 
 @app.get(f"{settings.API_V1_STR}/voice/status")
-async def get_voice_status(current_user: User = Depends(get_current_user)):
+async def get_voice_status(
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
     """Get user's voice phrase status"""
-    active_phrase = None
-    for phrase in current_user.voice_phrases:
-        if phrase.is_active:
-            active_phrase = phrase
-            break
-    
-    if active_phrase:
+    active_phrases = await get_active_phrases(db, current_user_id)
+    if active_phrases:
         return {
             "has_phrase": True,
-            "phrase": active_phrase.phrase,
-            "created_at": active_phrase.created_at.isoformat()
+            # The oldest phrase, for clients that support only one
+            "phrase": active_phrases[0].phrase,
+            "created_at": active_phrases[0].created_at.isoformat(),
+            "phrases": [
+                {
+                    "id": p.id,
+                    "phrase": p.phrase,
+                    "action": p.action,
+                    "created_at": p.created_at.isoformat()
+                }
+                for p in active_phrases
+            ]
         }
     
-    return {"has_phrase": False}
+    return {"has_phrase": False, "phrases": []}
 
 @app.put(f"{settings.API_V1_STR}/voice/update-phrase")
 async def update_phrase(
     update_data: VoicePhraseUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update voice phrase"""
-    active_phrase = None
-    for phrase in current_user.voice_phrases:
-        if phrase.is_active:
-            active_phrase = phrase
-            break
-    
-    if not active_phrase:
+    active_phrases = await get_active_phrases(db, current_user.id)
+    if update_data.phrase_id:
+        active_phrases = [p for p in active_phrases if p.id == update_data.phrase_id]
+    elif len(active_phrases) > 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="phrase_id is required when several phrases are active"
+        )
+    if not active_phrases:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No active phrase found"
         )
+    active_phrase = active_phrases[0]
+    if update_data.action is not None:
+        validate_phrase_action(update_data.action)
     
     # Verify old password
     if not verify_password(update_data.old_password, active_phrase.phrase_password_hash):
@@ -734,43 +2089,69 @@ async def update_phrase(
         )
     
     # Update phrase
-    active_phrase.phrase = update_data.phrase.lower().strip()
+    phrase = update_data.phrase.lower().strip()
+    if phrase != active_phrase.phrase:
+        # Enrollment audio was of the old wording
+        await db.execute(delete(VoicePhraseKeyword).where(VoicePhraseKeyword.phrase_id == active_phrase.id))
+    active_phrase.phrase = phrase
     active_phrase.phrase_password_hash = get_password_hash(update_data.new_password)
+    if update_data.action is not None:
+        active_phrase.action = update_data.action
     active_phrase.updated_at = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
+    voice_trigger_service.invalidate(current_user.id)
     
     return {
         "success": True,
         "message": "Voice phrase updated successfully"
     }
 
+@app.delete(f"{settings.API_V1_STR}/voice/phrases/{{phrase_id}}")
+async def remove_phrase(
+    phrase_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Deactivate one of the user's voice phrases"""
+    removed = (await db.execute(update(VoicePhrase).where(
+        VoicePhrase.id == phrase_id,
+        VoicePhrase.user_id == current_user_id,
+        VoicePhrase.is_active == True
+    ).values(is_active=False))).rowcount
+    if not removed:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Voice phrase not found"
+        )
+    
+    await db.commit()
+    voice_trigger_service.invalidate(current_user_id)
+    return {"success": True, "message": "Voice phrase removed"}
+
 @app.post(f"{settings.API_V1_STR}/voice/verify-phrase")
 async def verify_phrase(
     transcript: str,
     confidence: float = 0.8,
-    current_user: User = Depends(get_current_user)
+    current_user_id: str = Depends(get_current_user_id)
 ):
     """Verify if spoken text matches trained phrase"""
-    active_phrase = None
-    for phrase in current_user.voice_phrases:
-        if phrase.is_active:
-            active_phrase = phrase
-            break
-    
-    if not active_phrase:
+    # Served from the in-memory phrase cache; no database session or ORM load per call
+    phrases = await voice_trigger_service.phrases(current_user_id)
+    if not phrases:
         return {"match": False, "message": "No active phrase found"}
     
-    # Simple phrase matching
-    spoken_lower = transcript.lower().strip()
-    phrase_lower = active_phrase.phrase.lower().strip()
-    
-    # Check if phrase is contained in spoken text
-    if phrase_lower in spoken_lower and confidence >= 0.6:
+    # One pass over the transcript for all of the user's phrases; tolerates punctuation,
+    # spacing, number spelling and small recognition errors
+    phrase, match_type, score = phrases.match(transcript)
+    if phrase and confidence >= 0.6:
         return {
             "match": True,
-            "phrase_id": active_phrase.id,
+            "phrase_id": phrase.phrase_id,
+            "action": phrase.action,
             "confidence": confidence,
+            "match_type": match_type,
+            "score": round(score, 3),
             "message": "Phrase matched successfully"
         }
     
@@ -780,11 +2161,11 @@ async def verify_phrase(
 async def update_location(
     location_data: LocationData,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update user location"""
     location = UserLocation(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         user_id=current_user.id,
         latitude=location_data.latitude,
         longitude=location_data.longitude,
@@ -792,7 +2173,7 @@ async def update_location(
     )
     
     db.add(location)
-    db.commit()
+    await db.commit()
     
     return {"success": True, "message": "Location updated successfully"}
 
@@ -802,83 +2183,74 @@ async def get_nearby_users(
     lng: float,
     radius: float = 3.0,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get nearby SafeGuard users"""
-    from sqlalchemy import text
-    
-    recent_time = datetime.utcnow() - timedelta(minutes=5)
-    
-    query = text("""
-        SELECT DISTINCT u.*, 
-               (6371 * acos(cos(radians(:lat)) * cos(radians(ul.latitude)) * 
-               cos(radians(ul.longitude) - radians(:lng)) + 
-               sin(radians(:lat)) * sin(radians(ul.latitude)))) AS distance
-        FROM users u
-        JOIN user_locations ul ON u.id = ul.user_id
-        WHERE ul.timestamp > :recent_time
-        AND u.id != :user_id
-        AND u.is_active = 1
-        HAVING distance < :radius
-        ORDER BY distance
-        LIMIT 10
-    """)
-    
-    result = db.execute(query, {
+    result = await db.execute(NEARBY_USERS_SQL, {
         "lat": lat,
         "lng": lng,
-        "recent_time": recent_time,
+        "recent_time": datetime.utcnow() - timedelta(minutes=5),
         "user_id": current_user.id,
-        "radius": radius
+        "radius": radius,
+        "limit": 10
     })
     
-    nearby_users = []
-    for row in result:
-        user = db.query(User).filter(User.id == row.id).first()
-        if user:
-            nearby_users.append({
-                "id": user.id,
-                "name": user.name,
-                "distance": round(row.distance, 2)
-            })
+    # One row per user ordered by distance; hydrate them all in one query
+    distances = {row.id: row.distance for row in result}
+    
+    users_by_id = {}
+    if distances:
+        users_by_id = {
+            u.id: u for u in await db.scalars(select(User).where(User.id.in_(list(distances))))
+        }
+    
+    nearby_users = [
+        {
+            "id": user_id,
+            "name": users_by_id[user_id].name,
+            "distance": round(distance, 2)
+        }
+        for user_id, distance in distances.items()
+        if user_id in users_by_id
+    ]
     
     return {"users": nearby_users}
 
 @app.post(f"{settings.API_V1_STR}/emergency/trigger")
 async def trigger_emergency(
     emergency_data: EmergencyTrigger,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Trigger emergency alert"""
+    """Trigger emergency alert (repeat triggers attach to the active session)"""
+    idempotency_key = request.headers.get("Idempotency-Key")
+    if idempotency_key:
+        cached = trigger_idempotency.get(current_user.id, idempotency_key)
+        if cached is not None:
+            return cached
+    
     try:
-        result = await EmergencyService.trigger_emergency(
-            db, current_user, emergency_data, socket_manager
-        )
-        return result
+        result = await start_or_attach_emergency(db, current_user, emergency_data)
     except Exception as e:
         print(f"Emergency trigger error: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to trigger emergency: {str(e)}"
         )
+    
+    if idempotency_key:
+        trigger_idempotency.put(current_user.id, idempotency_key, result)
+    return result
 
 @app.post(f"{settings.API_V1_STR}/emergency/dismiss")
 async def dismiss_emergency(
     session_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Dismiss emergency alert"""
-    from sqlalchemy import and_
-    
-    session = db.query(EmergencySession).filter(
-        and_(
-            EmergencySession.id == session_id,
-            EmergencySession.user_id == current_user.id,
-            EmergencySession.status == "active"
-        )
-    ).first()
+    session = await db.scalar(ACTIVE_SESSION_FOR_USER, {"session_id": session_id, "user_id": current_user.id})
     
     if not session:
         raise HTTPException(
@@ -889,15 +2261,21 @@ async def dismiss_emergency(
     # Update session status
     session.status = "dismissed"
     session.resolved_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
+    emergency_registry.remove(session_id)
+    escalation_scheduler.cancel(session_id)
+    live_tracker.end(session_id)
+    await segment_store.close(session_id)
     
-    # Broadcast dismissal
+    # Notify only the recipients of this session, then drop its room
     dismissal_data = {
         "session_id": session_id,
         "user_id": current_user.id,
         "dismissed_at": session.resolved_at.isoformat()
     }
-    await socket_manager.broadcast("emergency_dismissed", dismissal_data)
+    room = emergency_room(session_id)
+    await socket_manager.emit_to_room(room, "emergency_dismissed", dismissal_data)
+    await socket_manager.close_room(room)
     
     return {
         "success": True,
@@ -905,34 +2283,423 @@ async def dismiss_emergency(
     }
 
 @app.get(f"{settings.API_V1_STR}/emergency/status")
-async def get_emergency_status(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_emergency_status(current_user_id: str = Depends(get_current_user_id)):
+    """Get current emergency status (served from the in-memory registry)"""
+    entry = emergency_registry.get_by_user(current_user_id)
+    if entry:
+        return entry.to_status()
+    
+    return {"active": False}
+
+@app.get(f"{settings.API_V1_STR}/emergency/active-nearby")
+async def get_active_emergencies_nearby(
+    lat: float,
+    lng: float,
+    radius: float = Query(3.0, gt=0, le=settings.NEARBY_RADIUS_KM),
+    current_user_id: str = Depends(get_current_user_id)
 ):
-    """Get current emergency status"""
-    from sqlalchemy import and_
+    """List active emergencies near a point that the caller was alerted about (served from the in-memory registry)"""
+    matches = emergency_registry.near(
+        lat, lng, radius, limit=50,
+        where=lambda entry: current_user_id in entry.recipients and entry.user_id != current_user_id
+    )
+    return {
+        "emergencies": [
+            {
+                "session_id": entry.session_id,
+                "user_id": entry.user_id,
+                "user_name": entry.user_name,
+                "trigger_type": entry.trigger_type,
+                "triggered_at": entry.triggered_at.isoformat(),
+                "location": {
+                    "latitude": entry.latitude,
+                    "longitude": entry.longitude
+                },
+                "distance": round(distance, 2)
+            }
+            for entry, distance in matches
+        ]
+    }
+
+async def authorize_session_viewer(db: AsyncSession, session_id: str, user_id: str):
+    """The victim and everyone alerted about the session may access its evidence"""
+    entry = emergency_registry.get(session_id)
+    if entry and (user_id == entry.user_id or user_id in entry.recipients):
+        return
     
-    session = db.query(EmergencySession).filter(
-        and_(
-            EmergencySession.user_id == current_user.id,
-            EmergencySession.status == "active"
+    owner = await db.scalar(select(EmergencySession.id).where(
+        EmergencySession.id == session_id,
+        EmergencySession.user_id == user_id
+    ))
+    alerted = owner or await db.scalar(select(EmergencyAlert.id).where(
+        EmergencyAlert.emergency_session_id == session_id,
+        EmergencyAlert.recipient_id == user_id
+    ).limit(1))
+    if not alerted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Emergency session not found"
         )
-    ).first()
+
+@app.get(f"{settings.API_V1_STR}/emergency/{{session_id}}/audio/index")
+async def get_live_audio_index(
+    session_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """List the live audio segments received so far"""
+    await authorize_session_viewer(db, session_id, current_user_id)
+    index = segment_store.index(session_id)
+    if index is None:
+        return {"session_id": session_id, "size": 0, "mime_type": None, "segments": []}
+    return {"session_id": session_id, **index}
+
+@app.get(f"{settings.API_V1_STR}/emergency/{{session_id}}/audio")
+async def stream_live_audio(
+    session_id: str,
+    request: Request,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Serve live audio with HTTP Range support (sendfile when available, else mmap)"""
+    await authorize_session_viewer(db, session_id, current_user_id)
+    await db.close()
     
-    if session:
-        return {
-            "active": True,
-            "session_id": session.id,
-            "trigger_type": session.trigger_type,
-            "triggered_at": session.triggered_at.isoformat(),
-            "location": {
-                "latitude": session.location_lat,
-                "longitude": session.location_lng
-            } if session.location_lat and session.location_lng else None
-        }
+    index = segment_store.index(session_id)
+    if not index or index["size"] == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No audio received for this session yet"
+        )
+    return RangeFileResponse(
+        segment_store.data_path(session_id),
+        index["size"],
+        request.headers.get("range"),
+        media_type=index["mime_type"]
+    )
+
+@app.post(f"{settings.API_V1_STR}/emergency/recordings/uploads")
+async def create_recording_upload(
+    upload_data: RecordingUploadCreate,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Start a resumable upload of an emergency recording"""
+    content_type = upload_data.content_type.split(";")[0].strip().lower()
+    if content_type not in RECORDING_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported recording type: {upload_data.content_type}"
+        )
+    if upload_data.total_size is not None and not 0 < upload_data.total_size <= settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Recording exceeds {settings.MAX_FILE_SIZE} bytes"
+        )
+    
+    session = await db.scalar(select(EmergencySession.id).where(
+        EmergencySession.id == upload_data.session_id,
+        EmergencySession.user_id == current_user_id
+    ))
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Emergency session not found"
+        )
+    
+    upload_id = str(uuid.uuid4())
+    recording_store.create(upload_data.session_id, upload_id)
+    await db.execute(insert(RecordingUpload), [{
+        "id": upload_id,
+        "emergency_session_id": upload_data.session_id,
+        "user_id": current_user_id,
+        "content_type": content_type,
+        "total_size": upload_data.total_size,
+        "status": "uploading",
+        "created_at": datetime.utcnow()
+    }])
+    await db.commit()
+    
+    return {
+        "upload_id": upload_id,
+        "offset": 0,
+        "max_chunk_size": settings.MAX_UPLOAD_CHUNK_SIZE
+    }
+
+async def get_recording_upload(db: AsyncSession, upload_id: str, user_id: str) -> RecordingUpload:
+    upload = await db.scalar(select(RecordingUpload).where(
+        RecordingUpload.id == upload_id,
+        RecordingUpload.user_id == user_id
+    ))
+    if not upload:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    return upload
+
+@app.get(f"{settings.API_V1_STR}/emergency/recordings/uploads/{{upload_id}}")
+async def get_recording_upload_status(
+    upload_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Report how many bytes the server holds, so an interrupted client can resume"""
+    upload = await get_recording_upload(db, upload_id, current_user_id)
+    return {
+        "upload_id": upload.id,
+        "status": upload.status,
+        "offset": recording_store.offset(upload.emergency_session_id, upload.id)
+        if upload.status == "uploading" else upload.total_size,
+        "total_size": upload.total_size
+    }
+
+@app.patch(f"{settings.API_V1_STR}/emergency/recordings/uploads/{{upload_id}}")
+async def append_recording_chunk(
+    upload_id: str,
+    request: Request,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Append the raw request body at the offset given in the Upload-Offset header"""
+    upload = await get_recording_upload(db, upload_id, current_user_id)
+    session_id, total_size, upload_status = upload.emergency_session_id, upload.total_size, upload.status
+    await db.close()  # nothing else needs the database while the body streams in
+    
+    if upload_status != "uploading":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload already completed"
+        )
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Missing or invalid Upload-Offset header"
+        )
+    
+    try:
+        new_offset = await recording_store.append(session_id, upload_id, offset, request.stream(), total_size)
+    except UploadOffsetMismatch as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"Upload-Offset": str(e.expected)}
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except UploadClosed:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload already completed"
+        )
+    
+    return {"upload_id": upload_id, "offset": new_offset}
+
+@app.post(f"{settings.API_V1_STR}/emergency/recordings/uploads/{{upload_id}}/complete")
+async def complete_recording_upload(
+    upload_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Finalize an upload into the session's recording_path"""
+    # Appends hold the same lock, so the part file is not renamed under a chunk still being written,
+    # and a second complete waits here and then finds the upload already complete
+    async with recording_store.lock(upload_id):
+        upload = await get_recording_upload(db, upload_id, current_user_id)
+        if upload.status != "uploading":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Upload already completed"
+            )
+        
+        size = recording_store.offset(upload.emergency_session_id, upload.id)
+        if size == 0 or (upload.total_size is not None and size != upload.total_size):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload incomplete: {size} of {upload.total_size or 'unknown'} bytes received",
+                headers={"Upload-Offset": str(size)}
+            )
+        
+        recording_path = recording_store.finalize(
+            upload.emergency_session_id, upload.id, RECORDING_EXTENSIONS[upload.content_type]
+        )
+        upload.status = "complete"
+        upload.total_size = size
+        upload.completed_at = datetime.utcnow()
+        await db.execute(
+            update(EmergencySession)
+            .where(EmergencySession.id == upload.emergency_session_id)
+            .values(recording_path=recording_path)
+        )
+        await db.commit()
+    
+    return {
+        "success": True,
+        "session_id": upload.emergency_session_id,
+        "recording_path": recording_path,
+        "size": size
+    }
+
+@app.post(f"{settings.API_V1_STR}/safe-walk/start")
+async def start_safe_walk(
+    walk_data: SafeWalkStart,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Start a safe walk that expects periodic check-ins"""
+    if not settings.SAFE_WALK_MIN_INTERVAL <= walk_data.check_in_interval <= settings.SAFE_WALK_MAX_INTERVAL:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Check-in interval must be between {settings.SAFE_WALK_MIN_INTERVAL} "
+                   f"and {settings.SAFE_WALK_MAX_INTERVAL} seconds"
+        )
+    # The check and the insert await the database in between, so a user's concurrent starts take turns
+    async with trigger_locks.hold(current_user_id):
+        if safe_walk_tracker.get_by_user(current_user_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A safe walk is already active"
+            )
+        
+        now = datetime.utcnow()
+        walk = SafeWalk(
+            walk_id=str(uuid.uuid4()),
+            user_id=current_user_id,
+            interval=walk_data.check_in_interval,
+            deadline=now + timedelta(seconds=walk_data.check_in_interval),
+            latitude=walk_data.location.latitude if walk_data.location else None,
+            longitude=walk_data.location.longitude if walk_data.location else None
+        )
+        await db.execute(insert(SafeWalkSession), [{
+            "id": walk.walk_id,
+            "user_id": current_user_id,
+            "status": "active",
+            "check_in_interval": walk.interval,
+            "next_deadline": walk.deadline,
+            "last_lat": walk.latitude,
+            "last_lng": walk.longitude,
+            "started_at": now
+        }])
+        await db.commit()
+        safe_walk_tracker.start(walk, now)
+    
+    return {"success": True, **walk.to_status()}
+
+@app.post(f"{settings.API_V1_STR}/safe-walk/check-in")
+async def check_in_safe_walk(
+    check_in: SafeWalkCheckIn,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Check in on an active safe walk and push its deadline back"""
+    walk = safe_walk_tracker.get(check_in.walk_id)
+    if not walk or walk.user_id != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Safe walk not found or already ended"
+        )
+    
+    now = datetime.utcnow()
+    safe_walk_tracker.check_in(
+        walk.walk_id,
+        check_in.location.latitude if check_in.location else None,
+        check_in.location.longitude if check_in.location else None,
+        now
+    )
+    await db.execute(
+        update(SafeWalkSession).where(SafeWalkSession.id == walk.walk_id).values(
+            next_deadline=walk.deadline,
+            last_check_in_at=now,
+            last_lat=walk.latitude,
+            last_lng=walk.longitude
+        )
+    )
+    await db.commit()
+    
+    return {"success": True, **walk.to_status()}
+
+@app.post(f"{settings.API_V1_STR}/safe-walk/end")
+async def end_safe_walk(
+    walk_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """End a safe walk"""
+    walk = safe_walk_tracker.get(walk_id)
+    if not walk or walk.user_id != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Safe walk not found or already ended"
+        )
+    
+    safe_walk_tracker.end(walk_id)
+    await db.execute(
+        update(SafeWalkSession)
+        .where(SafeWalkSession.id == walk_id, SafeWalkSession.status == "active")
+        .values(status="completed", ended_at=datetime.utcnow())
+    )
+    await db.commit()
+    
+    return {
+        "success": True,
+        "message": "Safe walk ended"
+    }
+
+@app.get(f"{settings.API_V1_STR}/safe-walk/status")
+async def get_safe_walk_status(current_user_id: str = Depends(get_current_user_id)):
+    """Get the current safe walk (served from memory)"""
+    walk = safe_walk_tracker.get_by_user(current_user_id)
+    if walk:
+        return walk.to_status()
     
     return {"active": False}
 
+@app.post(f"{settings.API_V1_STR}/emergency/alerts/receipts")
+async def submit_delivery_receipts(
+    batch: DeliveryReceiptBatch,
+    current_user_id: str = Depends(get_current_user_id)
+):
+    """Submit delivery receipts for alerts addressed to the current user"""
+    for receipt in batch.receipts:
+        receipt_batcher.add(receipt.alert_id, receipt.status, receipt.delivered_at, recipient_id=current_user_id)
+    
+    return {"success": True, "accepted": len(batch.receipts)}
+
+# Twilio MessageStatus -> EmergencyAlert.status
+SMS_STATUS_MAP = {
+    "queued": "sent",
+    "sending": "sent",
+    "sent": "sent",
+    "delivered": "delivered",
+    "undelivered": "failed",
+    "failed": "failed"
+}
+
+@app.post(f"{settings.API_V1_STR}/webhooks/sms/status")
+async def sms_status_webhook(alert_id: str, request: Request):
+    """SMS provider status callback (one receipt per request, written in bulk)"""
+    params = {key: value for key, value in (await request.form()).items()}
+    
+    if settings.TWILIO_VALIDATE_WEBHOOKS:
+        url = f"{settings.PUBLIC_BASE_URL}{request.url.path}?{request.url.query}"
+        provider = NotificationService.get_transport().provider
+        if not provider.validate_signature(url, params, request.headers.get("X-Twilio-Signature")):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Invalid webhook signature"
+            )
+    
+    alert_status = SMS_STATUS_MAP.get(params.get("MessageStatus"))
+    if alert_status:
+        receipt_batcher.add(alert_id, alert_status)
+    
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
 # Mount Socket.IO app
 app.mount("/socket.io", socket_manager.get_asgi_app())
 
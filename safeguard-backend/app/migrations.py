@@ -0,0 +1,145 @@
+"""Schema migrations for the API database (see app.core.migrations.upgrade)
+
+Append new migrations with the next version number and never edit one that
+has shipped. New databases are created straight from the models, so every
+change here must also be made to the models. Migrations 1-3 reproduce what
+earlier releases added at startup and tolerate databases that already have it.
+"""
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import (
+    Boolean, Column, DateTime, Float, ForeignKey, LargeBinary, MetaData, String, Table, bindparam, column, insert,
+    inspect, select, table, update
+)
+from sqlalchemy.engine import Connection
+from app.config import settings
+from app.core.ids import uuid7
+from app.core.migrations import Migration
+from app.utils.helpers import normalize_phone
+
+def add_voice_phrase_action(connection: Connection):
+    if "action" not in {column["name"] for column in inspect(connection).get_columns("voice_phrases")}:
+        connection.exec_driver_sql("ALTER TABLE voice_phrases ADD COLUMN action VARCHAR DEFAULT 'alarm'")
+
+def index_active_voice_phrases(connection: Connection):
+    # Partial on SQLite, like the model's sqlite_where; a plain index elsewhere
+    where = " WHERE is_active = 1" if connection.dialect.name == "sqlite" else ""
+    connection.exec_driver_sql(
+        f"CREATE INDEX IF NOT EXISTS ix_voice_phrases_active_user ON voice_phrases (user_id){where}"
+    )
+
+HOT_PATH_INDEXES = (
+    # contact phone -> app user during trigger fan-out
+    "CREATE INDEX IF NOT EXISTS ix_users_phone ON users (phone)",
+    "CREATE INDEX IF NOT EXISTS ix_emergency_contacts_user_id ON emergency_contacts (user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_emergency_sessions_user_status ON emergency_sessions (user_id, status)",
+    "CREATE INDEX IF NOT EXISTS ix_emergency_alerts_emergency_session_id ON emergency_alerts (emergency_session_id)",
+    # a user's latest fix
+    "CREATE INDEX IF NOT EXISTS ix_user_locations_user_timestamp ON user_locations (user_id, timestamp)",
+    # everyone seen in the last few minutes (proximity queries)
+    "CREATE INDEX IF NOT EXISTS ix_user_locations_timestamp ON user_locations (timestamp)",
+)
+
+def add_hot_path_indexes(connection: Connection):
+    for statement in HOT_PATH_INDEXES:
+        connection.exec_driver_sql(statement)
+
+# Version 4 shapes of the re-keyed tables, frozen here so later model changes can't alter this migration
+_v4 = MetaData()
+Table("users", _v4, Column("id", String, primary_key=True))
+Table("emergency_sessions", _v4, Column("id", String, primary_key=True))
+_user_locations_v4 = Table(
+    "user_locations_v4",
+    _v4,
+    Column("id", LargeBinary(16), primary_key=True),
+    Column("user_id", String, ForeignKey("users.id"), nullable=False),
+    Column("latitude", Float, nullable=False),
+    Column("longitude", Float, nullable=False),
+    Column("accuracy", Float),
+    Column("timestamp", DateTime),
+    Column("is_emergency", Boolean)
+)
+_emergency_alerts_v4 = Table(
+    "emergency_alerts_v4",
+    _v4,
+    Column("id", LargeBinary(16), primary_key=True),
+    Column("emergency_session_id", String, ForeignKey("emergency_sessions.id"), nullable=False),
+    Column("recipient_type", String, nullable=False),
+    Column("recipient_id", String, nullable=False),
+    Column("alert_method", String, nullable=False),
+    Column("status", String),
+    Column("sent_at", DateTime),
+    Column("delivered_at", DateTime)
+)
+
+def _unix_ms(value) -> int:
+    # Stored timestamps are naive UTC (utcnow / CURRENT_TIMESTAMP); SQLite hands back the text
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return int((value or datetime.utcnow()).replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+def _rebuild(connection: Connection, new_table: Table, name: str, key_column: str, new_key, indexes, batch=10_000):
+    """Copy `name` into `new_table` with id = new_key(row[key_column]) in key_column order, then swap the tables
+
+    Rebuilding rather than updating in place leaves the primary key index
+    freshly packed; SQLite can't change a column's type in place anyway.
+    """
+    new_table.create(connection)
+    columns = [c.name for c in new_table.columns if c.name != "id"]
+    if connection.dialect.name == "sqlite":
+        # One INSERT ... SELECT calling new_key as a SQL function, ~4x faster than batches through Core
+        connection.connection.driver_connection.create_function("new_key", 1, new_key)
+        connection.exec_driver_sql(
+            f"INSERT INTO {new_table.name} (id, {', '.join(columns)}) "
+            f"SELECT new_key({key_column}), {', '.join(columns)} FROM {name} ORDER BY {key_column}"
+        )
+    else:
+        old = table(name, column("id", String), *(column(c.name, c.type) for c in new_table.columns if c.name != "id"))
+        rows = connection.execution_options(yield_per=batch).execute(select(old).order_by(old.c[key_column]))
+        for partition in rows.partitions():
+            connection.execute(insert(new_table), [
+                {**row._mapping, "id": new_key(row._mapping[key_column])} for row in partition
+            ])
+    connection.exec_driver_sql(f"DROP TABLE {name}")
+    connection.exec_driver_sql(f"ALTER TABLE {new_table.name} RENAME TO {name}")
+    for index_name, indexed in indexes:
+        connection.exec_driver_sql(f"CREATE INDEX {index_name} ON {name} ({indexed})")
+
+def time_ordered_binary_ids(connection: Connection):
+    # Location ids are never exposed, so history is re-keyed by when each fix was taken
+    _rebuild(
+        connection, _user_locations_v4, "user_locations", "timestamp",
+        lambda timestamp: uuid7(_unix_ms(timestamp)).bytes,
+        [("ix_user_locations_user_timestamp", "user_id, timestamp"), ("ix_user_locations_timestamp", "timestamp")]
+    )
+    # Alert ids are held by clients and SMS status callbacks, so they keep their value
+    _rebuild(
+        connection, _emergency_alerts_v4, "emergency_alerts", "id",
+        lambda alert_id: uuid.UUID(alert_id).bytes,
+        [("ix_emergency_alerts_emergency_session_id", "emergency_session_id")]
+    )
+
+def normalize_stored_phones(connection: Connection):
+    # Phones are normalized on write, and the trigger fan-out matches contacts to users on the
+    # E.164 form, so rows written before that are rewritten too; unparseable ones are left as they are
+    for name in ("users", "emergency_contacts"):
+        phones = table(name, column("id", String), column("phone", String))
+        changed = []
+        rows = connection.execute(select(phones.c.id, phones.c.phone).where(phones.c.phone.is_not(None)))
+        for row_id, phone in rows:
+            normalized = normalize_phone(phone, settings.DEFAULT_PHONE_COUNTRY_CODE)
+            if normalized and normalized != phone:
+                changed.append({"row_id": row_id, "normalized": normalized})
+        if changed:
+            connection.execute(
+                update(phones).where(phones.c.id == bindparam("row_id")).values(phone=bindparam("normalized")),
+                changed
+            )
+
+MIGRATIONS = [
+    Migration(1, "voice_phrases_action", add_voice_phrase_action),
+    Migration(2, "voice_phrases_active_index", index_active_voice_phrases),
+    Migration(3, "hot_path_indexes", add_hot_path_indexes),
+    Migration(4, "time_ordered_binary_ids", time_ordered_binary_ids),
+    Migration(5, "normalize_stored_phones", normalize_stored_phones),
+]
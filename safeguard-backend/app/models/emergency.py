@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Text, Float, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, Text, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.core.ids import UUIDBlob, new_id
 import uuid
 
 class EmergencySession(Base):
@@ -16,16 +17,21 @@ class EmergencySession(Base):
     recording_path = Column(String)
     triggered_at = Column(DateTime, default=func.now())
     resolved_at = Column(DateTime)
+    emergency_metadata = Column(Text)
     
     # Relationships
     user = relationship("User", back_populates="emergency_sessions")
     alerts = relationship("EmergencyAlert", back_populates="emergency_session", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_emergency_sessions_user_status", "user_id", "status"),
+    )
 
 class EmergencyAlert(Base):
     __tablename__ = "emergency_alerts"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    emergency_session_id = Column(String, ForeignKey("emergency_sessions.id"), nullable=False)
+    id = Column(UUIDBlob, primary_key=True, default=new_id)
+    emergency_session_id = Column(String, ForeignKey("emergency_sessions.id"), nullable=False, index=True)
     recipient_type = Column(String, nullable=False)  # 'contact', 'nearby_user', 'police'
     recipient_id = Column(String, nullable=False)
     alert_method = Column(String, nullable=False)  # 'sms', 'push', 'call', 'email'
@@ -1,19 +1,23 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Float, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
-import uuid
+from app.core.ids import UUIDBlob, new_id
 
 class UserLocation(Base):
     __tablename__ = "user_locations"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDBlob, primary_key=True, default=new_id)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
     accuracy = Column(Float)
-    timestamp = Column(DateTime, default=func.now())
+    timestamp = Column(DateTime, default=func.now(), index=True)
     is_emergency = Column(Boolean, default=False)
     
     # Relationships
-    user = relationship("User", back_populates="locations")
\ No newline at end of file
+    user = relationship("User", back_populates="locations")
+    
+    __table_args__ = (
+        Index("ix_user_locations_user_timestamp", "user_id", "timestamp"),
+    )
\ No newline at end of file
@@ -10,7 +10,7 @@ class User(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     email = Column(String, unique=True, index=True, nullable=False)
     name = Column(String, nullable=False)
-    phone = Column(String)
+    phone = Column(String, index=True)  # E.164
     date_of_birth = Column(String)
     gender = Column(String)
     address = Column(Text)
@@ -29,9 +29,9 @@ class EmergencyContact(Base):
     __tablename__ = "emergency_contacts"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
-    phone = Column(String, nullable=False)
+    phone = Column(String, nullable=False)  # E.164
     priority_order = Column(Integer, default=1)
     created_at = Column(DateTime, default=func.now())
     
@@ -0,0 +1,199 @@
+import math
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+class ActiveEmergency:
+    __slots__ = (
+        "session_id", "user_id", "user_name", "trigger_type",
+        "latitude", "longitude", "triggered_at", "recipients", "last_update_at", "cell"
+    )
+
+    def __init__(
+        self,
+        session_id: str,
+        user_id: str,
+        trigger_type: str,
+        triggered_at: datetime,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        user_name: Optional[str] = None,
+        recipients: Iterable[str] = ()
+    ):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.user_name = user_name
+        self.trigger_type = trigger_type
+        self.triggered_at = triggered_at
+        self.latitude = latitude
+        self.longitude = longitude
+        self.recipients: Set[str] = set(recipients)  # user ids alerted for this session
+        self.last_update_at: Optional[datetime] = None  # last coalesced update pushed to recipients
+        self.cell: Optional[Tuple[int, int]] = None
+
+    @property
+    def has_location(self) -> bool:
+        return self.latitude is not None and self.longitude is not None
+
+    def to_status(self) -> dict:
+        """Same shape as GET /emergency/status returned when it read the database"""
+        return {
+            "active": True,
+            "session_id": self.session_id,
+            "trigger_type": self.trigger_type,
+            "triggered_at": self.triggered_at.isoformat(),
+            "location": {
+                "latitude": self.latitude,
+                "longitude": self.longitude
+            } if self.has_location else None
+        }
+
+class EmergencyRegistry:
+    """Authoritative in-memory view of active emergency sessions
+
+    Indexed by session id, by user id, by alerted recipient and by a coarse
+    lat/lng grid for proximity queries. All methods are synchronous, so each
+    call is atomic with respect to other coroutines on the event loop.
+    """
+
+    def __init__(self, cell_size_deg: float = 0.05):
+        self.cell_size_deg = cell_size_deg
+        self.by_session: Dict[str, ActiveEmergency] = {}
+        self.by_user: Dict[str, Dict[str, ActiveEmergency]] = {}
+        self.by_recipient: Dict[str, Set[str]] = {}
+        self.cells: Dict[Tuple[int, int], Dict[str, ActiveEmergency]] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_session)
+
+    def load(self, entries: Iterable[ActiveEmergency]) -> int:
+        self.by_session.clear()
+        self.by_user.clear()
+        self.by_recipient.clear()
+        self.cells.clear()
+        for entry in entries:
+            self.add(entry)
+        return len(self.by_session)
+
+    def add(self, entry: ActiveEmergency):
+        self.remove(entry.session_id)
+        self.by_session[entry.session_id] = entry
+        self.by_user.setdefault(entry.user_id, {})[entry.session_id] = entry
+        for user_id in entry.recipients:
+            self.by_recipient.setdefault(user_id, set()).add(entry.session_id)
+        self._index_location(entry)
+
+    def remove(self, session_id: str) -> Optional[ActiveEmergency]:
+        entry = self.by_session.pop(session_id, None)
+        if entry is None:
+            return None
+
+        user_sessions = self.by_user.get(entry.user_id)
+        if user_sessions is not None:
+            user_sessions.pop(session_id, None)
+            if not user_sessions:
+                del self.by_user[entry.user_id]
+        for user_id in entry.recipients:
+            sessions = self.by_recipient.get(user_id)
+            if sessions is not None:
+                sessions.discard(session_id)
+                if not sessions:
+                    del self.by_recipient[user_id]
+        self._unindex_location(entry)
+        return entry
+
+    def get(self, session_id: str) -> Optional[ActiveEmergency]:
+        return self.by_session.get(session_id)
+
+    def get_by_user(self, user_id: str) -> Optional[ActiveEmergency]:
+        """Most recent active session for the user"""
+        user_sessions = self.by_user.get(user_id)
+        if not user_sessions:
+            return None
+        return max(user_sessions.values(), key=lambda e: e.triggered_at)
+
+    def add_recipients(self, session_id: str, user_ids: Iterable[str]):
+        entry = self.by_session.get(session_id)
+        if entry is None:
+            return
+        for user_id in user_ids:
+            if user_id not in entry.recipients:
+                entry.recipients.add(user_id)
+                self.by_recipient.setdefault(user_id, set()).add(session_id)
+
+    def sessions_for_recipient(self, user_id: str) -> Set[str]:
+        """Active sessions the user was alerted about"""
+        return self.by_recipient.get(user_id, set())
+
+    def update_location(self, session_id: str, latitude: float, longitude: float):
+        entry = self.by_session.get(session_id)
+        if entry is None:
+            return
+        self._unindex_location(entry)
+        entry.latitude = latitude
+        entry.longitude = longitude
+        self._index_location(entry)
+
+    def near(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        limit: Optional[int] = None,
+        where: Optional[Callable[[ActiveEmergency], bool]] = None
+    ) -> List[Tuple[ActiveEmergency, float]]:
+        """Active emergencies within radius_km, closest first; `where` filters before the limit"""
+        lat_span = radius_km / KM_PER_DEGREE_LAT
+        cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+        lng_span = min(180.0, radius_km / (KM_PER_DEGREE_LAT * cos_lat))
+
+        min_row, min_col = self._cell(latitude - lat_span, longitude - lng_span)
+        max_row, max_col = self._cell(latitude + lat_span, longitude + lng_span)
+
+        matches = []
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                bucket = self.cells.get((row, col))
+                if not bucket:
+                    continue
+                for entry in bucket.values():
+                    if where is not None and not where(entry):
+                        continue
+                    distance = haversine_km(latitude, longitude, entry.latitude, entry.longitude)
+                    if distance <= radius_km:
+                        matches.append((entry, distance))
+
+        matches.sort(key=lambda match: match[1])
+        return matches[:limit] if limit else matches
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return (
+            math.floor(latitude / self.cell_size_deg),
+            math.floor(longitude / self.cell_size_deg)
+        )
+
+    def _index_location(self, entry: ActiveEmergency):
+        if not entry.has_location:
+            entry.cell = None
+            return
+        entry.cell = self._cell(entry.latitude, entry.longitude)
+        self.cells.setdefault(entry.cell, {})[entry.session_id] = entry
+
+    def _unindex_location(self, entry: ActiveEmergency):
+        if entry.cell is None:
+            return
+        bucket = self.cells.get(entry.cell)
+        if bucket is not None:
+            bucket.pop(entry.session_id, None)
+            if not bucket:
+                del self.cells[entry.cell]
+        entry.cell = None
@@ -0,0 +1,60 @@
+"""Local stand-in for the Twilio Messages API, used by benchmarks and local runs.
+
+Run it standalone and point the backend at it:
+
+    python -m app.services.fake_sms_provider --port 5005 --latency 0.2
+    TWILIO_API_BASE=http://127.0.0.1:5005 python run.py
+
+or mount it in-process with ``httpx.ASGITransport(app=create_fake_sms_app())``.
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+def create_fake_sms_app(latency: float = 0.2, failure_rate: float = 0.0) -> FastAPI:
+    """Build a fake provider that answers after `latency` seconds and fails a fraction of requests"""
+    app = FastAPI(title="Fake SMS Provider")
+    app.state.latency = latency
+    app.state.failure_rate = failure_rate
+    app.state.messages = []
+
+    @app.post("/2010-04-01/Accounts/{account_sid}/Messages.json")
+    async def create_message(account_sid: str, request: Request):
+        form = await request.form()
+        await asyncio.sleep(app.state.latency)
+
+        if app.state.failure_rate and random.random() < app.state.failure_rate:
+            return JSONResponse({"message": "Service unavailable"}, status_code=503)
+
+        message = {
+            "sid": f"SM{uuid.uuid4().hex}",
+            "account_sid": account_sid,
+            "to": form.get("To"),
+            "from": form.get("From"),
+            "body": form.get("Body"),
+            "status_callback": form.get("StatusCallback"),
+            "status": "queued",
+        }
+        app.state.messages.append(message)
+        return JSONResponse(message, status_code=201)
+
+    @app.get("/messages")
+    async def list_messages():
+        return {"count": len(app.state.messages), "messages": app.state.messages[-100:]}
+
+    return app
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Twilio-compatible SMS provider")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5005)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    uvicorn.run(create_fake_sms_app(args.latency, args.failure_rate), host=args.host, port=args.port)
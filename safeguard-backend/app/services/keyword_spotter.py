@@ -0,0 +1,280 @@
+import struct
+from typing import Optional, Sequence, Tuple
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+def _mel(hz):
+    return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+def _hz(mel):
+    return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+class MFCCExtractor:
+    """MFCCs in plain NumPy: Hamming-windowed frames, mel filterbank, log, DCT-II
+
+    The filterbank and DCT matrices are built once, so extracting a chunk of
+    frames is one strided view, one rfft and two matrix products. The 0th
+    coefficient (overall energy) is dropped to make matching level-independent.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        frame_ms: float = 25.0,
+        hop_ms: float = 10.0,
+        n_fft: int = 512,
+        n_mels: int = 26,
+        n_mfcc: int = 13
+    ):
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.hop = int(sample_rate * hop_ms / 1000)
+        self.n_fft = n_fft
+        self.window = np.hamming(self.frame_length).astype(np.float32)
+
+        edges = _hz(np.linspace(_mel(0.0), _mel(sample_rate / 2), n_mels + 2))
+        bins = np.floor((n_fft + 1) * edges / sample_rate).astype(int)
+        filterbank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+        for m in range(1, n_mels + 1):
+            left, center, right = bins[m - 1], bins[m], bins[m + 1]
+            if center > left:
+                filterbank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+            if right > center:
+                filterbank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+        self.filterbank_t = filterbank.T.copy()
+
+        n = np.arange(n_mels)
+        dct = np.cos(np.pi / n_mels * (n + 0.5)[None, :] * np.arange(n_mfcc)[:, None]) * np.sqrt(2.0 / n_mels)
+        self.dct_t = dct[1:].T.astype(np.float32).copy()
+
+    @property
+    def n_features(self) -> int:
+        return self.dct_t.shape[1]
+
+    def frame_count(self, n_samples: int) -> int:
+        if n_samples < self.frame_length:
+            return 0
+        return 1 + (n_samples - self.frame_length) // self.hop
+
+    def extract(self, samples: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """MFCCs and log energies of every complete frame in `samples` (already pre-emphasized)"""
+        count = self.frame_count(len(samples))
+        if count == 0:
+            return np.empty((0, self.n_features), dtype=np.float32), np.empty(0, dtype=np.float32)
+        frames = np.lib.stride_tricks.sliding_window_view(samples, self.frame_length)[::self.hop][:count]
+        spectrum = np.fft.rfft(frames * self.window, n=self.n_fft)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32) / self.n_fft
+        log_mel = np.log(power @ self.filterbank_t + 1e-10)
+        energy = np.log(power.sum(axis=1) + 1e-10)
+        return log_mel @ self.dct_t, energy
+
+class FeatureStream:
+    """Turns PCM chunks of any size into normalized MFCC frames
+
+    Leftover samples and the pre-emphasis history carry over between chunks,
+    and cepstral means are removed with a short (~0.5 s) moving average, so
+    enrollment audio and live audio go through identical processing.
+    """
+
+    def __init__(self, extractor: MFCCExtractor, mean_decay: float = 0.98):
+        self.extractor = extractor
+        self.mean_decay = mean_decay
+        self.pending = np.empty(0, dtype=np.float32)
+        self.last_sample = 0.0
+        self.mean: Optional[np.ndarray] = None
+
+    def push(self, samples: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if len(samples) == 0:
+            return self.extractor.extract(self.pending[:0])
+        emphasized = np.empty_like(samples)
+        emphasized[0] = samples[0] - 0.97 * self.last_sample
+        emphasized[1:] = samples[1:] - 0.97 * samples[:-1]
+        self.last_sample = float(samples[-1])
+
+        buffered = np.concatenate((self.pending, emphasized))
+        features, energy = self.extractor.extract(buffered)
+        self.pending = buffered[len(features) * self.extractor.hop:]
+        if len(features):
+            chunk_mean = features.mean(axis=0)
+            if self.mean is None:
+                self.mean = chunk_mean
+            else:
+                weight = self.mean_decay ** len(features)
+                self.mean = weight * self.mean + (1.0 - weight) * chunk_mean
+            features = features - self.mean
+        return features, energy
+
+def pcm16_to_float(pcm: bytes) -> np.ndarray:
+    """Little-endian 16-bit mono PCM to float32 samples in [-1, 1)"""
+    usable = len(pcm) - len(pcm) % 2
+    return np.frombuffer(pcm[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+def trim_silence(features: np.ndarray, energy: np.ndarray, floor_db: float = 35.0) -> np.ndarray:
+    """Keep the frames between the first and last one that stand out from the background
+
+    A frame counts as speech when it is within `floor_db` of the loudest frame
+    and above the midpoint between the noise floor and the loudest frame.
+    """
+    if len(energy) == 0:
+        return features
+    peak = energy.max()
+    cutoff = max(peak - floor_db / 10.0 * np.log(10.0), (peak + np.percentile(energy, 10)) / 2)
+    loud = np.nonzero(energy >= cutoff)[0]
+    return features[loud[0]:loud[-1] + 1]
+
+def _frame_costs(template: np.ndarray, template_sq: np.ndarray, frames: np.ndarray) -> np.ndarray:
+    """Euclidean distance between every template frame and every input frame
+
+    Works on one template (rows, dims) or a stack of them (templates, rows, dims).
+    """
+    cross = np.matmul(template, frames.T)
+    sq = template_sq[..., None] + np.einsum("ij,ij->i", frames, frames) - 2.0 * cross
+    return np.sqrt(np.maximum(sq, 0.0))
+
+def _advance(previous: np.ndarray, costs: np.ndarray, start: float) -> np.ndarray:
+    """One DTW column: D[i] = c[i] + min(D[i-1], prev[i], prev[i-1]), vectorized
+
+    The vertical dependency on D[i-1] is a min-plus scan, which becomes a
+    cumulative sum plus np.minimum.accumulate along the last axis, so a stack
+    of templates advances in the same few calls. `start` is the cost of
+    entering row 0 (0 for subsequence search, where a match may begin anywhere).
+    """
+    best_prior = np.empty_like(costs)
+    np.minimum(start, previous[..., 0], out=best_prior[..., 0])
+    np.minimum(previous[..., 1:], previous[..., :-1], out=best_prior[..., 1:])
+    total = np.cumsum(costs, axis=-1)
+    return total + np.minimum.accumulate(best_prior - (total - costs), axis=-1)
+
+def dtw_cost(a: np.ndarray, b: np.ndarray) -> float:
+    """Length-normalized DTW cost between two feature sequences, aligned end to end"""
+    costs = _frame_costs(a, np.einsum("ij,ij->i", a, a), b)
+    column = np.cumsum(costs[:, 0])
+    for j in range(1, costs.shape[1]):
+        column = _advance(column, costs[:, j], np.inf)
+    return float(column[-1] / len(a))
+
+class KeywordSpotter:
+    """Enrollment templates of one phrase and the threshold that accepts them"""
+
+    default_threshold = 9.0
+    threshold_margin = 1.5
+    min_frames = 20
+
+    def __init__(self, phrase_id: str, templates: Sequence[np.ndarray], threshold: float):
+        self.phrase_id = phrase_id
+        self.threshold = threshold
+        self.templates = [np.ascontiguousarray(t, dtype=np.float32) for t in templates]
+
+        # Templates are zero-padded into one stack so all of them advance together
+        self.lengths = np.array([len(t) for t in self.templates])
+        rows, width = self.lengths.max(), self.templates[0].shape[1]
+        self.stack = np.zeros((len(self.templates), rows, width), dtype=np.float32)
+        for index, template in enumerate(self.templates):
+            self.stack[index, :len(template)] = template
+        self.squared_norms = np.einsum("tij,tij->ti", self.stack, self.stack)
+        # Costs only accumulate, so a partial path above its template's final
+        # limit can never become a match; padding rows are always pruned
+        self.end_limits = threshold * self.lengths
+        self.limits = np.where(
+            np.arange(rows)[None, :] < self.lengths[:, None], self.end_limits[:, None], -1.0
+        ).astype(np.float32)
+
+    @classmethod
+    def enroll(cls, phrase_id: str, recordings: Sequence[bytes], extractor: MFCCExtractor) -> "KeywordSpotter":
+        """Build templates from PCM16 enrollment recordings of the phrase"""
+        templates = []
+        for pcm in recordings:
+            features, energy = FeatureStream(extractor).push(pcm16_to_float(pcm))
+            features = trim_silence(features, energy)
+            if len(features) < cls.min_frames:
+                raise ValueError("Enrollment recording is too short or silent")
+            templates.append(features)
+        if not templates:
+            raise ValueError("At least one enrollment recording is required")
+
+        # Accept anything about as close as the enrollment takes are to each other
+        pairwise = [
+            dtw_cost(a, b)
+            for i, a in enumerate(templates)
+            for j, b in enumerate(templates) if i != j
+        ]
+        threshold = max(pairwise) * cls.threshold_margin if pairwise else cls.default_threshold
+        return cls(phrase_id, templates, threshold)
+
+    def to_bytes(self) -> bytes:
+        header = struct.pack("<fII", self.threshold, len(self.templates), self.templates[0].shape[1])
+        lengths = struct.pack(f"<{len(self.templates)}I", *self.lengths.tolist())
+        return header + lengths + b"".join(t.tobytes() for t in self.templates)
+
+    @classmethod
+    def from_bytes(cls, phrase_id: str, data: bytes) -> "KeywordSpotter":
+        threshold, count, width = struct.unpack_from("<fII", data)
+        offset = struct.calcsize("<fII")
+        lengths = struct.unpack_from(f"<{count}I", data, offset)
+        offset += 4 * count
+        templates = []
+        for length in lengths:
+            size = length * width * 4
+            templates.append(np.frombuffer(data[offset:offset + size], dtype=np.float32).reshape(length, width))
+            offset += size
+        return cls(phrase_id, templates, threshold)
+
+class KeywordStream:
+    """Online subsequence DTW of one live audio stream against a spotter's templates
+
+    The stream keeps the last DTW column of every template. Cells whose cost
+    already exceeds the template's limit are abandoned, and rows are computed
+    only up to one past the last live cell, which is also a slope constraint:
+    a path cannot run ahead of the audio by more than one template frame per
+    input frame. In audio that does not resemble the phrase only a prefix of
+    the templates stays live.
+    """
+
+    def __init__(self, spotter: KeywordSpotter, extractor: MFCCExtractor, early_abandon: bool = True):
+        self.spotter = spotter
+        self.features = FeatureStream(extractor)
+        self.early_abandon = early_abandon
+        self.column = np.full(spotter.stack.shape[:2], np.inf, dtype=np.float32)
+        self.ends = (np.arange(len(spotter.lengths)), spotter.lengths - 1)
+        self.active = 0
+        self.frames = 0
+
+    def reset(self):
+        self.column.fill(np.inf)
+        self.active = 0
+
+    def feed(self, pcm: bytes) -> Optional[float]:
+        """Process a PCM16 chunk; returns the normalized match cost when the phrase is heard"""
+        frames, _ = self.features.push(pcm16_to_float(pcm))
+        if len(frames) == 0:
+            return None
+        self.frames += len(frames)
+
+        spotter = self.spotter
+        length = spotter.stack.shape[1]
+        column, active = self.column, self.active
+        reach = min(length, active + len(frames)) if self.early_abandon else length
+        costs = _frame_costs(spotter.stack[:, :reach], spotter.squared_norms[:, :reach], frames)
+
+        best = None
+        for j in range(len(frames)):
+            rows = min(reach, active + j + 1) if self.early_abandon else length
+            updated = _advance(column[:, :rows], costs[:, :rows, j], 0.0)
+            if self.early_abandon:
+                updated[updated > spotter.limits[:, :rows]] = np.inf
+            column[:, :rows] = updated
+
+            ends = column[self.ends]
+            hits = ends <= spotter.end_limits
+            if hits.any():
+                score = float((ends[hits] / spotter.lengths[hits]).min())
+                best = score if best is None else min(best, score)
+        if self.early_abandon:
+            # Rows past the last live cell stay infinite until a path reaches them
+            live = np.flatnonzero(np.isfinite(column).any(axis=0))
+            self.active = int(live[-1]) + 1 if len(live) else 0
+
+        if best is not None:
+            self.reset()
+        return best
@@ -0,0 +1,114 @@
+import asyncio
+from collections import deque
+from datetime import datetime
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+class LiveTracker:
+    """Per-session ring buffers of the victim's most recent location fixes
+
+    Fixes are kept in memory, pushed to responders at most once per
+    `push_interval` and written to location history in batches every
+    `persist_interval`, independently of the regular location endpoints.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[str, List[dict]], Awaitable[None]],
+        persist: Callable[[List[dict]], Awaitable[None]],
+        trail_size: int = 120,
+        push_interval: float = 1.0,
+        persist_interval: float = 5.0
+    ):
+        self.publish = publish
+        self.persist = persist
+        self.trail_size = trail_size
+        self.push_interval = push_interval
+        self.persist_interval = persist_interval
+        self.trails: Dict[str, Deque[dict]] = {}
+        self.unpushed: Dict[str, List[dict]] = {}
+        self.unpersisted: List[dict] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        session_id: str,
+        user_id: str,
+        latitude: float,
+        longitude: float,
+        accuracy: Optional[float] = None,
+        timestamp: Optional[datetime] = None
+    ) -> dict:
+        timestamp = timestamp or datetime.utcnow()
+        fix = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "accuracy": accuracy,
+            "timestamp": timestamp.isoformat()
+        }
+
+        trail = self.trails.get(session_id)
+        if trail is None:
+            trail = self.trails[session_id] = deque(maxlen=self.trail_size)
+        trail.append(fix)
+        self.unpushed.setdefault(session_id, []).append(fix)
+        self.unpersisted.append({
+            "user_id": user_id,
+            "latitude": latitude,
+            "longitude": longitude,
+            "accuracy": accuracy,
+            "timestamp": timestamp
+        })
+        return fix
+
+    def trail(self, session_id: str) -> List[dict]:
+        return list(self.trails.get(session_id, ()))
+
+    def end(self, session_id: str):
+        self.trails.pop(session_id, None)
+        self.unpushed.pop(session_id, None)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.push()
+        await self.flush_history()
+
+    async def push(self):
+        """Send each session's new fixes to its room in one message"""
+        if not self.unpushed:
+            return
+        batches, self.unpushed = self.unpushed, {}
+        for session_id, fixes in batches.items():
+            try:
+                await self.publish(session_id, fixes)
+            except Exception as e:
+                print(f"Live tracking publish error for session {session_id}: {e}")
+
+    async def flush_history(self):
+        if not self.unpersisted:
+            return
+        rows, self.unpersisted = self.unpersisted, []
+        try:
+            await self.persist(rows)
+        except Exception as e:
+            print(f"Live tracking persist error ({len(rows)} fixes): {e}")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_persist = loop.time() + self.persist_interval
+        while True:
+            await asyncio.sleep(self.push_interval)
+            await self.push()
+            if loop.time() >= next_persist:
+                # Shielded so stop() cannot cancel a write after the rows left the buffer
+                await asyncio.shield(self.flush_history())
+                next_persist = loop.time() + self.persist_interval
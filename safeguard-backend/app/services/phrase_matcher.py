@@ -0,0 +1,610 @@
+import re
+import unicodedata
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_NUMBER = re.compile(r"\d+")
+
+_ONES = (
+    "zero one two three four five six seven eight nine ten eleven twelve thirteen "
+    "fourteen fifteen sixteen seventeen eighteen nineteen"
+).split()
+_TENS = "_ _ twenty thirty forty fifty sixty seventy eighty ninety".split()
+
+def _number_words(match) -> str:
+    """Small numbers as speech engines spell them out; longer ones digit by digit ("911")"""
+    digits = match.group()
+    value = int(digits)
+    if len(digits) <= 2 and digits[0] != "0" or digits == "0":
+        if value < 20:
+            return f" {_ONES[value]} "
+        tens, ones = divmod(value, 10)
+        return f" {_TENS[tens]} {_ONES[ones]} " if ones else f" {_TENS[tens]} "
+    return " " + " ".join(_ONES[int(d)] for d in digits) + " "
+
+def normalize(text: str) -> List[str]:
+    """Lowercase, strip accents and punctuation, spell out numbers and split into words"""
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.replace("'", "").replace("’", "")
+    text = _NUMBER.sub(_number_words, text)
+    return _NON_WORD.sub(" ", text).split()
+
+_VOWELS = frozenset("aeiou")
+_FRONT = frozenset("eiy")
+
+@lru_cache(maxsize=8192)
+def phonetic_key(word: str) -> str:
+    """Simplified Metaphone code for one normalized word"""
+    w = word
+    if w[:2] in ("kn", "gn", "pn", "ae", "wr"):
+        w = w[1:]
+    elif w[:1] == "x":
+        w = "s" + w[1:]
+    elif w[:2] == "wh":
+        w = "w" + w[2:]
+
+    out = []
+    n = len(w)
+    i = 0
+    while i < n:
+        c = w[i]
+        nxt = w[i + 1] if i + 1 < n else ""
+        prev = w[i - 1] if i else ""
+        if c == prev and c != "c":
+            i += 1
+            continue
+        if c in _VOWELS:
+            if i == 0:
+                out.append(c.upper())
+        elif c == "b":
+            if not (prev == "m" and i == n - 1):
+                out.append("B")
+        elif c == "c":
+            if nxt == "h" or w[i + 1:i + 3] == "ia":
+                out.append("X")
+            elif nxt in _FRONT:
+                if prev != "s":
+                    out.append("S")
+            else:
+                out.append("K")
+        elif c == "d":
+            out.append("J" if nxt == "g" and w[i + 2:i + 3] in _FRONT else "T")
+        elif c == "g":
+            if nxt == "h" and w[i + 2:i + 3] not in _VOWELS:
+                pass
+            elif nxt == "n" and (i + 2 == n or w[i + 2:i + 4] == "ed"):
+                pass
+            elif prev == "d" and nxt in _FRONT:
+                pass
+            else:
+                out.append("J" if nxt in _FRONT else "K")
+        elif c == "h":
+            if nxt in _VOWELS and prev not in ("c", "s", "p", "t", "g"):
+                out.append("H")
+        elif c == "k":
+            if prev != "c":
+                out.append("K")
+        elif c == "p":
+            out.append("F" if nxt == "h" else "P")
+        elif c == "q":
+            out.append("K")
+        elif c == "s":
+            if nxt == "h" or w[i + 1:i + 3] in ("io", "ia"):
+                out.append("X")
+            else:
+                out.append("S")
+        elif c == "t":
+            if nxt == "h":
+                out.append("0")
+            elif w[i + 1:i + 3] in ("io", "ia"):
+                out.append("X")
+            elif not (nxt == "c" and w[i + 2:i + 3] == "h"):
+                out.append("T")
+        elif c == "v":
+            out.append("F")
+        elif c in ("w", "y"):
+            if nxt in _VOWELS:
+                out.append(c.upper())
+        elif c == "x":
+            out.append("KS")
+        elif c == "z":
+            out.append("S")
+        else:
+            out.append(c.upper())
+        i += 1
+    return "".join(out)
+
+def _pattern_masks(pattern: str) -> Dict[str, int]:
+    masks: Dict[str, int] = {}
+    for i, ch in enumerate(pattern):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return masks
+
+def search_distance(masks: Dict[str, int], length: int, text: str) -> int:
+    """Smallest edit distance between the pattern and any substring of `text`
+
+    Myers' bit-parallel algorithm: one pass over the text with a handful of
+    integer operations per character, independent of the pattern length.
+    """
+    full = (1 << length) - 1
+    high = 1 << (length - 1)
+    pv, mv = full, 0
+    score = best = length
+    for ch in text:
+        eq = masks.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+            if score < best:
+                best = score
+                if best == 0:
+                    return 0
+        ph = (ph << 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return best
+
+class _PackedSearch:
+    """search_distance for several patterns in one pass
+
+    Each pattern gets a bit field of one big integer, padded to a common width
+    with positions that match any character and topped by a zero guard bit
+    that absorbs carries, so fields never interfere. Scores are packed into
+    the same fields. A character of the text costs the same dozen big-integer
+    operations however many patterns there are.
+    """
+
+    __slots__ = ("width", "masks", "wildcards", "full", "high", "guard", "bias", "initial", "count")
+
+    def __init__(self, patterns: Sequence[Tuple[str, int]]):
+        self.count = len(patterns)
+        self.width = width = max(len(pattern) for pattern, _ in patterns)
+        field = width + 1
+        masks: Dict[str, int] = {}
+        wildcards = full = high = guard = bias = initial = 0
+        for i, (pattern, max_distance) in enumerate(patterns):
+            base = i * field
+            for j, ch in enumerate(pattern):
+                masks[ch] = masks.get(ch, 0) | (1 << (base + j))
+            for j in range(len(pattern), width):
+                wildcards |= 1 << (base + j)
+            full |= ((1 << width) - 1) << base
+            high |= 1 << (base + width - 1)
+            guard |= 1 << (base + width)
+            # score + bias keeps the guard bit clear exactly when score <= max_distance
+            bias |= ((1 << width) - 1 - min(max_distance, width)) << base
+            initial |= width << base
+        self.masks = {ch: mask | wildcards for ch, mask in masks.items()}
+        self.wildcards, self.full, self.high, self.guard = wildcards, full, high, guard
+        self.bias, self.initial = bias, initial
+
+    def search(self, text: str) -> Dict[int, int]:
+        """Pattern index -> smallest edit distance, for patterns within their max_distance"""
+        masks, wildcards, full, high, guard, bias = (
+            self.masks, self.wildcards, self.full, self.high, self.guard, self.bias
+        )
+        width = self.width
+        field, shift = width + 1, width - 1
+        pv, mv = full, 0
+        score = self.initial
+        found: Dict[int, int] = {}
+        # Wildcard padding only matches once enough characters follow, so the text is padded too
+        for ch in text + "\0" * (width - 1):
+            eq = masks.get(ch, wildcards)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | (~(xh | pv) & full)
+            mh = pv & xh
+            score += (ph & high) >> shift
+            score -= (mh & high) >> shift
+            within = (score + bias) & guard
+            if within != guard:
+                for i in range(self.count):
+                    if not within >> (i * field + width) & 1:
+                        distance = score >> (i * field) & ((1 << field) - 1)
+                        if distance < found.get(i, field):
+                            found[i] = distance
+            ph = (ph << 1) & full
+            mh = (mh << 1) & full
+            pv = mh | (~(xv | ph) & full)
+            mv = ph & xv
+        return found
+
+# Phrases shorter than this (normalized characters) never match on sound alone: a
+# couple of shared consonants ("red", "rat", "road") are a coincidence, not evidence
+PHONETIC_MIN_LENGTH = 8
+
+def _tolerance(length: int, chars_per_edit: int) -> int:
+    return length // chars_per_edit
+
+def _pieces(pattern: str, max_distance: int) -> Tuple[str, ...]:
+    """Split a pattern into max_distance + 1 parts for the pigeonhole prefilter
+
+    Any match within max_distance edits contains at least one part verbatim,
+    so texts containing none are rejected with plain substring checks.
+    """
+    count = max_distance + 1
+    size = len(pattern) // count
+    if size < 2:
+        return ()
+    return tuple(pattern[i * size:(i + 1) * size if i < count - 1 else len(pattern)] for i in range(count))
+
+def _within(text: str, pieces: Tuple[str, ...], masks: Dict[str, int], length: int, max_distance: int) -> int:
+    """Edit distance of the best match, or -1 when it exceeds max_distance"""
+    if pieces and not any(piece in text for piece in pieces):
+        return -1
+    distance = search_distance(masks, length, text)
+    return distance if distance <= max_distance else -1
+
+class CompiledPhrase:
+    """A trained phrase prepared once for repeated matching"""
+
+    __slots__ = (
+        "phrase_id", "source", "action", "text", "masks", "max_distance", "pieces",
+        "phonetic", "phonetic_masks", "phonetic_max_distance", "phonetic_pieces", "tokens",
+        "spelling_max_distance"
+    )
+
+    def __init__(self, phrase_id: str, source: str, action: Optional[str] = None):
+        self.phrase_id = phrase_id
+        self.source = source
+        self.action = action
+        words = normalize(source)
+        # Padding with spaces keeps matches aligned to word boundaries
+        self.text = f" {' '.join(words)} "
+        self.masks = _pattern_masks(self.text)
+        self.max_distance = _tolerance(len(self.text) - 2, 8)
+        self.pieces = _pieces(self.text, self.max_distance)
+        self.tokens = tuple(key for key in map(phonetic_key, words) if key)
+        self.phonetic = f" {' '.join(self.tokens)} "
+        self.phonetic_masks = _pattern_masks(self.phonetic)
+        self.phonetic_max_distance = _tolerance(len(self.phonetic) - 2, 6)
+        self.phonetic_pieces = _pieces(self.phonetic, self.phonetic_max_distance)
+        # A phonetic match must still be spelled roughly alike; -1 disables phonetic matching
+        length = len(self.text) - 2
+        self.spelling_max_distance = _tolerance(length, 4) if length >= PHONETIC_MIN_LENGTH else -1
+
+    def spelling_score(self, text: str) -> float:
+        """Score of the closest spelling in a padded, normalized text; 0.0 when it is too far off"""
+        if self.text in text:
+            return 1.0
+        distance = search_distance(self.masks, len(self.text), text)
+        if distance > max(self.max_distance, self.spelling_max_distance):
+            return 0.0
+        return 1.0 - distance / len(self.text)
+
+    def match(self, transcript: str) -> Tuple[Optional[str], float]:
+        """Return (match_type, score); match_type is None when the transcript does not match"""
+        if len(self.text) <= 2:
+            return None, 0.0
+        words = normalize(transcript)
+        text = f" {' '.join(words)} "
+        if self.text in text:
+            return "exact", 1.0
+
+        distance = _within(text, self.pieces, self.masks, len(self.text), self.max_distance)
+        if distance >= 0:
+            return "fuzzy", 1.0 - distance / len(self.text)
+        if self.spelling_max_distance < 0:
+            return None, 0.0
+
+        phonetic = f" {' '.join(map(phonetic_key, words))} "
+        distance = _within(
+            phonetic, self.phonetic_pieces, self.phonetic_masks, len(self.phonetic), self.phonetic_max_distance
+        )
+        if distance >= 0:
+            score = self.spelling_score(text)
+            if score:
+                return "phonetic", score
+        return None, 0.0
+
+class _Automaton:
+    """Aho-Corasick automaton over (sequence, value) entries"""
+
+    __slots__ = ("goto", "fail", "output")
+
+    def __init__(self, entries: Iterable[Tuple[Sequence[str], Any]]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.output: List[Tuple[Any, ...]] = [()]
+        for sequence, value in entries:
+            state = 0
+            for symbol in sequence:
+                nxt = self.goto[state].get(symbol)
+                if nxt is None:
+                    nxt = self.goto[state][symbol] = len(self.goto)
+                    self.goto.append({})
+                    self.output.append(())
+                state = nxt
+            if state:
+                self.output[state] += (value,)
+
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(token, 0)
+                self.output[nxt] += self.output[self.fail[nxt]]
+
+    @property
+    def empty(self) -> bool:
+        return len(self.goto) == 1
+
+    def step(self, state: int, token: str) -> int:
+        goto, fail = self.goto, self.fail
+        while state and token not in goto[state]:
+            state = fail[state]
+        return goto[state].get(token, 0)
+
+    def scan(self, symbols: Iterable[str]) -> Dict[Any, None]:
+        """Values of every entry occurring in `symbols`, in order of first occurrence"""
+        goto, fail, output = self.goto, self.fail, self.output
+        found: Dict[Any, None] = {}
+        state = 0
+        for symbol in symbols:
+            while state and symbol not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(symbol, 0)
+            if output[state]:
+                found.update(dict.fromkeys(output[state]))
+        return found
+
+class PhraseAutomaton(_Automaton):
+    """Aho-Corasick automaton over the phonetic word keys of a user's phrases"""
+
+    __slots__ = ()
+
+    def __init__(self, phrases: Iterable[CompiledPhrase]):
+        super().__init__((phrase.tokens, phrase) for phrase in phrases)
+
+class _PieceFilter:
+    """Pigeonhole prefilter shared by several phrases
+
+    With a handful of pieces, plain substring checks are fastest. Past that
+    the pieces go into one character automaton, so a transcript is scanned
+    once however many phrases the user has.
+    """
+
+    __slots__ = ("pieces", "automaton", "unfiltered")
+
+    max_substring_checks = 12
+
+    def __init__(self, entries: Sequence[Tuple[Tuple[str, ...], CompiledPhrase]]):
+        self.pieces = tuple((pieces, phrase) for pieces, phrase in entries if pieces)
+        # Phrases too short to split are always candidates
+        self.unfiltered = tuple(phrase for pieces, phrase in entries if not pieces)
+        count = sum(len(pieces) for pieces, _ in self.pieces)
+        self.automaton = None
+        if count > self.max_substring_checks:
+            self.automaton = _Automaton((piece, phrase) for pieces, phrase in self.pieces for piece in pieces)
+
+    def candidates(self, text: str) -> Iterable[CompiledPhrase]:
+        if self.automaton is not None:
+            found = self.automaton.scan(text)
+        else:
+            found = [phrase for pieces, phrase in self.pieces if any(piece in text for piece in pieces)]
+        return (*self.unfiltered, *found)
+
+class PhraseSet:
+    """All of a user's active phrases, matched together
+
+    Whole-word matches come from one pass of the phrase automaton and fuzzy
+    candidates from one pass of the shared prefilter. A couple of candidates
+    are checked one by one; more than that share one packed edit distance
+    pass. Results follow the single-phrase order: exact, fuzzy, then phonetic.
+    """
+
+    __slots__ = ("phrases", "by_id", "automaton", "filter", "phonetic_filter", "packed", "phonetic_packed")
+
+    max_separate_searches = 2
+
+    def __init__(self, phrases: Iterable[CompiledPhrase] = ()):
+        self.phrases = tuple(phrase for phrase in phrases if len(phrase.text) > 2)
+        self.by_id = {phrase.phrase_id: phrase for phrase in self.phrases}
+        self.automaton = PhraseAutomaton(self.phrases)
+        self.filter = _PieceFilter([(phrase.pieces, phrase) for phrase in self.phrases])
+        self.phonetic_filter = _PieceFilter([(phrase.phonetic_pieces, phrase) for phrase in self.phrases])
+        self.packed = self.phonetic_packed = None
+        if len(self.phrases) > self.max_separate_searches:
+            self.packed = _PackedSearch([(phrase.text, phrase.max_distance) for phrase in self.phrases])
+            self.phonetic_packed = _PackedSearch(
+                [(phrase.phonetic, phrase.phonetic_max_distance) for phrase in self.phrases]
+            )
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    def get(self, phrase_id: str) -> Optional[CompiledPhrase]:
+        return self.by_id.get(phrase_id)
+
+    def match(self, transcript: str) -> Tuple[Optional[CompiledPhrase], Optional[str], float]:
+        """Return (phrase, match_type, score) for the best matching phrase, or (None, None, 0.0)"""
+        if not self.phrases:
+            return None, None, 0.0
+        words = normalize(transcript)
+        text = f" {' '.join(words)} "
+        keys = [phonetic_key(word) for word in words]
+
+        hits = self.automaton.scan(key for key in keys if key)
+        for phrase in hits:
+            if phrase.text in text:
+                return phrase, "exact", 1.0
+
+        best, best_score = self._closest(
+            self.filter.candidates(text), self.packed, text, "masks", "text", "max_distance"
+        )
+        if best is not None:
+            return best, "fuzzy", best_score
+
+        # Sounding alike only nominates a phrase; it is scored by how close the spelling is.
+        # Every word of a hit sounds the same, so hits need no phonetic search.
+        phonetic = f" {' '.join(keys)} "
+        nominated = dict.fromkeys(hits)
+        nominated.update((phrase, None) for phrase, _ in self._distances(
+            self.phonetic_filter.candidates(phonetic), self.phonetic_packed, phonetic,
+            "phonetic_masks", "phonetic", "phonetic_max_distance"
+        ))
+        best, best_score = None, 0.0
+        for phrase in nominated:
+            if phrase.spelling_max_distance >= 0:
+                score = phrase.spelling_score(text)
+                if score > best_score:
+                    best, best_score = phrase, score
+        if best is not None:
+            return best, "phonetic", best_score
+        return None, None, 0.0
+
+    def _distances(
+        self, candidates: Sequence[CompiledPhrase], packed: Optional[_PackedSearch], text: str,
+        masks: str, pattern: str, max_distance: str
+    ) -> List[Tuple[CompiledPhrase, int]]:
+        """(phrase, distance) for candidates within their tolerance; attribute names pick the text or phonetic form"""
+        if not candidates:
+            return []
+        if packed is not None and len(candidates) > self.max_separate_searches:
+            return [(self.phrases[i], distance) for i, distance in packed.search(text).items()]
+        distances = []
+        for phrase in candidates:
+            distance = search_distance(getattr(phrase, masks), len(getattr(phrase, pattern)), text)
+            if distance <= getattr(phrase, max_distance):
+                distances.append((phrase, distance))
+        return distances
+
+    def _closest(
+        self, candidates: Sequence[CompiledPhrase], packed: Optional[_PackedSearch], text: str,
+        masks: str, pattern: str, max_distance: str
+    ) -> Tuple[Optional[CompiledPhrase], float]:
+        """Best scoring candidate within its tolerance"""
+        best, best_score = None, 0.0
+        for phrase, distance in self._distances(candidates, packed, text, masks, pattern, max_distance):
+            score = 1.0 - distance / len(getattr(phrase, pattern))
+            if score > best_score:
+                best, best_score = phrase, score
+        return best, best_score
+
+class TranscriptStream:
+    """Incremental phrase matching over one connection's interim transcripts
+
+    Speech recognizers revise the tail of the current utterance as they go, so
+    the automaton state after every word is kept and a delta resumes from the
+    state at its word offset. Each word is examined once per revision; the
+    transcript is never rescanned.
+    """
+
+    max_utterances = 4
+
+    def __init__(self, automaton: PhraseAutomaton):
+        self.automaton = automaton
+        # utterance -> (automaton state before each word and after the last, normalized words)
+        self.utterances: "OrderedDict[str, Tuple[List[int], List[str]]]" = OrderedDict()
+        # Utterance whose match already fired; later revisions of it must not fire again
+        self.triggered: Optional[str] = None
+
+    def feed(self, utterance: str, offset: int, text: str, final: bool = False) -> Optional[CompiledPhrase]:
+        """Apply a delta: words from `offset` onward are replaced by `text`"""
+        entry = self.utterances.get(utterance)
+        if entry is None:
+            entry = self.utterances[utterance] = ([0], [])
+            while len(self.utterances) > self.max_utterances:
+                self.utterances.popitem(last=False)
+        else:
+            self.utterances.move_to_end(utterance)
+        states, words = entry
+        offset = max(0, offset)
+        del states[offset + 1:]
+        del words[offset:]
+
+        automaton = self.automaton
+        state = states[-1]
+        matched = None
+        for word in text.split():
+            tokens = normalize(word)
+            words.append(" ".join(tokens))
+            for token in tokens:
+                key = phonetic_key(token)
+                if key:
+                    state = automaton.step(state, key)
+                    if matched is None and automaton.output[state]:
+                        matched = self._confirm(automaton.output[state], words)
+            states.append(state)
+
+        if final:
+            self.utterances.pop(utterance, None)
+        return matched
+
+    @staticmethod
+    def _confirm(phrases: Sequence[CompiledPhrase], words: List[str]) -> Optional[CompiledPhrase]:
+        """First phrase whose words sound alike and are also spelled close enough"""
+        text = f" {' '.join(word for word in words if word)} "
+        for phrase in phrases:
+            if phrase.spelling_score(text):
+                return phrase
+        return None
+
+class PhraseCache:
+    """Compiled active phrases per user, recompiled only when they change
+
+    Users without phrases get an empty set, which is cached too, so they do
+    not cause a lookup on every verification. At most `max_users` sets are
+    kept, least recently used evicted first. Writers must call `invalidate`
+    after changing a user's phrases.
+    """
+
+    def __init__(self, max_users: int = 10_000):
+        self.max_users = max_users
+        self.sets: "OrderedDict[str, PhraseSet]" = OrderedDict()
+        self.generation = 0  # bumped by every invalidation
+
+    def _get(self, user_id: str) -> Optional[PhraseSet]:
+        phrases = self.sets.get(user_id)
+        if phrases is not None:
+            self.sets.move_to_end(user_id)
+        return phrases
+
+    def _put(self, user_id: str, phrases: PhraseSet):
+        self.sets[user_id] = phrases
+        self.sets.move_to_end(user_id)
+        while len(self.sets) > self.max_users:
+            self.sets.popitem(last=False)
+
+    def active(
+        self, user_id: str, load: Callable[[str], Iterable[Tuple[str, str, Optional[str]]]]
+    ) -> PhraseSet:
+        """Cached phrases, or `load(user_id)` -> [(phrase_id, phrase, action)] on a miss"""
+        phrases = self._get(user_id)
+        if phrases is None:
+            phrases = PhraseSet(CompiledPhrase(*row) for row in load(user_id))
+            self._put(user_id, phrases)
+        return phrases
+
+    async def load_active(
+        self, user_id: str, load: Callable[[str], Awaitable[Iterable[Tuple[str, str, Optional[str]]]]]
+    ) -> PhraseSet:
+        """`active` with an async loader; a result that raced an invalidation is served but not cached"""
+        phrases = self._get(user_id)
+        if phrases is not None:
+            return phrases
+        generation = self.generation
+        phrases = PhraseSet(CompiledPhrase(*row) for row in await load(user_id))
+        if generation == self.generation:
+            self._put(user_id, phrases)
+        return phrases
+
+    def invalidate(self, user_id: str):
+        self.sets.pop(user_id, None)
+        self.generation += 1
@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+# A later receipt never downgrades an earlier, stronger one; pending ranks below all of them
+STATUS_RANK = {"sent": 1, "failed": 2, "delivered": 3}
+
+class DeliveryReceiptBatcher:
+    """Coalesces alert delivery receipts and writes them in bulk
+
+    Receipts from any source (REST batches, provider webhooks, socket acks) are
+    merged per alert id and handed to `write_batch` as one list, either when
+    `max_batch` receipts are buffered or `max_delay` seconds after the first one.
+    A batch whose write fails is merged back and retried with exponential backoff,
+    up to `max_retry_delay` seconds apart.
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[dict]], Awaitable[int]],
+        max_batch: int = 500,
+        max_delay: float = 0.25,
+        max_retry_delay: float = 30.0
+    ):
+        self.write_batch = write_batch
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_retry_delay = max_retry_delay
+        self.failures = 0  # consecutive failed writes
+        self._pending: Dict[Tuple[str, Optional[str]], dict] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(
+        self,
+        alert_id: str,
+        status: str,
+        delivered_at: Optional[datetime] = None,
+        recipient_id: Optional[str] = None
+    ):
+        """Buffer one receipt; recipient_id restricts the update to alerts addressed to that user"""
+        if status not in STATUS_RANK:
+            return
+
+        merged = self._merge({
+            "alert_id": alert_id,
+            "acked_by": recipient_id,
+            "new_status": status,
+            "receipt_at": (delivered_at or datetime.utcnow()) if status == "delivered" else None,
+        })
+        if not merged:
+            return
+
+        # While writes are failing, a full batch waits for the backoff like the rest
+        if len(self._pending) >= self.max_batch and not self.failures:
+            self._schedule_flush(0)
+        elif self._flush_handle is None:
+            self._schedule_flush(self.max_delay)
+
+    def _merge(self, receipt: dict) -> bool:
+        """Buffer a receipt unless one at least as far along is already pending for it"""
+        key = (receipt["alert_id"], receipt["acked_by"])
+        current = self._pending.get(key)
+        if current is not None and STATUS_RANK[current["new_status"]] >= STATUS_RANK[receipt["new_status"]]:
+            return False
+        self._pending[key] = receipt
+        return True
+
+    def _schedule_flush(self, delay: float):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        loop = asyncio.get_running_loop()
+        self._flush_handle = loop.call_later(delay, self._start_flush)
+
+    def _start_flush(self):
+        # While a flush is running, receipts stay pending and that flush re-arms when it finishes
+        self._flush_handle = None
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self) -> int:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return 0
+
+        batch = list(self._pending.values())
+        self._pending.clear()
+        try:
+            written = await self.write_batch(batch)
+        except Exception as e:
+            # Receipts that arrived meanwhile win if they are further along
+            for receipt in batch:
+                self._merge(receipt)
+            self.failures += 1
+            delay = min(self.max_retry_delay, self.max_delay * 2 ** self.failures)
+            print(f"Delivery receipt flush error ({len(batch)} receipts, retrying in {delay:.2f}s): {e}")
+            self._schedule_flush(delay)
+            return 0
+        else:
+            self.failures = 0
+            return written
+        finally:
+            # Receipts that arrived during the write with no timer pending have already waited it out
+            if self._pending and self._flush_handle is None:
+                self._schedule_flush(0)
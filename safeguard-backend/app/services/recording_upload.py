@@ -0,0 +1,105 @@
+import asyncio
+import os
+from typing import AsyncContextManager, AsyncIterator
+import aiofiles
+from app.core.locks import KeyedLocks
+
+class UploadError(Exception):
+    """Base class for chunked upload failures"""
+
+class UploadOffsetMismatch(UploadError):
+    """The client's offset does not match what is already on disk"""
+
+    def __init__(self, expected: int):
+        super().__init__(f"Upload offset mismatch; server has {expected} bytes")
+        self.expected = expected
+
+class UploadTooLarge(UploadError):
+    """The chunk or the upload as a whole exceeds the configured limit"""
+
+class UploadClosed(UploadError):
+    """The upload was finalized or discarded while the chunk waited for it"""
+
+class ChunkedUploadStore:
+    """Append-only, resumable uploads streamed straight to disk
+
+    Each upload is a `.part` file whose size is the authoritative offset, so a
+    client that loses its connection asks for the offset and resumes from
+    there, and nothing survives a restart except what is already on disk.
+    Chunks are written as they arrive from the request stream, keeping memory
+    per upload constant regardless of the file size.
+    """
+
+    def __init__(self, root: str, max_size: int, max_chunk_size: int):
+        self.root = root
+        self.max_size = max_size
+        self.max_chunk_size = max_chunk_size
+        # Held by appends and by finalization; an upload nobody is writing has no entry
+        self._locks = KeyedLocks()
+
+    def lock(self, upload_id: str) -> AsyncContextManager[None]:
+        """Exclusive access to one upload; `append` takes it itself, callers of `finalize` must hold it"""
+        return self._locks.hold(upload_id)
+
+    def part_path(self, directory: str, upload_id: str) -> str:
+        return os.path.join(self.root, directory, f"{upload_id}.part")
+
+    def create(self, directory: str, upload_id: str) -> str:
+        path = self.part_path(directory, upload_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "ab").close()
+        return path
+
+    def offset(self, directory: str, upload_id: str) -> int:
+        try:
+            return os.path.getsize(self.part_path(directory, upload_id))
+        except FileNotFoundError:
+            return 0
+
+    async def append(
+        self,
+        directory: str,
+        upload_id: str,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+        total_size: int = None
+    ) -> int:
+        """Append a request body at `offset` and return the new offset"""
+        limit = min(self.max_size, total_size or self.max_size)
+        async with self.lock(upload_id):
+            if not os.path.exists(self.part_path(directory, upload_id)):
+                raise UploadClosed(f"Upload {upload_id} is no longer accepting data")
+            current = self.offset(directory, upload_id)
+            if offset != current:
+                raise UploadOffsetMismatch(current)
+
+            written = 0
+            async with aiofiles.open(self.part_path(directory, upload_id), "ab") as f:
+                try:
+                    async for chunk in chunks:
+                        written += len(chunk)
+                        if written > self.max_chunk_size or current + written > limit:
+                            raise UploadTooLarge(
+                                f"Chunk exceeds {self.max_chunk_size} bytes or upload exceeds {limit} bytes"
+                            )
+                        await f.write(chunk)
+                except UploadTooLarge:
+                    # Drop the partial chunk so the offset stays where the client expects it
+                    await f.flush()
+                    await f.truncate(current)
+                    raise
+                await f.flush()
+                await asyncio.to_thread(os.fsync, f.fileno())
+            return current + written
+
+    def finalize(self, directory: str, upload_id: str, extension: str) -> str:
+        """Atomically move a completed part file to its final name"""
+        final_path = os.path.join(self.root, directory, f"{upload_id}{extension}")
+        os.replace(self.part_path(directory, upload_id), final_path)
+        return final_path
+
+    def discard(self, directory: str, upload_id: str):
+        try:
+            os.remove(self.part_path(directory, upload_id))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+from app.utils.timer_wheel import TimerWheel, Timer
+
+class SafeWalk:
+    __slots__ = (
+        "walk_id", "user_id", "interval", "deadline", "latitude", "longitude",
+        "overdue", "timer"
+    )
+
+    def __init__(
+        self,
+        walk_id: str,
+        user_id: str,
+        interval: int,
+        deadline: datetime,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None
+    ):
+        self.walk_id = walk_id
+        self.user_id = user_id
+        self.interval = interval  # seconds between expected check-ins
+        self.deadline = deadline
+        self.latitude = latitude
+        self.longitude = longitude
+        self.overdue = False
+        self.timer: Optional[Timer] = None
+
+    @property
+    def has_location(self) -> bool:
+        return self.latitude is not None and self.longitude is not None
+
+    def to_status(self) -> Dict[str, Any]:
+        return {
+            "active": True,
+            "walk_id": self.walk_id,
+            "check_in_interval": self.interval,
+            "next_deadline": self.deadline.isoformat(),
+            "overdue": self.overdue
+        }
+
+class SafeWalkTracker:
+    """In-memory check-in deadlines for active safe walks
+
+    Each walk holds one timer on a shared TimerWheel, so starting, checking in
+    and ending are O(1) and nothing polls the database. When a deadline passes
+    `on_due` is called and the walk gets `grace` more seconds; if it is still
+    overdue after that it is dropped and `on_missed` is called. Callbacks may
+    be coroutine functions. The caller persists the walks and reloads them
+    with `start` after a restart.
+    """
+
+    def __init__(
+        self,
+        wheel: TimerWheel,
+        on_due: Callable[[SafeWalk], Any],
+        on_missed: Callable[[SafeWalk], Any],
+        grace: float = 60.0
+    ):
+        self.wheel = wheel
+        self.on_due = on_due
+        self.on_missed = on_missed
+        self.grace = grace
+        self.walks: Dict[str, SafeWalk] = {}
+        self.by_user: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.walks)
+
+    def get(self, walk_id: str) -> Optional[SafeWalk]:
+        return self.walks.get(walk_id)
+
+    def get_by_user(self, user_id: str) -> Optional[SafeWalk]:
+        walk_id = self.by_user.get(user_id)
+        return self.walks.get(walk_id) if walk_id else None
+
+    def start(self, walk: SafeWalk, now: datetime = None) -> SafeWalk:
+        self.end(walk.walk_id)
+        self.walks[walk.walk_id] = walk
+        self.by_user[walk.user_id] = walk.walk_id
+        self._arm(walk, walk.deadline, self._due, now)
+        return walk
+
+    def check_in(
+        self,
+        walk_id: str,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        now: datetime = None
+    ) -> Optional[SafeWalk]:
+        walk = self.walks.get(walk_id)
+        if walk is None:
+            return None
+        now = now or datetime.utcnow()
+        walk.deadline = now + timedelta(seconds=walk.interval)
+        walk.overdue = False
+        if latitude is not None and longitude is not None:
+            walk.latitude, walk.longitude = latitude, longitude
+        self._arm(walk, walk.deadline, self._due, now)
+        return walk
+
+    def end(self, walk_id: str) -> Optional[SafeWalk]:
+        walk = self.walks.pop(walk_id, None)
+        if walk is None:
+            return None
+        self.wheel.cancel(walk.timer)
+        walk.timer = None
+        if self.by_user.get(walk.user_id) == walk_id:
+            del self.by_user[walk.user_id]
+        return walk
+
+    def _arm(self, walk: SafeWalk, at: datetime, callback: Callable, now: datetime = None):
+        delay = (at - (now or datetime.utcnow())).total_seconds()
+        if walk.timer is None:
+            walk.timer = self.wheel.schedule(delay, callback, walk.walk_id)
+        else:
+            # Check-ins reuse the walk's timer, keeping the hot path allocation-free
+            self.wheel.reschedule(walk.timer, delay, callback)
+
+    def _due(self, walk_id: str):
+        walk = self.walks.get(walk_id)
+        if walk is None:
+            return None
+        walk.overdue = True
+        self.wheel.reschedule(walk.timer, self.grace, self._missed)
+        return self.on_due(walk)
+
+    def _missed(self, walk_id: str):
+        walk = self.walks.get(walk_id)
+        if walk is None or not walk.overdue:
+            return None
+        self.end(walk_id)
+        return self.on_missed(walk)
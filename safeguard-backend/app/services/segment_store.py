@@ -0,0 +1,168 @@
+import asyncio
+import os
+import struct
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+# seq, offset, length, received_at
+INDEX_RECORD = struct.Struct("<IQId")
+SEQ_LIMIT = 2 ** 32  # seq is stored unsigned in 32 bits
+
+class SegmentTooLarge(Exception):
+    """A segment or the session's recording exceeds the configured limit"""
+
+def read_index(directory: str) -> Tuple[List[tuple], Optional[str], int]:
+    """Index records and mime type of a recording; a torn trailing record is ignored"""
+    try:
+        with open(os.path.join(directory, "audio.idx"), "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        raw = b""
+    usable = len(raw) - len(raw) % INDEX_RECORD.size
+    mime_type = None
+    mime_path = os.path.join(directory, "mime")
+    if os.path.exists(mime_path):
+        with open(mime_path) as f:
+            mime_type = f.read().strip() or None
+    return list(INDEX_RECORD.iter_unpack(raw[:usable])), mime_type, usable
+
+class SegmentedRecording:
+    """One session's live audio: an append-only data file plus a fixed-width index"""
+
+    __slots__ = ("directory", "data_fd", "index_fd", "size", "segments", "seqs", "last_seq", "mime_type", "lock")
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+        self.data_fd = os.open(os.path.join(directory, "audio.bin"), flags, 0o600)
+        self.index_fd = os.open(os.path.join(directory, "audio.idx"), flags, 0o600)
+        self.segments: List[tuple] = []
+        self.seqs: Set[int] = set()
+        self.mime_type: Optional[str] = None
+        # Held across each append's writes, which run off the event loop
+        self.lock = asyncio.Lock()
+        self._load()
+
+    def _load(self):
+        """Rebuild the in-memory index and drop any data written after the last full record"""
+        self.segments, self.mime_type, usable = read_index(self.directory)
+        self.size = self.segments[-1][1] + self.segments[-1][2] if self.segments else 0
+        self.seqs = {record[0] for record in self.segments}
+        self.last_seq = max(self.seqs, default=-1)
+        if os.fstat(self.data_fd).st_size != self.size:
+            os.ftruncate(self.data_fd, self.size)
+        if os.fstat(self.index_fd).st_size != usable:
+            os.ftruncate(self.index_fd, usable)
+
+    def close(self):
+        os.close(self.data_fd)
+        os.close(self.index_fd)
+
+class SegmentStore:
+    """Live audio segments written straight to per-session files
+
+    Segments are appended with plain os.write calls on descriptors kept open
+    for the session, then indexed with one fixed-width record each, so a
+    segment costs two small writes and no re-encoding. Sequence numbers make
+    retransmits idempotent; a segment that arrives late is still stored, in
+    arrival order, and its index entry carries its seq. Readers serve byte
+    ranges of `data_path` directly.
+    """
+
+    def __init__(self, root: str, max_segment_size: int, max_session_size: int):
+        self.root = root
+        self.max_segment_size = max_segment_size
+        self.max_session_size = max_session_size
+        self.open: Dict[str, SegmentedRecording] = {}
+
+    def directory(self, session_id: str) -> str:
+        return os.path.join(self.root, session_id)
+
+    def data_path(self, session_id: str) -> str:
+        return os.path.join(self.directory(session_id), "audio.bin")
+
+    def _recording(self, session_id: str) -> SegmentedRecording:
+        recording = self.open.get(session_id)
+        if recording is None:
+            recording = self.open[session_id] = SegmentedRecording(self.directory(session_id))
+        return recording
+
+    async def append(self, session_id: str, seq: int, data: bytes, mime_type: str = None) -> Optional[dict]:
+        """Store one segment; returns its index entry, or None if that seq is already stored"""
+        if len(data) > self.max_segment_size:
+            raise SegmentTooLarge(f"Segment exceeds {self.max_segment_size} bytes")
+
+        recording = self._recording(session_id)
+        async with recording.lock:
+            if seq in recording.seqs:
+                return None
+            if recording.size + len(data) > self.max_session_size:
+                raise SegmentTooLarge(f"Live recording exceeds {self.max_session_size} bytes")
+
+            record = (seq, recording.size, len(data), time.time())
+            # Packed first: a record that cannot be indexed must not leave its data behind
+            packed = INDEX_RECORD.pack(*record)
+            write_mime = recording.mime_type is None and bool(mime_type)
+            try:
+                await asyncio.to_thread(self._write, recording, data, packed, mime_type if write_mime else None)
+            except OSError:
+                # Cut back to the last whole segment so the next append lands where the index expects
+                os.ftruncate(recording.data_fd, recording.size)
+                os.ftruncate(recording.index_fd, len(recording.segments) * INDEX_RECORD.size)
+                raise
+            if write_mime:
+                recording.mime_type = mime_type
+            recording.segments.append(record)
+            recording.seqs.add(seq)
+            recording.size += len(data)
+            recording.last_seq = max(recording.last_seq, seq)
+            return self._entry(record)
+
+    @staticmethod
+    def _write(recording: SegmentedRecording, data: bytes, packed: bytes, mime_type: Optional[str]):
+        if mime_type:
+            with open(os.path.join(recording.directory, "mime"), "w") as f:
+                f.write(mime_type)
+        os.write(recording.data_fd, data)
+        os.write(recording.index_fd, packed)
+
+    def index(self, session_id: str) -> Optional[dict]:
+        recording = self.open.get(session_id)
+        if recording is not None:
+            segments, mime_type, size = recording.segments, recording.mime_type, recording.size
+        else:
+            # Finished sessions are read without reopening them for writing
+            if not os.path.isdir(self.directory(session_id)):
+                return None
+            segments, mime_type, _ = read_index(self.directory(session_id))
+            size = segments[-1][1] + segments[-1][2] if segments else 0
+        return {
+            "size": size,
+            "mime_type": mime_type,
+            "segments": [self._entry(record) for record in segments]
+        }
+
+    def size(self, session_id: str) -> int:
+        """Bytes covered by the index; readers never see a segment that is still being written"""
+        recording = self.open.get(session_id)
+        if recording is not None:
+            return recording.size
+        index = self.index(session_id)
+        return index["size"] if index else 0
+
+    async def close(self, session_id: str):
+        recording = self.open.pop(session_id, None)
+        if recording is not None:
+            # Let an append already writing finish before its descriptors go away
+            async with recording.lock:
+                recording.close()
+
+    async def close_all(self):
+        for session_id in list(self.open):
+            await self.close(session_id)
+
+    @staticmethod
+    def _entry(record: tuple) -> dict:
+        seq, offset, length, received_at = record
+        return {"seq": seq, "offset": offset, "length": length, "received_at": received_at}
@@ -0,0 +1,157 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import random
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import httpx
+
+# Failures before the request left this host; anything later (a read timeout, a dropped
+# connection) may follow a message the provider accepted, and resending would text twice
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+class SMSError(Exception):
+    """Permanent provider failure; the message should not be retried"""
+
+class SMSRetryableError(SMSError):
+    """Transient provider failure (throttling, 5xx)"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class SMSProvider:
+    """Provider interface: turn one message into one HTTP call on a shared client"""
+
+    name = "base"
+
+    async def send(
+        self,
+        client: httpx.AsyncClient,
+        to: str,
+        body: str,
+        status_callback: Optional[str] = None
+    ) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @staticmethod
+    def raise_for_status(response: httpx.Response):
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = response.headers.get("retry-after")
+            raise SMSRetryableError(
+                f"Provider returned {response.status_code}",
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None
+            )
+        if response.status_code >= 400:
+            raise SMSError(f"Provider returned {response.status_code}: {response.text[:200]}")
+
+class TwilioProvider(SMSProvider):
+    """Twilio Messages REST API called directly over the shared connection pool"""
+
+    name = "twilio"
+
+    def __init__(
+        self,
+        account_sid: str,
+        auth_token: str,
+        from_number: str,
+        base_url: str = "https://api.twilio.com",
+        status_callback: Optional[str] = None
+    ):
+        self.auth = (account_sid, auth_token)
+        self.from_number = from_number
+        self.url = f"{base_url.rstrip('/')}/2010-04-01/Accounts/{account_sid}/Messages.json"
+        self.status_callback = status_callback
+
+    async def send(
+        self,
+        client: httpx.AsyncClient,
+        to: str,
+        body: str,
+        status_callback: Optional[str] = None
+    ) -> Dict[str, Any]:
+        data = {"To": to, "From": self.from_number, "Body": body}
+        if status_callback or self.status_callback:
+            data["StatusCallback"] = status_callback or self.status_callback
+
+        response = await client.post(self.url, data=data, auth=self.auth)
+        self.raise_for_status(response)
+        return {"success": True, "message_sid": response.json().get("sid")}
+
+    def validate_signature(self, url: str, params: Dict[str, str], signature: str) -> bool:
+        """Check X-Twilio-Signature: HMAC-SHA1 of the URL followed by the sorted form fields"""
+        payload = url + "".join(f"{key}{params[key]}" for key in sorted(params))
+        digest = hmac.new(self.auth[1].encode(), payload.encode(), hashlib.sha1).digest()
+        return hmac.compare_digest(base64.b64encode(digest).decode(), signature or "")
+
+class SMSTransport:
+    """Async SMS sender with a persistent connection pool, bounded parallelism and jittered retries"""
+
+    def __init__(
+        self,
+        provider: SMSProvider,
+        max_parallel: int = 10,
+        max_connections: int = 20,
+        max_retries: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+        timeout: float = 10.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.provider = provider
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.semaphore = asyncio.Semaphore(max_parallel)
+        self._client_kwargs = {
+            "timeout": timeout,
+            "limits": httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            "transport": transport,
+        }
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily so the pool binds to the running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(**self._client_kwargs)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than a provider Retry-After"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    async def send(self, to: str, body: str, status_callback: Optional[str] = None) -> Dict[str, Any]:
+        async with self.semaphore:
+            attempt = 0
+            while True:
+                try:
+                    result = await self.provider.send(self.client, to, body, status_callback)
+                    result["attempts"] = attempt + 1
+                    return result
+                except SMSRetryableError as e:
+                    error, retry_after = e, e.retry_after
+                except UNSENT_ERRORS as e:
+                    error, retry_after = e, None
+                except (SMSError, httpx.TransportError) as e:
+                    return {"success": False, "error": str(e) or type(e).__name__, "attempts": attempt + 1}
+
+                if attempt >= self.max_retries:
+                    return {"success": False, "error": str(error), "attempts": attempt + 1}
+                await asyncio.sleep(self.backoff(attempt, retry_after))
+                attempt += 1
+
+    async def send_many(self, messages: Iterable[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Send (to, body) pairs concurrently; results keep the input order"""
+        return await asyncio.gather(*(self.send(to, body) for to, body in messages))
@@ -0,0 +1,34 @@
+import re
+from typing import Optional
+
+_NON_DIGITS = re.compile(r"\D")
+
+def normalize_phone(phone: Optional[str], default_country_code: str = "1") -> Optional[str]:
+    """Normalize a phone number to E.164 (+<country code><subscriber number>)
+
+    Returns None when the input cannot be a valid E.164 number.
+    """
+    if not phone:
+        return None
+
+    raw = phone.strip()
+    digits = _NON_DIGITS.sub("", raw)
+    if not digits:
+        return None
+
+    if raw.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        # International dialling prefix
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith("0"):
+        # National trunk prefix, e.g. 0 98765 43210
+        digits = default_country_code + digits[1:]
+    elif len(digits) <= 10:
+        digits = default_country_code + digits
+
+    # E.164 allows at most 15 digits and country codes never start with 0
+    if not 8 <= len(digits) <= 15 or digits.startswith("0"):
+        return None
+
+    return f"+{digits}"
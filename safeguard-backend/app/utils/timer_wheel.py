@@ -0,0 +1,168 @@
+import asyncio
+import inspect
+import itertools
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+class Timer:
+    __slots__ = ("id", "expires", "callback", "args", "slot")
+
+    def __init__(self, timer_id: int, expires: int, callback: Callable, args: tuple):
+        self.id = timer_id
+        self.expires = expires  # absolute tick
+        self.callback = callback
+        self.args = args
+        self.slot: Optional[Dict[int, "Timer"]] = None
+
+    @property
+    def active(self) -> bool:
+        return self.slot is not None
+
+class TimerWheel:
+    """Hierarchical timing wheel with O(1) schedule and cancel
+
+    Time is divided into ticks of `tick` seconds. Level 0 has one slot per
+    tick; each higher level covers `2 ** slot_bits` slots of the level below
+    and is cascaded down as time reaches it. Timers further out than the whole
+    wheel wait in an overflow slot that is re-examined once per top-level turn.
+    """
+
+    def __init__(
+        self,
+        tick: float = 1.0,
+        slot_bits: int = 8,
+        levels: int = 4,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.tick = tick
+        self.slot_bits = slot_bits
+        self.levels = levels
+        self.mask = (1 << slot_bits) - 1
+        self.clock = clock
+        self.wheels: List[List[Dict[int, Timer]]] = [
+            [{} for _ in range(1 << slot_bits)] for _ in range(levels)
+        ]
+        self.overflow: Dict[int, Timer] = {}
+        # (span, shift, slots) per level, checked in order by _place
+        self._levels = [
+            (1 << (slot_bits * (level + 1)), slot_bits * level, self.wheels[level])
+            for level in range(levels)
+        ]
+        self.current = self._tick_of(clock())
+        self.count = 0
+        self._ids = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        # The event loop keeps only weak references to tasks, so running callbacks are held here
+        self._callbacks: Set[asyncio.Future] = set()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _tick_of(self, when: float) -> int:
+        return int(when / self.tick)
+
+    def schedule(self, delay: float, callback: Callable, *args: Any) -> Timer:
+        """Run callback(*args) after `delay` seconds (rounded up to the next tick)"""
+        return self.schedule_at(self.clock() + max(0.0, delay), callback, *args)
+
+    def schedule_at(self, when: float, callback: Callable, *args: Any) -> Timer:
+        """Run callback(*args) once the wheel's clock reaches `when`"""
+        expires = max(self.current + 1, math.ceil(when / self.tick))
+        timer = Timer(next(self._ids), expires, callback, args)
+        self._place(timer)
+        self.count += 1
+        return timer
+
+    def reschedule(self, timer: Timer, delay: float, callback: Callable = None) -> Timer:
+        """Move an existing (pending or fired) timer to a new deadline without allocating"""
+        self.cancel(timer)
+        timer.expires = max(self.current + 1, math.ceil((self.clock() + max(0.0, delay)) / self.tick))
+        if callback is not None:
+            timer.callback = callback
+        self._place(timer)
+        self.count += 1
+        return timer
+
+    def cancel(self, timer: Optional[Timer]) -> bool:
+        if timer is None or timer.slot is None:
+            return False
+        del timer.slot[timer.id]
+        timer.slot = None
+        self.count -= 1
+        return True
+
+    def _place(self, timer: Timer):
+        expires = timer.expires
+        delta = expires - self.current
+        for span, shift, slots in self._levels:
+            if delta < span:
+                slot = slots[(expires >> shift) & self.mask]
+                break
+        else:
+            slot = self.overflow
+        slot[timer.id] = timer
+        timer.slot = slot
+
+    def advance(self, now: float = None) -> List[Timer]:
+        """Move the wheel up to `now` and return (without running) every expired timer"""
+        target = self._tick_of(self.clock() if now is None else now)
+        expired: List[Timer] = []
+        while self.current < target:
+            self.current += 1
+            tick = self.current
+
+            # Cascade from the highest level whose lower bits just wrapped
+            for level in range(self.levels - 1, 0, -1):
+                if tick & ((1 << (self.slot_bits * level)) - 1) == 0:
+                    if level == self.levels - 1 and self.overflow:
+                        self._replace_all(self.overflow)
+                    index = (tick >> (self.slot_bits * level)) & self.mask
+                    self._replace_all(self.wheels[level][index])
+
+            slot = self.wheels[0][tick & self.mask]
+            if slot:
+                for timer in slot.values():
+                    timer.slot = None
+                expired.extend(slot.values())
+                self.count -= len(slot)
+                slot.clear()
+        return expired
+
+    def _replace_all(self, slot: Dict[int, Timer]):
+        timers = list(slot.values())
+        slot.clear()
+        for timer in timers:
+            self._place(timer)
+
+    def run_due(self, now: float = None) -> int:
+        """Run every expired callback; coroutine callbacks are scheduled as tasks"""
+        expired = self.advance(now)
+        for timer in expired:
+            try:
+                result = timer.callback(*timer.args)
+                if inspect.isawaitable(result):
+                    task = asyncio.ensure_future(result)
+                    self._callbacks.add(task)
+                    task.add_done_callback(self._callbacks.discard)
+            except Exception as e:
+                print(f"Timer callback error: {e}")
+        return len(expired)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.tick)
+            self.run_due()
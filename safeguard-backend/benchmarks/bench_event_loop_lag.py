@@ -0,0 +1,135 @@
+"""Event-loop lag under heavy database work: sync Session vs AsyncSession.
+
+A probe coroutine sleeps 10 ms in a loop and records how late it wakes up;
+every socket event and timer on the loop waits that long on top of its own
+work. Meanwhile a pool of workers, each standing in for a request handler,
+scans recent location history around a random point (a grouped scan over
+the seeded fixes) or bulk-inserts a batch of fixes. Each mode runs for a
+fixed time: first through the sync session the handlers used to call from
+coroutines, then through the async session they use now.
+
+    python -m benchmarks.bench_event_loop_lag --fixes 200000 --workers 8 --seconds 5
+    python -m benchmarks.bench_event_loop_lag --write-ratio 0.5 --batch 500
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+_tmpdir = tempfile.mkdtemp(prefix="safeguard-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/app.db")
+
+from sqlalchemy import func, insert, select  # noqa: E402
+from app.main import AsyncSessionLocal, SessionLocal, User, UserLocation  # noqa: E402  (DATABASE_URL must be set first)
+from benchmarks.load_mass_incident import LoopLagProbe, percentile  # noqa: E402
+
+VENUE_LAT, VENUE_LNG = 12.97, 77.59
+
+def location_rows(user_ids, count, rng):
+    now = datetime.utcnow()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": rng.choice(user_ids),
+            "latitude": VENUE_LAT + rng.uniform(-0.1, 0.1),
+            "longitude": VENUE_LNG + rng.uniform(-0.1, 0.1),
+            "timestamp": now - timedelta(seconds=rng.randrange(600)),
+            "is_emergency": False
+        }
+        for _ in range(count)
+    ]
+
+def seed(users, fixes, rng):
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    db = SessionLocal()
+    try:
+        db.execute(insert(User), [
+            {"id": user_id, "email": f"{user_id}@bench.local", "name": "Bench"} for user_id in user_ids
+        ])
+        for start in range(0, fixes, 10000):
+            db.execute(insert(UserLocation), location_rows(user_ids, min(10000, fixes - start), rng))
+        db.commit()
+    finally:
+        db.close()
+    return user_ids
+
+def recent_fixes_query(rng):
+    """Users seen in the last 5 minutes within ~2 km of a random point"""
+    lat = VENUE_LAT + rng.uniform(-0.05, 0.05)
+    lng = VENUE_LNG + rng.uniform(-0.05, 0.05)
+    return select(UserLocation.user_id, func.max(UserLocation.timestamp)).where(
+        UserLocation.timestamp > datetime.utcnow() - timedelta(minutes=5),
+        UserLocation.latitude.between(lat - 0.02, lat + 0.02),
+        UserLocation.longitude.between(lng - 0.02, lng + 0.02)
+    ).group_by(UserLocation.user_id)
+
+async def sync_worker(user_ids, rng, args, counts, stop):
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            if rng.random() < args.write_ratio:
+                db.execute(insert(UserLocation), location_rows(user_ids, args.batch, rng))
+                db.commit()
+                counts["writes"] += 1
+            else:
+                db.execute(recent_fixes_query(rng)).all()
+                counts["reads"] += 1
+        finally:
+            db.close()
+        await asyncio.sleep(0)
+
+async def async_worker(user_ids, rng, args, counts, stop):
+    while not stop.is_set():
+        async with AsyncSessionLocal() as db:
+            if rng.random() < args.write_ratio:
+                await db.execute(insert(UserLocation), location_rows(user_ids, args.batch, rng))
+                await db.commit()
+                counts["writes"] += 1
+            else:
+                (await db.execute(recent_fixes_query(rng))).all()
+                counts["reads"] += 1
+
+async def run_mode(worker, user_ids, args):
+    counts = {"reads": 0, "writes": 0}
+    stop = asyncio.Event()
+    probe = LoopLagProbe()
+    probe.start()
+    rng = random.Random(args.seed)
+    tasks = [] if worker is None else [
+        asyncio.create_task(worker(user_ids, random.Random(rng.random()), args, counts, stop))
+        for _ in range(args.workers)
+    ]
+    started = time.perf_counter()
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    await probe.stop()
+    return counts["reads"] / elapsed, counts["writes"] / elapsed, probe.samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--fixes", type=int, default=200000, help="seeded location history")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent handlers doing database work")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="share of operations that insert")
+    parser.add_argument("--batch", type=int, default=200, help="fixes per insert")
+    parser.add_argument("--seconds", type=float, default=5.0, help="per mode")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    user_ids = seed(args.users, args.fixes, random.Random(args.seed))
+    print(f"seeded {args.users} users, {args.fixes} fixes in {time.perf_counter() - started:.1f} s under {_tmpdir}")
+    print(f"{'mode':<14} {'scans/s':>8} {'inserts/s':>10}   {'lag p50':>8} {'p99':>8} {'max':>8}")
+    for name, worker in (("idle", None), ("sync session", sync_worker), ("async session", async_worker)):
+        reads, writes, lag = asyncio.run(run_mode(worker, user_ids, args))
+        print(f"{name:<14} {reads:8.1f} {writes:10.1f}   {percentile(lag, 50) * 1e3:6.1f} ms "
+              f"{percentile(lag, 99) * 1e3:6.1f} ms {max(lag, default=0) * 1e3:6.1f} ms")
+
+if __name__ == "__main__":
+    main()
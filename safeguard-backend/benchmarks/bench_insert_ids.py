@@ -0,0 +1,117 @@
+"""Insert throughput and primary key index size: random text UUIDs vs time-ordered 16-byte ids.
+
+Appends location fixes in batches, one commit per batch like the live
+tracker's flush, into a fresh user_locations-shaped table for each key
+scheme: uuid4 text (before), uuid4 as a 16-byte BLOB (size alone) and
+UUIDv7 as a 16-byte BLOB (size and order, what the models use now). Random
+keys land on any page of the primary key index, so once it outgrows the page
+cache most batches read and split cold pages; ordered keys always append to
+the rightmost page. A small --cache-mb stands in for a table that has grown
+well past the cache.
+
+    python -m benchmarks.bench_insert_ids --rows 1000000 --batch 500
+    python -m benchmarks.bench_insert_ids --rows 300000 --cache-mb 64
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import (
+    Boolean, Column, DateTime, Float, Index, MetaData, String, Table, create_engine, event, insert
+)
+from app.core.ids import UUIDBlob, new_id
+
+SCHEMES = (
+    ("uuid4 text", String, lambda: str(uuid.uuid4())),
+    ("uuid4 blob", UUIDBlob, lambda: str(uuid.uuid4())),
+    ("uuid7 blob", UUIDBlob, new_id),
+)
+
+def location_table(id_type) -> Table:
+    return Table(
+        "user_locations",
+        MetaData(),
+        Column("id", id_type, primary_key=True),
+        Column("user_id", String, nullable=False),
+        Column("latitude", Float, nullable=False),
+        Column("longitude", Float, nullable=False),
+        Column("accuracy", Float),
+        Column("timestamp", DateTime),
+        Column("is_emergency", Boolean),
+        Index("ix_user_locations_user_timestamp", "user_id", "timestamp"),
+        Index("ix_user_locations_timestamp", "timestamp")
+    )
+
+def run(path, id_type, make_id, args):
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        # The "performance" profile, with the page cache sized by --cache-mb
+        for pragma in ("journal_mode=WAL", "synchronous=NORMAL", f"cache_size={-args.cache_mb * 1024}"):
+            dbapi_connection.execute(f"PRAGMA {pragma}")
+
+    table = location_table(id_type)
+    table.create(engine)
+    rng = random.Random(args.seed)
+    user_ids = [str(uuid.uuid4()) for _ in range(args.users)]
+    tail_start = args.rows - args.rows // 10
+    tail_elapsed = 0.0
+
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        for start in range(0, args.rows, args.batch):
+            batch_started = time.perf_counter()
+            now = datetime.utcnow()
+            connection.execute(insert(table), [
+                {
+                    "id": make_id(),
+                    "user_id": rng.choice(user_ids),
+                    "latitude": 12.97 + rng.uniform(-0.1, 0.1),
+                    "longitude": 77.59 + rng.uniform(-0.1, 0.1),
+                    "accuracy": 10.0,
+                    "timestamp": now,
+                    "is_emergency": True
+                }
+                for _ in range(min(args.batch, args.rows - start))
+            ])
+            connection.commit()
+            if start >= tail_start:
+                tail_elapsed += time.perf_counter() - batch_started
+        elapsed = time.perf_counter() - started
+        connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        pages, size, unused = connection.exec_driver_sql(
+            "SELECT COUNT(*), SUM(pgsize), SUM(unused) FROM dbstat WHERE name = 'sqlite_autoindex_user_locations_1'"
+        ).one()
+    engine.dispose()
+    return {
+        "rows_per_s": args.rows / elapsed,
+        "tail_rows_per_s": (args.rows - tail_start) / tail_elapsed,
+        "pk_mb": size / 2**20,
+        "pk_fill": 1 - unused / size,
+        "file_mb": os.path.getsize(path) / 2**20
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=500, help="fixes per commit")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--cache-mb", type=int, default=8, help="page cache per connection")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="safeguard-bench-")
+    print(f"{args.rows} rows in batches of {args.batch}, {args.cache_mb} MiB cache, under {tmpdir}")
+    print(f"{'key':<12} {'rows/s':>9} {'last 10%':>9}   {'pk index':>9} {'fill':>5} {'file':>9}")
+    for name, id_type, make_id in SCHEMES:
+        result = run(os.path.join(tmpdir, name.replace(" ", "_") + ".db"), id_type, make_id, args)
+        print(f"{name:<12} {result['rows_per_s']:9.0f} {result['tail_rows_per_s']:9.0f}   "
+              f"{result['pk_mb']:6.1f} MB {result['pk_fill']:5.0%} {result['file_mb']:6.1f} MB")
+
+if __name__ == "__main__":
+    main()
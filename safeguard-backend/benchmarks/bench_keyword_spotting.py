@@ -0,0 +1,115 @@
+"""Server-side keyword spotting: real-time factor per stream and streams per core.
+
+Speech is synthesized (formant-like tone sequences) so the benchmark runs
+without audio fixtures: one keyword is enrolled from three time-stretched,
+noisy takes (by default), then each stream is background "babble" with the keyword spoken
+a few times, fed in 100 ms chunks the way the socket delivers it.
+
+    python -m benchmarks.bench_keyword_spotting --streams 4 --seconds 60
+    python -m benchmarks.bench_keyword_spotting --no-early-abandon
+    python -m benchmarks.bench_keyword_spotting --phonemes 14 --takes 5
+"""
+import argparse
+import time
+import numpy as np
+from app.services.keyword_spotter import SAMPLE_RATE, KeywordSpotter, KeywordStream, MFCCExtractor
+
+def make_phonemes(rng, count):
+    return [
+        (rng.uniform(250, 900, 1), rng.uniform(900, 2400, 1), rng.uniform(2400, 3600, 1), rng.uniform(0.08, 0.2))
+        for _ in range(count)
+    ]
+
+def speak(phonemes, rng, stretch=0.0, jitter=0.0, noise=0.01):
+    parts = []
+    for f1, f2, f3, duration in phonemes:
+        seconds = duration * (1.0 + rng.uniform(-stretch, stretch))
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        scale = 1.0 + rng.uniform(-jitter, jitter)
+        envelope = np.sin(np.pi * t / seconds) ** 0.5
+        tone = (np.sin(2 * np.pi * f1 * scale * t) + 0.6 * np.sin(2 * np.pi * f2 * scale * t)
+                + 0.3 * np.sin(2 * np.pi * f3 * scale * t))
+        parts.append(envelope * tone)
+    signal = np.concatenate(parts) * 0.25
+    return signal + rng.normal(0, noise, len(signal))
+
+def to_pcm(signal):
+    return (np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes()
+
+def silence(rng, seconds, noise=0.01):
+    return rng.normal(0, noise, int(seconds * SAMPLE_RATE))
+
+def make_stream(keyword, rng, seconds, occurrences):
+    pieces, spoken_at, elapsed = [], [], 0.0
+    slots = sorted(rng.choice(np.arange(2, int(seconds) - 2), occurrences, replace=False))
+    for slot in slots:
+        while elapsed < slot:
+            babble = speak(make_phonemes(rng, rng.integers(3, 7)), rng) if rng.random() < 0.7 else silence(rng, 0.4)
+            pieces.append(babble)
+            elapsed += len(babble) / SAMPLE_RATE
+        take = speak(keyword, rng, stretch=0.15, jitter=0.03)
+        pieces.append(take)
+        elapsed += len(take) / SAMPLE_RATE
+        spoken_at.append(elapsed)
+    while elapsed < seconds:
+        babble = speak(make_phonemes(rng, rng.integers(3, 7)), rng)
+        pieces.append(babble)
+        elapsed += len(babble) / SAMPLE_RATE
+    return np.concatenate(pieces), spoken_at
+
+def run_stream(spotter, extractor, audio, early_abandon, chunk_seconds):
+    stream = KeywordStream(spotter, extractor, early_abandon=early_abandon)
+    chunk = int(chunk_seconds * SAMPLE_RATE) * 2
+    pcm = to_pcm(audio)
+    detections = []
+    start = time.perf_counter()
+    for offset in range(0, len(pcm), chunk):
+        if stream.feed(pcm[offset:offset + chunk]) is not None:
+            detections.append((offset + chunk) / 2 / SAMPLE_RATE)
+    return time.perf_counter() - start, detections
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=60.0, help="audio per stream")
+    parser.add_argument("--occurrences", type=int, default=5, help="keyword utterances per stream")
+    parser.add_argument("--chunk-ms", type=float, default=100.0)
+    parser.add_argument("--phonemes", type=int, default=6, help="keyword length in synthetic phonemes")
+    parser.add_argument("--takes", type=int, default=3, help="enrollment recordings")
+    parser.add_argument("--no-early-abandon", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    extractor = MFCCExtractor()
+    keyword = make_phonemes(rng, args.phonemes)
+    takes = [to_pcm(np.concatenate([silence(rng, 0.3), speak(keyword, rng, 0.15, 0.03), silence(rng, 0.3)]))
+             for _ in range(args.takes)]
+    started = time.perf_counter()
+    spotter = KeywordSpotter.enroll("bench", takes, extractor)
+    print(f"enrolled {len(spotter.templates)} templates "
+          f"({', '.join(map(str, spotter.lengths))} frames), "
+          f"threshold {spotter.threshold:.2f}, in {(time.perf_counter() - started) * 1e3:.1f} ms")
+
+    total_audio = total_cpu = 0.0
+    hits = spoken = false_alarms = 0
+    for index in range(args.streams):
+        audio, spoken_at = make_stream(keyword, rng, args.seconds, args.occurrences)
+        cpu, detections = run_stream(spotter, extractor, audio, not args.no_early_abandon, args.chunk_ms / 1000)
+        seconds = len(audio) / SAMPLE_RATE
+        matched = [d for d in detections if any(-1.0 <= d - s <= 1.0 for s in spoken_at)]
+        hits += len({min(spoken_at, key=lambda s: abs(d - s)) for d in matched})
+        spoken += len(spoken_at)
+        false_alarms += len(detections) - len(matched)
+        total_audio += seconds
+        total_cpu += cpu
+        print(f"stream {index}: {seconds:6.1f} s audio, {cpu * 1e3:8.1f} ms CPU, RTF {cpu / seconds:.4f}, "
+              f"detected {len(matched)}/{len(spoken_at)}, false alarms {len(detections) - len(matched)}")
+
+    rtf = total_cpu / total_audio
+    mode = "off" if args.no_early_abandon else "on"
+    print(f"\nearly abandoning {mode}: RTF {rtf:.4f} per stream = {1 / rtf:,.0f} concurrent streams per core; "
+          f"recall {hits}/{spoken}, false alarms {false_alarms}")
+
+if __name__ == "__main__":
+    main()
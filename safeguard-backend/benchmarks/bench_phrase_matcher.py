@@ -0,0 +1,112 @@
+"""Voice phrase verification throughput: cached compiled matcher vs compiling per call vs plain containment.
+
+Also replays the transcripts as interim results growing one word at a time and
+compares rescanning every interim transcript with feeding word deltas to a
+TranscriptStream. Streaming matches whole words by phonetic key, so it misses
+split/merged words ("helpme") that the fuzzy matcher catches on the final result.
+
+Finally matches against users with several active phrases, comparing one
+PhraseSet pass with matching each phrase in turn.
+
+    python -m benchmarks.bench_phrase_matcher --transcripts 50000 --words 12
+    python -m benchmarks.bench_phrase_matcher --phrase-counts 1,5,20,50
+"""
+import argparse
+import random
+import time
+from app.services.phrase_matcher import CompiledPhrase, PhraseAutomaton, PhraseSet, TranscriptStream
+
+VOCABULARY = (
+    "the a i you we please now here there call police someone stop go come back "
+    "okay where what is are am at in on with my me help need get away leave alone "
+    "phone home street car bus train tonight tomorrow right left wait listen"
+).split()
+
+PHRASES = ["help me now", "red umbrella", "call 911", "pineapple express", "i need my mom"]
+
+# Recognition variants the matcher should accept
+VARIANTS = {
+    "help me now": ["help me, now", "helpme now", "help me know", "halp me now"],
+    "red umbrella": ["red umbrella!", "redumbrella", "red umbrela"],
+    "call 911": ["call nine one one", "call 9-1-1", "Call 911."],
+    "pineapple express": ["pine apple express", "pineapple expres"],
+    "i need my mom": ["I need my mum", "i need my mom!"],
+}
+
+def make_transcripts(count, words, hit_rate, rng):
+    transcripts = []
+    for _ in range(count):
+        phrase = rng.choice(PHRASES)
+        filler = [rng.choice(VOCABULARY) for _ in range(words)]
+        if rng.random() < hit_rate:
+            filler.insert(rng.randrange(len(filler) + 1), rng.choice(VARIANTS[phrase]))
+        transcripts.append((phrase, " ".join(filler)))
+    return transcripts
+
+def bench(label, fn, transcripts):
+    start = time.perf_counter()
+    matched = sum(1 for phrase, transcript in transcripts if fn(phrase, transcript))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {len(transcripts) / elapsed:12,.0f} transcripts/s  matched {matched}")
+
+def bench_streaming(transcripts, compiled_phrases):
+    interim = 0
+    start = time.perf_counter()
+    rescanned = 0
+    for phrase, transcript in transcripts:
+        compiled = compiled_phrases[phrase]
+        words = transcript.split()
+        for end in range(1, len(words) + 1):
+            interim += 1
+            if compiled.match(" ".join(words[:end]))[0]:
+                rescanned += 1
+                break
+    rescan = time.perf_counter() - start
+
+    automata = {phrase: PhraseAutomaton([compiled_phrases[phrase]]) for phrase in PHRASES}
+    deltas = 0
+    start = time.perf_counter()
+    streamed = 0
+    for phrase, transcript in transcripts:
+        stream = TranscriptStream(automata[phrase])
+        for offset, word in enumerate(transcript.split()):
+            deltas += 1
+            if stream.feed("u", offset, word):
+                streamed += 1
+                break
+    incremental = time.perf_counter() - start
+    print(f"{'interim: rescan each result':<28} {interim / rescan:12,.0f} results/s     detected {rescanned}")
+    print(f"{'interim: word deltas':<28} {deltas / incremental:12,.0f} results/s     detected {streamed}")
+
+def make_phrase_set(phrase, count, rng):
+    """The phrase plus count - 1 other three-word phrases from the vocabulary"""
+    others = [" ".join(rng.sample(VOCABULARY, 3)) for _ in range(count - 1)]
+    return PhraseSet(CompiledPhrase(str(i), text) for i, text in enumerate(others + [phrase]))
+
+def bench_phrase_sets(transcripts, counts, rng):
+    for count in counts:
+        sets = {phrase: make_phrase_set(phrase, count, rng) for phrase in PHRASES}
+        bench(f"{count} phrases: each in turn",
+              lambda phrase, t: any(c.match(t)[0] for c in sets[phrase].phrases), transcripts)
+        bench(f"{count} phrases: PhraseSet", lambda phrase, t: sets[phrase].match(t)[0], transcripts)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transcripts", type=int, default=50000)
+    parser.add_argument("--words", type=int, default=12, help="filler words per transcript")
+    parser.add_argument("--hit-rate", type=float, default=0.3)
+    parser.add_argument("--phrase-counts", default="1,5,20", help="active phrases per user")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    transcripts = make_transcripts(args.transcripts, args.words, args.hit_rate, random.Random(args.seed))
+    compiled_phrases = {phrase: CompiledPhrase(phrase, phrase) for phrase in PHRASES}
+
+    bench("containment (baseline)", lambda phrase, t: phrase in t.lower(), transcripts)
+    bench("compile per call", lambda phrase, t: CompiledPhrase(phrase, phrase).match(t)[0], transcripts)
+    bench("cached compiled matcher", lambda phrase, t: compiled_phrases[phrase].match(t)[0], transcripts)
+    bench_streaming(transcripts, compiled_phrases)
+    bench_phrase_sets(transcripts, [int(n) for n in args.phrase_counts.split(",")], random.Random(args.seed))
+
+if __name__ == "__main__":
+    main()
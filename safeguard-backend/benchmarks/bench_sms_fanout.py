@@ -0,0 +1,58 @@
+"""SMS fan-out latency: one client per message sent serially vs the shared async transport.
+
+    python -m benchmarks.bench_sms_fanout --contacts 10 --latency 0.2
+    python -m benchmarks.bench_sms_fanout --url http://127.0.0.1:5005   # against a running fake provider
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from app.services.fake_sms_provider import create_fake_sms_app
+from app.services.sms_transport import SMSTransport, TwilioProvider
+
+def make_transport(args):
+    if args.url:
+        return None, args.url
+    return httpx.ASGITransport(app=create_fake_sms_app(latency=args.latency)), "http://fake-sms"
+
+async def serial_new_client(args, phones):
+    """Old behaviour: a fresh client per message and no overlap between sends"""
+    asgi, base_url = make_transport(args)
+    provider = TwilioProvider("ACbench", "token", "+15550000000", base_url=base_url)
+    for phone in phones:
+        async with httpx.AsyncClient(transport=asgi) as client:
+            await provider.send(client, phone, "benchmark")
+
+async def pooled_transport(args, phones):
+    asgi, base_url = make_transport(args)
+    transport = SMSTransport(
+        TwilioProvider("ACbench", "token", "+15550000000", base_url=base_url),
+        max_parallel=args.parallel,
+        transport=asgi
+    )
+    try:
+        results = await transport.send_many((phone, "benchmark") for phone in phones)
+        assert all(r["success"] for r in results)
+    finally:
+        await transport.aclose()
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--contacts", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake provider round-trip (in-process only)")
+    parser.add_argument("--parallel", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--url", help="base URL of an external fake provider")
+    args = parser.parse_args()
+
+    phones = [f"+1555{i:07d}" for i in range(args.contacts)]
+    for name, fn in (("serial, client per message", serial_new_client), ("pooled async transport", pooled_transport)):
+        timings = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            await fn(args, phones)
+            timings.append(time.perf_counter() - start)
+        print(f"{name:<30} best {min(timings) * 1000:8.1f} ms  for {args.contacts} messages")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""SQLite connection profiles: commit throughput, and reads alongside a busy writer.
+
+Each profile gets a fresh database file seeded with location history. The
+write phase commits one location fix per transaction, as the location
+endpoints do. The mixed phase runs one writer and several reader threads
+(latest fix of a random user) for a fixed time and counts both sides, plus
+"database is locked" errors.
+
+    python -m benchmarks.bench_sqlite_profiles --writes 2000 --readers 4 --seconds 3
+    python -m benchmarks.bench_sqlite_profiles --profiles default,performance
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+_tmpdir = tempfile.mkdtemp(prefix="safeguard-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/app.db")
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from app.core.sqlite_profile import SQLITE_PROFILES, apply_sqlite_profile, journal_mode  # noqa: E402
+from app.main import Base, User, UserLocation  # noqa: E402  (DATABASE_URL must be set first)
+
+LATEST_FIX = "SELECT latitude, longitude FROM user_locations WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1"
+
+def location_row(user_id):
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "latitude": 12.97 + random.random() / 100,
+        "longitude": 77.59 + random.random() / 100,
+        "timestamp": datetime.utcnow(),
+        "is_emergency": False
+    }
+
+def make_engine(profile, users, history):
+    path = os.path.join(_tmpdir, f"{profile}.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    apply_sqlite_profile(engine, profile)
+    Base.metadata.create_all(engine)
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    with engine.begin() as connection:
+        connection.execute(insert(User), [
+            {"id": user_id, "email": f"{user_id}@bench.local", "name": "Bench"} for user_id in user_ids
+        ])
+        connection.execute(insert(UserLocation), [location_row(random.choice(user_ids)) for _ in range(history)])
+    return engine, user_ids
+
+def bench_writes(engine, user_ids, count):
+    start = time.perf_counter()
+    with engine.connect() as connection:
+        for _ in range(count):
+            connection.execute(insert(UserLocation), [location_row(random.choice(user_ids))])
+            connection.commit()
+    return count / (time.perf_counter() - start)
+
+def bench_mixed(engine, user_ids, readers, seconds):
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+
+    def count(key):
+        with lock:
+            counts[key] += 1
+
+    def writer():
+        with engine.connect() as connection:
+            while not stop.is_set():
+                try:
+                    connection.execute(insert(UserLocation), [location_row(random.choice(user_ids))])
+                    connection.commit()
+                    count("writes")
+                except OperationalError:
+                    connection.rollback()
+                    count("locked")
+
+    def reader():
+        with engine.connect() as connection:
+            while not stop.is_set():
+                try:
+                    connection.exec_driver_sql(LATEST_FIX, (random.choice(user_ids),)).fetchall()
+                    count("reads")
+                except OperationalError:
+                    count("locked")
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return counts["writes"] / seconds, counts["reads"] / seconds, counts["locked"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", default=",".join(SQLITE_PROFILES))
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--history", type=int, default=20000, help="seeded location fixes")
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"databases under {_tmpdir}")
+    print(f"{'profile':<12} {'journal':<8} {'commits/s':>10}   {'mixed writes/s':>14} {'reads/s':>10} {'locked':>7}")
+    for profile in args.profiles.split(","):
+        engine, user_ids = make_engine(profile, args.users, args.history)
+        writes = bench_writes(engine, user_ids, args.writes)
+        mixed_writes, mixed_reads, locked = bench_mixed(engine, user_ids, args.readers, args.seconds)
+        print(f"{profile:<12} {journal_mode(engine):<8} {writes:10,.0f}   "
+              f"{mixed_writes:14,.0f} {mixed_reads:10,.0f} {locked:7}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Per-query Python overhead of the hot lookups: rebuilt per call vs lambda_stmt vs prebuilt statements.
+
+Each lookup runs back to back through one session against a small, fully
+cached database, so the time is almost all SQLAlchemy and driver work in
+Python: building the statement, deriving its compiled-cache key, binding
+parameters and processing rows. "rebuilt" is how the handlers used to write
+them, "cached" is the module-level statement they execute now. The best of
+--rounds is reported. A sync Session shows the overhead alone; --async-session
+adds the constant cost of aiosqlite's thread hop that handlers also pay.
+
+    python -m benchmarks.bench_statement_cache --iterations 5000 --rounds 5
+    python -m benchmarks.bench_statement_cache --async-session
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+_tmpdir = tempfile.mkdtemp(prefix="safeguard-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/app.db")
+
+from sqlalchemy import insert, lambda_stmt, select, text  # noqa: E402
+from app.main import (  # noqa: E402  (DATABASE_URL must be set first)
+    AsyncSessionLocal, SessionLocal, USER_BY_ID, CONTACTS_BY_USER, ACTIVE_PHRASES_BY_USER, ACTIVE_SESSION_FOR_USER,
+    NEARBY_USERS_SQL, User, EmergencyContact, EmergencySession, VoicePhrase, UserLocation
+)
+
+def seed(neighbours: int):
+    user_id, session_id = str(uuid.uuid4()), str(uuid.uuid4())
+    neighbour_ids = [str(uuid.uuid4()) for _ in range(neighbours)]
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        db.execute(insert(User), [
+            {"id": uid, "email": f"{uid}@bench.local", "name": "Bench", "is_active": True}
+            for uid in [user_id] + neighbour_ids
+        ])
+        db.execute(insert(EmergencyContact), [
+            {"id": str(uuid.uuid4()), "user_id": user_id, "name": f"Contact {i}", "phone": f"+1555000000{i}"}
+            for i in range(3)
+        ])
+        db.execute(insert(VoicePhrase), [
+            {"id": str(uuid.uuid4()), "user_id": user_id, "phrase": phrase, "phrase_password_hash": "-"}
+            for phrase in ("help me now", "red umbrella")
+        ])
+        db.execute(insert(EmergencySession), [
+            {"id": session_id, "user_id": user_id, "trigger_type": "manual", "status": "active"}
+        ])
+        db.execute(insert(UserLocation), [
+            {"user_id": uid, "latitude": 12.97, "longitude": 77.59, "timestamp": now, "is_emergency": False}
+            for uid in neighbour_ids
+        ])
+        db.commit()
+    finally:
+        db.close()
+    return user_id, session_id
+
+def lookups(user_id: str, session_id: str):
+    """(name, rebuilt, lambda_stmt or None, cached); each returns (statement, parameters)"""
+    nearby = {
+        "lat": 12.97, "lng": 77.59, "recent_time": datetime.utcnow() - timedelta(minutes=5),
+        "user_id": user_id, "radius": 3.0, "limit": 10
+    }
+    return [
+        (
+            "user by id",
+            lambda: (select(User).where(User.id == user_id), None),
+            lambda: (lambda_stmt(lambda: select(User).where(User.id == user_id)), None),
+            lambda: (USER_BY_ID, {"user_id": user_id})
+        ),
+        (
+            "contacts by user",
+            lambda: (select(EmergencyContact).where(EmergencyContact.user_id == user_id), None),
+            lambda: (lambda_stmt(lambda: select(EmergencyContact).where(EmergencyContact.user_id == user_id)), None),
+            lambda: (CONTACTS_BY_USER, {"user_id": user_id})
+        ),
+        (
+            "active phrases by user",
+            lambda: (select(VoicePhrase).where(
+                VoicePhrase.user_id == user_id, VoicePhrase.is_active == True
+            ).order_by(VoicePhrase.created_at), None),
+            lambda: (lambda_stmt(lambda: select(VoicePhrase).where(
+                VoicePhrase.user_id == user_id, VoicePhrase.is_active == True
+            ).order_by(VoicePhrase.created_at)), None),
+            lambda: (ACTIVE_PHRASES_BY_USER, {"user_id": user_id})
+        ),
+        (
+            "active session for user",
+            lambda: (select(EmergencySession).where(
+                EmergencySession.id == session_id,
+                EmergencySession.user_id == user_id,
+                EmergencySession.status == "active"
+            ), None),
+            lambda: (lambda_stmt(lambda: select(EmergencySession).where(
+                EmergencySession.id == session_id,
+                EmergencySession.user_id == user_id,
+                EmergencySession.status == "active"
+            )), None),
+            lambda: (ACTIVE_SESSION_FOR_USER, {"session_id": session_id, "user_id": user_id})
+        ),
+        (
+            "nearby users",
+            lambda: (text(NEARBY_USERS_SQL.text), nearby),
+            None,
+            lambda: (NEARBY_USERS_SQL, nearby)
+        ),
+    ]
+
+def sync_round(make, iterations: int) -> float:
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            statement, parameters = make()
+            db.execute(statement, parameters).all()
+        return time.perf_counter() - started
+    finally:
+        db.close()
+
+async def async_round(make, iterations: int) -> float:
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            statement, parameters = make()
+            (await db.execute(statement, parameters)).all()
+        return time.perf_counter() - started
+
+async def per_query_us(make, args) -> float:
+    rounds = []
+    for _ in range(args.rounds + 1):
+        if args.async_session:
+            rounds.append(await async_round(make, args.iterations))
+        else:
+            rounds.append(sync_round(make, args.iterations))
+    # The first round warms the compiled cache and the lambda tracker
+    return min(rounds[1:]) / args.iterations * 1e6
+
+async def run(args):
+    user_id, session_id = seed(args.neighbours)
+    session = "AsyncSession" if args.async_session else "Session"
+    print(f"{session}, best of {args.rounds} x {args.iterations} runs per lookup, database under {_tmpdir}")
+    print(f"{'lookup':<24} {'rebuilt':>9} {'lambda':>9} {'cached':>9}   saved")
+    for name, rebuilt, lambda_variant, cached in lookups(user_id, session_id):
+        before = await per_query_us(rebuilt, args)
+        with_lambda = await per_query_us(lambda_variant, args) if lambda_variant else None
+        after = await per_query_us(cached, args)
+        lambda_column = f"{with_lambda:6.1f} us" if with_lambda is not None else f"{'-':>9}"
+        print(f"{name:<24} {before:6.1f} us {lambda_column} {after:6.1f} us   {1 - after / before:5.0%}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000, help="per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--async-session", action="store_true", help="run through AsyncSession as the handlers do")
+    parser.add_argument("--neighbours", type=int, default=10, help="users with a recent fix near the venue")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
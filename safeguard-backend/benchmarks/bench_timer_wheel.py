@@ -0,0 +1,72 @@
+"""Escalation timers: hierarchical timer wheel vs a heap with lazy cancellation.
+
+    python -m benchmarks.bench_timer_wheel --timers 1000000 --horizon 21600
+"""
+import argparse
+import heapq
+import random
+import time
+from app.utils.timer_wheel import TimerWheel
+
+def noop(*args):
+    pass
+
+def bench_wheel(delays, cancel_idx, horizon):
+    clock = [0.0]
+    wheel = TimerWheel(tick=1.0, clock=lambda: clock[0])
+
+    start = time.perf_counter()
+    timers = [wheel.schedule(delay, noop) for delay in delays]
+    scheduled = time.perf_counter()
+    for i in cancel_idx:
+        wheel.cancel(timers[i])
+    cancelled = time.perf_counter()
+    fired = 0
+    for second in range(1, horizon + 2):
+        clock[0] = float(second)
+        fired += wheel.run_due()
+    done = time.perf_counter()
+    return scheduled - start, cancelled - scheduled, done - cancelled, fired
+
+def bench_heap(delays, cancel_idx, horizon):
+    heap = []
+    cancelled_ids = set()
+
+    start = time.perf_counter()
+    for i, delay in enumerate(delays):
+        heapq.heappush(heap, (delay, i, noop))
+    scheduled = time.perf_counter()
+    for i in cancel_idx:
+        cancelled_ids.add(i)
+    cancelled = time.perf_counter()
+    fired = 0
+    for second in range(1, horizon + 2):
+        while heap and heap[0][0] <= second:
+            _, i, callback = heapq.heappop(heap)
+            if i not in cancelled_ids:
+                callback()
+                fired += 1
+    done = time.perf_counter()
+    return scheduled - start, cancelled - scheduled, done - cancelled, fired
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--timers", type=int, default=1_000_000)
+    parser.add_argument("--horizon", type=int, default=6 * 60 * 60, help="seconds timers are spread over")
+    parser.add_argument("--cancel", type=float, default=0.5, help="fraction cancelled before firing")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    delays = [rng.uniform(0, args.horizon) for _ in range(args.timers)]
+    cancel_idx = rng.sample(range(args.timers), int(args.timers * args.cancel))
+
+    for name, fn in (("timer wheel", bench_wheel), ("heap + lazy cancel", bench_heap)):
+        schedule_s, cancel_s, run_s, fired = fn(delays, cancel_idx, args.horizon)
+        print(
+            f"{name:<20} schedule {schedule_s / args.timers * 1e9:6.0f} ns/op  "
+            f"cancel {cancel_s / max(1, len(cancel_idx)) * 1e9:6.0f} ns/op  "
+            f"run {run_s:6.2f} s  fired {fired}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Trigger write-path latency: per-step ORM commits (old) vs one bulk-insert transaction.
+
+Both paths write the same rows (session, emergency location, one alert per
+recipient) through the same async session; the recipient lookups are done once
+up front, so only the write strategy differs.
+
+    python -m benchmarks.bench_trigger_write --contacts 5 --nearby 10 --iterations 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+_tmpdir = tempfile.mkdtemp(prefix="safeguard-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+
+from sqlalchemy import insert  # noqa: E402
+from app.main import (  # noqa: E402  (DATABASE_URL must be set first)
+    SessionLocal, AsyncSessionLocal, User, EmergencyContact, EmergencySession, EmergencyAlert, UserLocation, new_id
+)
+
+def make_rows(user_id, recipients):
+    """Rows for one trigger, with fresh ids"""
+    session_id = str(uuid.uuid4())
+    now = datetime.utcnow()
+    session = {
+        "id": session_id,
+        "user_id": user_id,
+        "trigger_type": "manual",
+        "location_lat": 12.97,
+        "location_lng": 77.59,
+        "status": "active",
+        "triggered_at": now
+    }
+    location = {
+        "id": new_id(),
+        "user_id": user_id,
+        "latitude": 12.97,
+        "longitude": 77.59,
+        "timestamp": now,
+        "is_emergency": True
+    }
+    alerts = [
+        {
+            "id": new_id(),
+            "emergency_session_id": session_id,
+            "recipient_type": recipient_type,
+            "recipient_id": recipient_id,
+            "alert_method": alert_method,
+            "status": "pending",
+            "sent_at": now
+        }
+        for recipient_type, recipient_id, alert_method in recipients
+    ]
+    return session, location, alerts
+
+async def per_step_commits(db, session, location, alerts):
+    """Write sequence used before the bulk path: three commits plus a refresh"""
+    row = EmergencySession(**session)
+    db.add(row)
+    await db.commit()
+    await db.refresh(row)
+
+    db.add(UserLocation(**location))
+    await db.commit()
+
+    for alert in alerts:
+        db.add(EmergencyAlert(**alert))
+    await db.commit()
+
+async def bulk_transaction(db, session, location, alerts):
+    await db.execute(insert(EmergencySession), [session])
+    await db.execute(insert(UserLocation), [location])
+    if alerts:
+        await db.execute(insert(EmergencyAlert), alerts)
+    await db.commit()
+
+def seed(contacts: int, nearby: int):
+    """A user with `contacts` SMS contacts and `nearby` app users to alert by push"""
+    db = SessionLocal()
+    user = User(id=str(uuid.uuid4()), email=f"{uuid.uuid4().hex}@bench.local", name="Bench", phone="+15550000000")
+    db.add(user)
+    recipients = []
+    for i in range(contacts):
+        contact = EmergencyContact(
+            id=str(uuid.uuid4()), user_id=user.id, name=f"Contact {i}", phone=f"+1555{i:07d}", priority_order=i + 1
+        )
+        db.add(contact)
+        recipients.append(("contact", contact.id, "sms"))
+    recipients.extend(("nearby_user", str(uuid.uuid4()), "push") for _ in range(nearby))
+    db.commit()
+    user_id = user.id
+    db.close()
+    return user_id, recipients
+
+async def run(write, user_id, recipients, iterations):
+    timings = []
+    for _ in range(iterations):
+        rows = make_rows(user_id, recipients)
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            await write(db, *rows)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--contacts", type=int, default=5)
+    parser.add_argument("--nearby", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    user_id, recipients = seed(args.contacts, args.nearby)
+    print(f"database: {os.environ['DATABASE_URL']}  alerts per trigger: {len(recipients)}")
+    for name, write in (("per-step commits (before)", per_step_commits), ("single bulk transaction", bulk_transaction)):
+        p50, p99 = asyncio.run(run(write, user_id, recipients, args.iterations))
+        print(f"{name:<28} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms")
+
+if __name__ == "__main__":
+    main()
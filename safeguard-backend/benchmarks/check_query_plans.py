@@ -0,0 +1,109 @@
+"""EXPLAIN QUERY PLAN check for the request-path queries: fails on any full scan.
+
+Builds a database through the migrations (a fresh one under a temp dir by
+default, or whatever DATABASE_URL points at, so an upgraded production copy
+can be checked too), asks SQLite for the plan of each hot query and exits 1
+if any step reads a whole table or index ("SCAN ...") instead of searching
+one. Startup loaders, which read every active row on purpose, are not listed.
+tests/test_query_plans.py runs the same check on every pytest run.
+
+    python -m benchmarks.check_query_plans
+    python -m benchmarks.check_query_plans --analyze
+    DATABASE_URL=sqlite:///./safeguard.db python -m benchmarks.check_query_plans
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+_tmpdir = tempfile.mkdtemp(prefix="safeguard-plans-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/app.db")
+
+from sqlalchemy import select  # noqa: E402
+from app.main import (  # noqa: E402  (DATABASE_URL must be set first)
+    engine, ALERT_DISPATCH_UPDATE, ALERT_RECEIPT_UPDATE, USER_BY_ID, CONTACTS_BY_USER, ACTIVE_PHRASES_BY_USER,
+    ACTIVE_SESSION_FOR_USER, NEARBY_USERS_SQL, User, EmergencyContact, EmergencySession, EmergencyAlert,
+    UserLocation, VoicePhrase, VoicePhraseKeyword, RecordingUpload
+)
+
+USER_ID = "plan-user"
+SESSION_ID = "plan-session"
+
+def hot_queries():
+    recent = datetime.utcnow() - timedelta(minutes=5)
+    return [
+        ("login by email or google id", select(User).where(
+            (User.email == "plan@example.com") | (User.google_id == "plan-google")
+        )),
+        ("current user", USER_BY_ID),
+        ("contacts by user", CONTACTS_BY_USER),
+        ("contact phones -> app users", select(User.id).where(User.phone.in_(["+15550000001", "+15550000002"]))),
+        ("escalation contact ladder", select(EmergencyContact.id).where(
+            EmergencyContact.user_id == USER_ID
+        ).order_by(EmergencyContact.priority_order, EmergencyContact.created_at)),
+        ("active session by user", select(EmergencySession).where(
+            EmergencySession.user_id == USER_ID, EmergencySession.status == "active"
+        )),
+        ("dismiss session", ACTIVE_SESSION_FOR_USER),
+        ("pending alerts by session", select(EmergencyAlert).where(
+            EmergencyAlert.emergency_session_id == SESSION_ID, EmergencyAlert.status == "pending"
+        )),
+        ("alerts by session", select(
+            EmergencyAlert.recipient_type, EmergencyAlert.recipient_id, EmergencyAlert.status
+        ).where(EmergencyAlert.emergency_session_id == SESSION_ID)),
+        ("viewer was alerted", select(EmergencyAlert.id).where(
+            EmergencyAlert.emergency_session_id == SESSION_ID, EmergencyAlert.recipient_id == USER_ID
+        ).limit(1)),
+        ("alert dispatch update", ALERT_DISPATCH_UPDATE),
+        ("alert receipt update", ALERT_RECEIPT_UPDATE),
+        ("latest fix by user", select(UserLocation).where(
+            UserLocation.user_id == USER_ID
+        ).order_by(UserLocation.timestamp.desc()).limit(1)),
+        ("recent fixes", select(UserLocation.user_id).where(UserLocation.timestamp > recent)),
+        ("active phrases by user", ACTIVE_PHRASES_BY_USER),
+        ("phrase keyword templates", select(VoicePhrase.id, VoicePhraseKeyword.templates).join(
+            VoicePhraseKeyword, VoicePhraseKeyword.phrase_id == VoicePhrase.id
+        ).where(VoicePhrase.user_id == USER_ID, VoicePhrase.is_active == True)),
+        ("recording upload", select(RecordingUpload).where(RecordingUpload.id == "plan-upload")),
+        ("nearby users", NEARBY_USERS_SQL),
+    ]
+
+def explain(connection, statement):
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    parameters = tuple(compiled.params.get(name) for name in compiled.positiontup)
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + compiled.string, parameters).all()
+    return [row[3] for row in rows]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--analyze", action="store_true", help="run ANALYZE first so the planner uses table statistics")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "sqlite":
+        sys.exit(f"EXPLAIN QUERY PLAN is SQLite only; DATABASE_URL uses {engine.dialect.name}")
+    if args.analyze:
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ANALYZE")
+
+    checks = hot_queries()
+
+    print(f"database: {os.environ['DATABASE_URL']}")
+    failures = []
+    with engine.connect() as connection:
+        for name, statement in checks:
+            plan = explain(connection, statement)
+            scans = [step for step in plan if step.startswith("SCAN")]
+            if scans:
+                failures.append(name)
+            print(f"{'FAIL' if scans else 'ok':<5} {name}")
+            for step in plan:
+                print(f"        {step}")
+
+    if failures:
+        print(f"{len(failures)} of {len(checks)} queries fall back to a full scan: {', '.join(failures)}")
+        sys.exit(1)
+    print(f"all {len(checks)} queries use an index")
+
+if __name__ == "__main__":
+    main()
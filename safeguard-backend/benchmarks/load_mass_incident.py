@@ -0,0 +1,243 @@
+"""Mass-incident load harness for the emergency trigger path, fully in-process (no network).
+
+Seeds N users with emergency contacts and recent locations clustered around
+one venue, then fires M concurrent POST /emergency/trigger requests through
+httpx's ASGI transport while SMS goes to the fake provider. Reports trigger
+latency, alert throughput, time spent in SQLite writes/commits (where lock
+waits show up) and event-loop lag. No Socket.IO clients are connected, so
+push alerts are reported as failed; SMS alerts go through the full transport.
+
+    python -m benchmarks.load_mass_incident --users 5000 --triggers 1000 --contacts 3
+    python -m benchmarks.load_mass_incident --triggers 2000 --sms-latency 0.3 --no-rate-limit
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--triggers", type=int, default=1000, help="concurrent triggers, one per user")
+    parser.add_argument("--contacts", type=int, default=3, help="emergency contacts per user")
+    parser.add_argument("--radius-km", type=float, default=1.0, help="spread of seeded locations")
+    parser.add_argument("--sms-latency", type=float, default=0.2, help="fake provider round-trip")
+    parser.add_argument("--sms-failure-rate", type=float, default=0.0)
+    parser.add_argument("--no-rate-limit", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+class LockWaitProbe:
+    """Times every write statement and commit on the engine; SQLite lock waits land in these"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.write_times = []
+        self.commit_times = []
+        self.locked_errors = 0
+        self._started = {}
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before(conn, cursor, statement, parameters, context, executemany):
+            self._started[id(cursor)] = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after(conn, cursor, statement, parameters, context, executemany):
+            started = self._started.pop(id(cursor), None)
+            if started is not None and not statement.lstrip().upper().startswith("SELECT"):
+                self.write_times.append(time.perf_counter() - started)
+
+        @event.listens_for(engine, "handle_error")
+        def on_error(context):
+            if "locked" in str(context.original_exception):
+                self.locked_errors += 1
+
+        do_commit = engine.dialect.do_commit
+
+        def timed_commit(dbapi_connection):
+            started = time.perf_counter()
+            try:
+                do_commit(dbapi_connection)
+            finally:
+                self.commit_times.append(time.perf_counter() - started)
+
+        engine.dialect.do_commit = timed_commit
+
+class LoopLagProbe:
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+def seed(m, args, rng):
+    """Bulk-insert users, contacts and a recent location fix for each user"""
+    from sqlalchemy import insert
+
+    venue_lat, venue_lng = 40.7505, -73.9934
+    spread = args.radius_km / 111.0
+    now = datetime.utcnow()
+    users, contacts, locations = [], [], []
+    for i in range(args.users):
+        user_id = str(uuid.uuid4())
+        users.append({
+            "id": user_id,
+            "email": f"load-{i}@example.com",
+            "name": f"Load User {i}",
+            "phone": f"+1555{i:07d}",
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now
+        })
+        for order in range(args.contacts):
+            contacts.append({
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "name": f"Contact {order}",
+                # Half of the contacts are themselves app users
+                "phone": f"+1555{rng.randrange(args.users):07d}" if order % 2 else f"+1666{i:05d}{order:02d}",
+                "priority_order": order + 1,
+                "created_at": now
+            })
+        locations.append({
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "latitude": venue_lat + rng.uniform(-spread, spread),
+            "longitude": venue_lng + rng.uniform(-spread, spread),
+            "accuracy": 10.0,
+            "timestamp": now - timedelta(seconds=rng.randrange(120)),
+            "is_emergency": False
+        })
+
+    db = m.SessionLocal()
+    try:
+        db.execute(insert(m.User), users)
+        if contacts:
+            db.execute(insert(m.EmergencyContact), contacts)
+        db.execute(insert(m.UserLocation), locations)
+        db.commit()
+    finally:
+        db.close()
+    return users, locations
+
+async def run(m, args):
+    import httpx
+    from sqlalchemy import func
+    from app.services.fake_sms_provider import create_fake_sms_app
+    from app.services.sms_transport import SMSTransport, TwilioProvider
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    users, locations = seed(m, args, rng)
+    print(f"seeded {len(users)} users, {len(users) * args.contacts} contacts in {time.perf_counter() - started:.1f} s")
+
+    fake_sms = create_fake_sms_app(latency=args.sms_latency, failure_rate=args.sms_failure_rate)
+    m.NotificationService.transport = SMSTransport(
+        TwilioProvider(m.settings.TWILIO_ACCOUNT_SID, m.settings.TWILIO_AUTH_TOKEN, "+15550000000", base_url="http://fake-sms"),
+        max_parallel=m.settings.SMS_MAX_PARALLEL,
+        max_connections=m.settings.SMS_MAX_CONNECTIONS,
+        max_retries=m.settings.SMS_MAX_RETRIES,
+        transport=httpx.ASGITransport(app=fake_sms)
+    )
+
+    probe = LockWaitProbe(m.async_engine.sync_engine)
+    lag = LoopLagProbe()
+    await m.start_background_tasks()
+    lag.start()
+
+    triggering = rng.sample(range(len(users)), min(args.triggers, len(users)))
+    latencies, failures = [], 0
+    gate = asyncio.Event()
+
+    async def fire(client, index):
+        nonlocal failures
+        user, location = users[index], locations[index]
+        headers = {"Authorization": f"Bearer {m.create_access_token(user['id'])}"}
+        body = {
+            "trigger_type": "manual",
+            "location": {"latitude": location["latitude"], "longitude": location["longitude"]}
+        }
+        await gate.wait()
+        t0 = time.perf_counter()
+        response = await client.post(f"{m.settings.API_V1_STR}/emergency/trigger", json=body, headers=headers)
+        latencies.append(time.perf_counter() - t0)
+        if response.status_code != 200:
+            failures += 1
+
+    transport = httpx.ASGITransport(app=m.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://safeguard", timeout=120) as client:
+        tasks = [asyncio.create_task(fire(client, index)) for index in triggering]
+        await asyncio.sleep(0)
+        burst_started = time.perf_counter()
+        gate.set()
+        await asyncio.gather(*tasks)
+        triggers_done = time.perf_counter()
+        await m.alert_dispatcher.queue.join()
+        alerts_done = time.perf_counter()
+
+    await lag.stop()
+    await m.stop_background_tasks()
+
+    db = m.SessionLocal()
+    try:
+        by_status = dict(
+            db.query(m.EmergencyAlert.status, func.count()).group_by(m.EmergencyAlert.status).all()
+        )
+    finally:
+        db.close()
+    processed = sum(count for status, count in by_status.items() if status != "pending")
+    trigger_span = triggers_done - burst_started
+    alert_span = alerts_done - burst_started
+
+    print(f"\ntriggers         {len(latencies)} fired, {failures} non-200, {len(latencies) / trigger_span:8.1f} req/s")
+    print(f"trigger latency  p50 {percentile(latencies, 50) * 1e3:8.1f} ms  p99 {percentile(latencies, 99) * 1e3:8.1f} ms  "
+          f"max {max(latencies, default=0) * 1e3:8.1f} ms")
+    print(f"alerts           {processed} processed in {alert_span:.2f} s = {processed / alert_span:8.1f} alerts/s  "
+          f"{by_status}  sms accepted {len(fake_sms.state.messages)}")
+    print(f"db writes        {len(probe.write_times)} statements, total {sum(probe.write_times):.2f} s, "
+          f"p99 {percentile(probe.write_times, 99) * 1e3:.2f} ms")
+    print(f"db commits       {len(probe.commit_times)}, total {sum(probe.commit_times):.2f} s, "
+          f"p99 {percentile(probe.commit_times, 99) * 1e3:.2f} ms, 'database is locked' errors {probe.locked_errors}")
+    print(f"event-loop lag   p50 {percentile(lag.samples, 50) * 1e3:8.1f} ms  p99 {percentile(lag.samples, 99) * 1e3:8.1f} ms  "
+          f"max {max(lag.samples, default=0) * 1e3:8.1f} ms")
+
+def main():
+    args = parse_args()
+    tmpdir = tempfile.mkdtemp(prefix="safeguard-load-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmpdir}/load.db")
+    if args.no_rate_limit:
+        os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    import app.main as m  # settings are read at import, so the environment must be ready first
+    asyncio.run(run(m, args))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+
+# app.main builds its engines, upload directories and schema at import, so point them at a scratch directory
+_tmpdir = tempfile.mkdtemp(prefix="safeguard-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/app.db")
+os.environ.setdefault("UPLOAD_DIR", os.path.join(_tmpdir, "uploads"))
+
+# The five tables as the first release created them, before any migration
+BASELINE_SCHEMA = (
+    """CREATE TABLE users (
+        id VARCHAR NOT NULL,
+        email VARCHAR NOT NULL,
+        name VARCHAR NOT NULL,
+        phone VARCHAR,
+        date_of_birth VARCHAR,
+        gender VARCHAR,
+        address TEXT,
+        profile_picture VARCHAR,
+        google_id VARCHAR,
+        is_active BOOLEAN,
+        created_at DATETIME,
+        updated_at DATETIME,
+        PRIMARY KEY (id),
+        UNIQUE (google_id)
+    )""",
+    "CREATE UNIQUE INDEX ix_users_email ON users (email)",
+    """CREATE TABLE emergency_contacts (
+        id VARCHAR NOT NULL,
+        user_id VARCHAR NOT NULL,
+        name VARCHAR NOT NULL,
+        phone VARCHAR NOT NULL,
+        priority_order INTEGER,
+        created_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )""",
+    """CREATE TABLE voice_phrases (
+        id VARCHAR NOT NULL,
+        user_id VARCHAR NOT NULL,
+        phrase VARCHAR NOT NULL,
+        phrase_password_hash VARCHAR NOT NULL,
+        is_active BOOLEAN,
+        created_at DATETIME,
+        updated_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )""",
+    """CREATE TABLE emergency_sessions (
+        id VARCHAR NOT NULL,
+        user_id VARCHAR NOT NULL,
+        trigger_type VARCHAR NOT NULL,
+        location_lat FLOAT,
+        location_lng FLOAT,
+        status VARCHAR,
+        recording_path VARCHAR,
+        triggered_at DATETIME,
+        resolved_at DATETIME,
+        emergency_metadata TEXT,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )""",
+    """CREATE TABLE user_locations (
+        id VARCHAR NOT NULL,
+        user_id VARCHAR NOT NULL,
+        latitude FLOAT NOT NULL,
+        longitude FLOAT NOT NULL,
+        accuracy FLOAT,
+        timestamp DATETIME,
+        is_emergency BOOLEAN,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )""",
+)
+
+@pytest.fixture
+def baseline_engine(tmp_path):
+    """A SQLite database with the first release's schema and no schema_migrations table"""
+    engine = create_engine(f"sqlite:///{tmp_path}/baseline.db")
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.exec_driver_sql(statement)
+    yield engine
+    engine.dispose()
@@ -0,0 +1,88 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, insert, select
+
+from app.main import (
+    ALERT_ACK_UPDATE, ALERT_RECEIPT_UPDATE, AlertDispatcher, EmergencyAlert, EmergencySession, User, engine, new_id
+)
+
+@pytest.fixture
+def alert_id():
+    user_id, session_id, alert_id = str(uuid.uuid4()), str(uuid.uuid4()), new_id()
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{"id": user_id, "email": f"{user_id}@test.local", "name": "T"}])
+        connection.execute(insert(EmergencySession), [
+            {"id": session_id, "user_id": user_id, "trigger_type": "manual", "status": "active"}
+        ])
+        connection.execute(insert(EmergencyAlert), [{
+            "id": alert_id, "emergency_session_id": session_id, "recipient_type": "contact_user",
+            "recipient_id": "recipient", "alert_method": "push", "status": "pending"
+        }])
+    yield alert_id
+    with engine.begin() as connection:
+        connection.execute(delete(EmergencyAlert).where(EmergencyAlert.id == alert_id))
+        connection.execute(delete(EmergencySession).where(EmergencySession.id == session_id))
+        connection.execute(delete(User).where(User.id == user_id))
+
+def apply(statement, alert_id, new_status, acked_by=None):
+    receipt_at = datetime.utcnow() if new_status == "delivered" else None
+    with engine.begin() as connection:
+        connection.execute(statement, [
+            {"alert_id": alert_id, "new_status": new_status, "receipt_at": receipt_at, "acked_by": acked_by}
+        ])
+        return connection.execute(
+            select(EmergencyAlert.status, EmergencyAlert.delivered_at).where(EmergencyAlert.id == alert_id)
+        ).one()
+
+@pytest.mark.parametrize("statuses, expected", [
+    (["sent", "delivered"], "delivered"),
+    (["sent", "failed"], "failed"),
+    (["failed", "sent"], "failed"),
+    (["delivered", "failed", "sent"], "delivered"),
+])
+def test_receipt_status_never_moves_backwards(alert_id, statuses, expected):
+    for new_status in statuses:
+        status, delivered_at = apply(ALERT_RECEIPT_UPDATE, alert_id, new_status)
+    assert status == expected
+    assert (delivered_at is not None) == (expected == "delivered")
+
+def test_ack_only_applies_to_its_recipient(alert_id):
+    assert apply(ALERT_ACK_UPDATE, alert_id, "delivered", acked_by="someone else").status == "pending"
+    assert apply(ALERT_ACK_UPDATE, alert_id, "delivered", acked_by="recipient").status == "delivered"
+
+class FakeSockets:
+    def __init__(self):
+        self.online = set()
+        self.sent = []
+
+    def join_room(self, user_id, room):
+        return user_id in self.online
+
+    async def emit_to_user(self, user_id, event, data):
+        if user_id not in self.online:
+            return False
+        self.sent.append((user_id, data["alert_id"]))
+        return True
+
+def test_push_alert_waits_for_an_offline_recipient(alert_id):
+    with engine.connect() as connection:
+        session_id = connection.scalar(
+            select(EmergencyAlert.emergency_session_id).where(EmergencyAlert.id == alert_id)
+        )
+    sockets = FakeSockets()
+    dispatcher = AlertDispatcher(sockets)
+
+    def status():
+        with engine.connect() as connection:
+            return connection.scalar(select(EmergencyAlert.status).where(EmergencyAlert.id == alert_id))
+
+    asyncio.run(dispatcher.dispatch_session(session_id))
+    assert status() == "pending"
+
+    sockets.online.add("recipient")
+    asyncio.run(dispatcher.dispatch_session(session_id, "recipient"))
+    assert status() == "sent"
+    assert sockets.sent == [("recipient", alert_id)]
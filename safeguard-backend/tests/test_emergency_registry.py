@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from app.services.emergency_registry import ActiveEmergency, EmergencyRegistry
+
+def emergency(session_id, user_id, latitude, recipients=()):
+    return ActiveEmergency(
+        session_id, user_id, "manual", datetime(2024, 5, 1), latitude, 77.0, recipients=recipients
+    )
+
+def test_near_returns_closest_first_within_the_radius():
+    registry = EmergencyRegistry()
+    registry.add(emergency("far", "u1", 12.02))
+    registry.add(emergency("near", "u2", 12.001))
+    registry.add(emergency("outside", "u3", 12.5))
+
+    assert [entry.session_id for entry, _ in registry.near(12.0, 77.0, 3.0)] == ["near", "far"]
+
+def test_near_filters_before_the_limit():
+    registry = EmergencyRegistry()
+    registry.add(emergency("own", "u1", 12.0))
+    registry.add(emergency("unrelated", "u2", 12.001))
+    registry.add(emergency("alerted", "u3", 12.002, recipients=["u1"]))
+
+    visible = registry.near(
+        12.0, 77.0, 3.0, limit=1,
+        where=lambda entry: "u1" in entry.recipients and entry.user_id != "u1"
+    )
+    assert [entry.session_id for entry, _ in visible] == ["alerted"]
+
+def test_moved_emergency_is_found_at_its_new_location():
+    registry = EmergencyRegistry()
+    registry.add(emergency("s1", "u1", 12.0))
+    registry.update_location("s1", 13.0, 77.0)
+
+    assert registry.near(12.0, 77.0, 3.0) == []
+    assert [entry.session_id for entry, _ in registry.near(13.0, 77.0, 3.0)] == ["s1"]
@@ -0,0 +1,43 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, insert
+
+from app.main import EmergencyAlert, EmergencyContact, User, async_engine, engine, escalation_scheduler
+from app.services.emergency_registry import ActiveEmergency
+
+@pytest.fixture
+def user_with_contacts():
+    user_id = str(uuid.uuid4())
+    contact_ids = [str(uuid.uuid4()) for _ in range(3)]
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{"id": user_id, "email": f"{user_id}@test.local", "name": "T"}])
+        # Listed out of order: the ladder follows priority_order
+        connection.execute(insert(EmergencyContact), [
+            {"id": contact_ids[priority - 1], "user_id": user_id, "name": f"C{priority}",
+             "phone": f"+1555000000{priority}", "priority_order": priority}
+            for priority in (3, 1, 2)
+        ])
+    yield user_id, contact_ids
+    with engine.begin() as connection:
+        connection.execute(delete(EmergencyAlert).where(EmergencyAlert.recipient_id.in_(contact_ids)))
+        connection.execute(delete(EmergencyContact).where(EmergencyContact.user_id == user_id))
+        connection.execute(delete(User).where(User.id == user_id))
+
+def test_each_step_realerts_the_next_contact_once(user_with_contacts):
+    user_id, contact_ids = user_with_contacts
+    entry = ActiveEmergency(str(uuid.uuid4()), user_id, "manual", datetime.utcnow())
+
+    async def scenario():
+        try:
+            return [
+                (await escalation_scheduler._add_escalation_alerts(entry, step, 1.0))[0]
+                for step in range(1, 6)
+            ]
+        finally:
+            await async_engine.dispose()
+
+    # contact_ids[0] was texted at trigger time; no wraparound once the list is exhausted
+    assert asyncio.run(scenario()) == [contact_ids[1], contact_ids[2], None, None, None]
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.core.locks import KeyedLocks
+
+def test_holders_of_one_key_take_turns_and_the_entry_is_dropped():
+    async def scenario():
+        locks = KeyedLocks()
+        order = []
+
+        async def worker(name):
+            async with locks.hold("user"):
+                order.append(f"{name} in")
+                await asyncio.sleep(0.01)
+                order.append(f"{name} out")
+
+        await asyncio.gather(worker("a"), worker("b"), worker("c"))
+        return order, len(locks)
+
+    order, remaining = asyncio.run(scenario())
+    assert order == ["a in", "a out", "b in", "b out", "c in", "c out"]
+    assert remaining == 0
+
+def test_entry_survives_while_someone_is_waiting():
+    async def scenario():
+        locks = KeyedLocks()
+        release = asyncio.Event()
+        entered = []
+
+        async def first():
+            async with locks.hold("user"):
+                await release.wait()
+
+        async def second():
+            async with locks.hold("user"):
+                entered.append("second")
+
+        tasks = [asyncio.create_task(first()), asyncio.create_task(second())]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.sleep(0)
+        # first has released; second is woken but has not run yet
+        still_tracked = "user" in locks
+        await asyncio.gather(*tasks)
+        return still_tracked, entered, len(locks)
+
+    still_tracked, entered, remaining = asyncio.run(scenario())
+    assert still_tracked
+    assert entered == ["second"]
+    assert remaining == 0
+
+def test_cancelled_waiter_and_errors_release_the_entry():
+    async def scenario():
+        locks = KeyedLocks()
+        release = asyncio.Event()
+
+        async def holder():
+            async with locks.hold("user"):
+                await release.wait()
+                raise RuntimeError("boom")
+
+        async def waiter():
+            async with locks.hold("user"):
+                pass
+
+        held = asyncio.create_task(holder())
+        waiting = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        release.set()
+        with pytest.raises(RuntimeError):
+            await held
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        return len(locks)
+
+    assert asyncio.run(scenario()) == 0
+
+def test_different_keys_do_not_block_each_other():
+    async def scenario():
+        locks = KeyedLocks()
+        async with locks.hold("a"):
+            async with locks.hold("b"):
+                return len(locks)
+
+    assert asyncio.run(scenario()) == 2
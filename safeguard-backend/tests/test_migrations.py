@@ -0,0 +1,104 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.migrations import Migration, applied_versions, upgrade
+from app.main import Base, EmergencyContact, User, UserLocation, VoicePhrase
+from app.migrations import MIGRATIONS
+
+def seed_baseline(engine):
+    now = datetime(2024, 5, 1, 12, 0, 0)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, email, name, phone, is_active) VALUES "
+            "('u1', 'a@example.com', 'A', NULL, 1), "
+            "('u2', 'b@example.com', 'B', '555-123-4567', 1), "
+            "('u3', 'c@example.com', 'C', 'call me', 1)"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO emergency_contacts (id, user_id, name, phone, priority_order) VALUES "
+            "('c1', 'u1', 'B', '(555) 123-4567', 1), "
+            "('c2', 'u1', 'D', '+44 20 7946 0958', 2), "
+            "('c3', 'u1', 'E', 'n/a', 3)"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO voice_phrases (id, user_id, phrase, phrase_password_hash, is_active) "
+            "VALUES ('p1', 'u1', 'help me now', '-', 1)"
+        )
+        # Inserted newest first, so only the migration can put them in time order
+        for minutes in (2, 1, 0):
+            connection.exec_driver_sql(
+                "INSERT INTO user_locations (id, user_id, latitude, longitude, timestamp, is_emergency) "
+                "VALUES (?, 'u1', 12.97, 77.59, ?, 0)",
+                (str(uuid.uuid4()), (now + timedelta(minutes=minutes)).isoformat(sep=" "))
+            )
+
+def test_fresh_database_is_created_from_models_and_stamped(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/fresh.db")
+    assert upgrade(engine, Base.metadata, MIGRATIONS) == []
+    with engine.connect() as connection:
+        assert applied_versions(connection) == {m.version for m in MIGRATIONS}
+        assert set(Base.metadata.tables) <= set(inspect(connection).get_table_names())
+    engine.dispose()
+
+def test_baseline_database_runs_every_migration(baseline_engine):
+    seed_baseline(baseline_engine)
+
+    ran = upgrade(baseline_engine, Base.metadata, MIGRATIONS)
+
+    assert [m.version for m in ran] == [m.version for m in MIGRATIONS]
+    with baseline_engine.connect() as connection:
+        assert applied_versions(connection) == {m.version for m in MIGRATIONS}
+        columns = {column["name"] for column in inspect(connection).get_columns("voice_phrases")}
+        assert "action" in columns
+        indexes = {index["name"] for index in inspect(connection).get_indexes("user_locations")}
+        assert {"ix_user_locations_user_timestamp", "ix_user_locations_timestamp"} <= indexes
+
+    with Session(baseline_engine) as db:
+        assert db.scalar(select(VoicePhrase.action).where(VoicePhrase.id == "p1")) == "alarm"
+        fixes = db.scalars(select(UserLocation).order_by(UserLocation.id)).all()
+        # Re-keyed as time-ordered ids: key order is timestamp order
+        assert [fix.timestamp for fix in fixes] == sorted(fix.timestamp for fix in fixes)
+        assert all(uuid.UUID(fix.id).version == 7 for fix in fixes)
+
+def test_stored_phones_are_backfilled_to_e164(baseline_engine):
+    seed_baseline(baseline_engine)
+    upgrade(baseline_engine, Base.metadata, MIGRATIONS)
+
+    with Session(baseline_engine) as db:
+        assert dict(db.execute(select(User.id, User.phone)).all()) == {
+            "u1": None, "u2": "+15551234567", "u3": "call me"
+        }
+        assert dict(db.execute(select(EmergencyContact.id, EmergencyContact.phone)).all()) == {
+            "c1": "+15551234567", "c2": "+442079460958", "c3": "n/a"
+        }
+        # The trigger fan-out's contact -> app user lookup matches again
+        contact_phones = db.scalars(select(EmergencyContact.phone).where(EmergencyContact.user_id == "u1")).all()
+        assert db.scalars(select(User.id).where(User.phone.in_(contact_phones))).all() == ["u2"]
+
+def test_upgrade_is_idempotent(baseline_engine):
+    upgrade(baseline_engine, Base.metadata, MIGRATIONS)
+    assert upgrade(baseline_engine, Base.metadata, MIGRATIONS) == []
+
+def test_failed_migration_keeps_earlier_ones(baseline_engine):
+    def broken(connection):
+        connection.exec_driver_sql("CREATE TABLE half_done (id INTEGER)")
+        raise RuntimeError("boom")
+
+    migrations = MIGRATIONS + [Migration(MIGRATIONS[-1].version + 1, "broken", broken)]
+    with pytest.raises(RuntimeError):
+        upgrade(baseline_engine, Base.metadata, migrations)
+
+    with baseline_engine.connect() as connection:
+        assert applied_versions(connection) == {m.version for m in MIGRATIONS}
+        assert not inspect(connection).has_table("half_done")
+
+def test_versions_must_ascend(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/order.db")
+    migrations = [Migration(2, "b", lambda c: None), Migration(1, "a", lambda c: None)]
+    with pytest.raises(ValueError):
+        upgrade(engine, Base.metadata, migrations)
+    engine.dispose()
@@ -0,0 +1,57 @@
+import asyncio
+
+from app.services.phrase_matcher import PhraseCache
+
+def loader(calls):
+    def load(user_id):
+        calls.append(user_id)
+        return [(f"{user_id}-p1", "help me now", "alarm")]
+    return load
+
+def test_cached_sets_are_reused():
+    calls = []
+    cache = PhraseCache()
+    first = cache.active("u1", loader(calls))
+    assert cache.active("u1", loader(calls)) is first
+    assert calls == ["u1"]
+
+def test_least_recently_used_user_is_evicted():
+    calls = []
+    cache = PhraseCache(max_users=2)
+    cache.active("u1", loader(calls))
+    cache.active("u2", loader(calls))
+    cache.active("u1", loader(calls))
+    cache.active("u3", loader(calls))
+
+    assert list(cache.sets) == ["u1", "u3"]
+    cache.active("u2", loader(calls))
+    assert calls == ["u1", "u2", "u3", "u2"]
+    assert len(cache.sets) == 2
+
+def test_async_load_that_raced_an_invalidation_is_not_cached():
+    async def scenario():
+        cache = PhraseCache(max_users=2)
+
+        async def load(user_id):
+            cache.invalidate(user_id)
+            return [(f"{user_id}-p1", "help me now", "alarm")]
+
+        phrases = await cache.load_active("u1", load)
+        return phrases, dict(cache.sets)
+
+    phrases, cached = asyncio.run(scenario())
+    assert phrases.get("u1-p1") is not None
+    assert cached == {}
+
+def test_async_loads_are_bounded_too():
+    async def scenario():
+        cache = PhraseCache(max_users=2)
+
+        async def load(user_id):
+            return []
+
+        for user_id in ("u1", "u2", "u3"):
+            await cache.load_active(user_id, load)
+        return list(cache.sets)
+
+    assert asyncio.run(scenario()) == ["u2", "u3"]
@@ -0,0 +1,118 @@
+import pytest
+
+from app.services.phrase_matcher import CompiledPhrase, PhraseSet, TranscriptStream, normalize
+
+def phrase_set(*phrases):
+    return PhraseSet(CompiledPhrase(f"p{i}", text) for i, text in enumerate(phrases))
+
+def matched(phrases, transcript):
+    phrase, match_type, score = phrases.match(transcript)
+    return (phrase.source if phrase else None), match_type
+
+@pytest.mark.parametrize("text, words", [
+    ("HELP me, now!", ["help", "me", "now"]),
+    ("Call 911.", ["call", "nine", "one", "one"]),
+    ("call 9-1-1", ["call", "nine", "one", "one"]),
+    ("meet at 7 or 42", ["meet", "at", "seven", "or", "forty", "two"]),
+    ("room 05", ["room", "zero", "five"]),
+    ("don't stop", ["dont", "stop"]),
+    ("café ÉCLAIR", ["cafe", "eclair"]),
+    ("  ", []),
+])
+def test_normalize(text, words):
+    assert normalize(text) == words
+
+def test_exact_match_ignores_case_punctuation_and_surrounding_words():
+    assert CompiledPhrase("p", "help me now").match("ok so HELP me, now!") == ("exact", 1.0)
+
+def test_exact_match_needs_whole_words():
+    assert CompiledPhrase("p", "red").match("she bored us")[0] is None
+
+@pytest.mark.parametrize("transcript", ["helpme now", "help me know", "halp me now"])
+def test_one_edit_is_a_fuzzy_match(transcript):
+    match_type, score = CompiledPhrase("p", "help me now").match(transcript)
+    assert match_type == "fuzzy"
+    assert score == pytest.approx(1 - 1 / len(" help me now "))
+
+def test_fuzzy_tolerance_grows_with_the_phrase():
+    assert CompiledPhrase("p", "help me now").match("halp mi now")[0] != "fuzzy"
+    assert CompiledPhrase("p", "pineapple express").match("pinapple expres")[0] == "fuzzy"
+
+def test_phonetic_match_is_scored_by_spelling():
+    match_type, score = CompiledPhrase("p", "call the police").match("call the poleese")
+    assert match_type == "phonetic"
+    assert score == pytest.approx(1 - 3 / len(" call the police "))
+
+@pytest.mark.parametrize("phrase, transcript", [
+    ("red", "rat"),
+    ("red", "road"),
+    ("red", "ride"),
+    ("red", "reed"),
+    ("help me now", "help my gnome"),
+    ("help me now", "hope me now"),
+    ("help me now", "help me"),
+    ("help me now", "now me help"),
+])
+def test_sounding_alike_is_not_enough(phrase, transcript):
+    assert CompiledPhrase("p", phrase).match(transcript) == (None, 0.0)
+    assert phrase_set(phrase).match(transcript) == (None, None, 0.0)
+    assert TranscriptStream(phrase_set(phrase).automaton).feed("u", 0, transcript) is None
+
+def test_blank_phrase_never_matches():
+    assert CompiledPhrase("p", "!!!").match("anything at all") == (None, 0.0)
+    assert len(phrase_set("!!!", "help me now")) == 1
+
+def test_set_prefers_exact_then_fuzzy_then_phonetic():
+    phrases = phrase_set("call the police", "help me now", "red umbrella")
+    assert matched(phrases, "call the poleese help me now") == ("help me now", "exact")
+    assert matched(phrases, "call the poleese helpme now") == ("help me now", "fuzzy")
+    assert matched(phrases, "call the poleese") == ("call the police", "phonetic")
+    assert matched(phrases, "nothing to see here") == (None, None)
+
+def test_set_agrees_with_matching_each_phrase():
+    texts = ["help me now", "red umbrella", "call 911", "pineapple express", "i need my mom"]
+    transcripts = [
+        "please HELP me now", "redumbrella", "call nine one one", "pine apple express",
+        "i need my mum", "call the poleese", "road umbrella", "help my gnome", "",
+    ]
+    # Separate searches for a couple of phrases, one packed search for more
+    for phrases in (phrase_set(*texts[:2]), phrase_set(*texts)):
+        for transcript in transcripts:
+            phrase, _, score = phrases.match(transcript)
+            best_type, best_score = max((p.match(transcript) for p in phrases.phrases), key=lambda m: m[1])
+            if best_type is None:
+                assert phrase is None
+            else:
+                assert score == pytest.approx(best_score)
+
+def test_stream_matches_across_deltas():
+    stream = TranscriptStream(phrase_set("help me now").automaton)
+    assert stream.feed("u1", 0, "please help") is None
+    assert stream.feed("u1", 2, "me") is None
+    assert stream.feed("u1", 3, "now").source == "help me now"
+
+def test_stream_offset_replaces_the_revised_tail():
+    stream = TranscriptStream(phrase_set("help me now").automaton)
+    assert stream.feed("u1", 0, "help me go") is None
+    # The recognizer revises its last word
+    assert stream.feed("u1", 2, "now").source == "help me now"
+    assert stream.feed("u1", 1, "my gnome") is None
+
+def test_stream_new_utterance_starts_from_scratch():
+    stream = TranscriptStream(phrase_set("help me now").automaton)
+    assert stream.feed("u1", 0, "help me") is None
+    assert stream.feed("u2", 0, "now") is None
+    assert stream.feed("u1", 2, "now") is not None
+
+def test_final_result_forgets_the_utterance():
+    stream = TranscriptStream(phrase_set("help me now").automaton)
+    stream.feed("u1", 0, "help me", final=True)
+    assert "u1" not in stream.utterances
+    assert stream.feed("u1", 2, "now") is None
+
+def test_stream_keeps_only_recent_utterances():
+    stream = TranscriptStream(phrase_set("help me now").automaton)
+    for i in range(TranscriptStream.max_utterances + 1):
+        stream.feed(f"u{i}", 0, "help")
+    assert "u0" not in stream.utterances
+    assert len(stream.utterances) == TranscriptStream.max_utterances
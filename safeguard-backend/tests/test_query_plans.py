@@ -0,0 +1,24 @@
+import pytest
+
+from app.core.migrations import upgrade
+from app.main import Base, engine
+from app.migrations import MIGRATIONS
+from benchmarks.check_query_plans import explain, hot_queries
+
+QUERIES = hot_queries()
+
+def assert_no_scans(connection, statement):
+    plan = explain(connection, statement)
+    assert not [step for step in plan if step.startswith("SCAN")], plan
+
+@pytest.mark.parametrize("name, statement", QUERIES, ids=[name for name, _ in QUERIES])
+def test_hot_query_uses_an_index(name, statement):
+    with engine.connect() as connection:
+        assert_no_scans(connection, statement)
+
+@pytest.mark.parametrize("name, statement", QUERIES, ids=[name for name, _ in QUERIES])
+def test_hot_query_uses_an_index_after_upgrade(baseline_engine, name, statement):
+    # An upgraded database must end up with the same indexes as a fresh one
+    upgrade(baseline_engine, Base.metadata, MIGRATIONS)
+    with baseline_engine.connect() as connection:
+        assert_no_scans(connection, statement)
@@ -0,0 +1,65 @@
+import asyncio
+
+from app.core.rate_limit import LoadShedder, RateLimiter, RateLimitMiddleware, RoutePolicy
+
+TOKENS = {"token-a": "user-a", "token-a-reissued": "user-a", "token-b": "user-b"}
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+def middleware():
+    return RateLimitMiddleware(
+        ok_app,
+        limiter=RateLimiter(),
+        shedder=LoadShedder(),
+        policies={},
+        default_policy=RoutePolicy(user_rate=0.001, user_burst=1),
+        verify_token=TOKENS.get
+    )
+
+def request(app, authorization=None, client="10.0.0.1"):
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/thing", "headers": headers, "client": (client, 1234)}
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, None, send))
+    return sent[0]["status"]
+
+def test_tokens_of_one_user_share_a_bucket():
+    app = middleware()
+    assert request(app, "Bearer token-a") == 200
+    assert request(app, "Bearer token-a-reissued", client="10.0.0.2") == 429
+    assert request(app, "Bearer token-b") == 200
+
+def test_invalid_or_missing_tokens_fall_back_to_the_client_address():
+    app = middleware()
+    assert request(app, "Bearer forged-1") == 200
+    assert request(app, "Bearer forged-2") == 429
+    assert request(app) == 429
+    assert request(app, "Basic token-a") == 429
+    assert request(app, client="10.0.0.2") == 200
+
+def test_a_user_is_not_limited_by_their_address():
+    app = middleware()
+    assert request(app) == 200
+    assert request(app, "Bearer token-a") == 200
+
+def test_a_flooding_user_does_not_use_up_the_route():
+    limiter = RateLimiter()
+    policy = RoutePolicy(user_rate=0.001, user_burst=2, route_rate=0.001, route_burst=5)
+    flood = [limiter.check("/api/v1/thing", "user-a", policy, now=0.0) for _ in range(100)]
+
+    assert flood[:2] == [0.0, 0.0]
+    assert all(flood[2:])
+    assert limiter.check("/api/v1/thing", "user-b", policy, now=0.0) == 0.0
+
+def test_requests_the_route_rejects_do_not_count_against_the_user():
+    limiter = RateLimiter()
+    policy = RoutePolicy(user_rate=0.001, user_burst=2, route_rate=0.001, route_burst=1)
+    assert limiter.check("/api/v1/thing", "user-a", policy, now=0.0) == 0.0
+    assert limiter.check("/api/v1/thing", "user-b", policy, now=0.0) > 0
+    assert limiter.user_buckets[("/api/v1/thing", "user-b")].tokens == 2
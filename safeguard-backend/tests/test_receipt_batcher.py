@@ -0,0 +1,139 @@
+import asyncio
+
+from app.services.receipt_batcher import DeliveryReceiptBatcher
+
+class Recorder:
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, batch):
+        self.batches.append(batch)
+
+def test_receipts_for_one_alert_keep_the_furthest_status():
+    async def scenario():
+        writes = Recorder()
+        batcher = DeliveryReceiptBatcher(writes, max_delay=0.01)
+        batcher.add("a1", "sent")
+        batcher.add("a1", "delivered")
+        batcher.add("a1", "sent")
+        batcher.add("a2", "failed")
+        await asyncio.sleep(0.05)
+        return writes.batches
+
+    batches = asyncio.run(scenario())
+    assert len(batches) == 1
+    assert sorted((row["alert_id"], row["new_status"]) for row in batches[0]) == [
+        ("a1", "delivered"), ("a2", "failed")
+    ]
+
+def test_acks_are_kept_apart_from_provider_receipts():
+    async def scenario():
+        writes = Recorder()
+        batcher = DeliveryReceiptBatcher(writes, max_delay=0.01)
+        batcher.add("a1", "sent")
+        batcher.add("a1", "delivered", recipient_id="u1")
+        await asyncio.sleep(0.05)
+        return writes.batches
+
+    batches = asyncio.run(scenario())
+    assert sorted((row["acked_by"] or "", row["new_status"]) for row in batches[0]) == [
+        ("", "sent"), ("u1", "delivered")
+    ]
+
+def test_full_batch_flushes_without_waiting():
+    async def scenario():
+        writes = Recorder()
+        batcher = DeliveryReceiptBatcher(writes, max_batch=3, max_delay=60)
+        for i in range(3):
+            batcher.add(f"a{i}", "delivered")
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return writes.batches
+
+    batches = asyncio.run(scenario())
+    assert [len(batch) for batch in batches] == [3]
+
+def test_receipts_added_during_a_flush_are_written_afterwards():
+    async def scenario():
+        release = asyncio.Event()
+        batches = []
+
+        async def slow_write(batch):
+            batches.append(batch)
+            await release.wait()
+
+        batcher = DeliveryReceiptBatcher(slow_write, max_delay=0.01)
+        batcher.add("a1", "delivered")
+        await asyncio.sleep(0.03)
+        # The first write is still running when this receipt's timer fires
+        batcher.add("a2", "delivered")
+        await asyncio.sleep(0.03)
+        assert [[row["alert_id"] for row in batch] for batch in batches] == [["a1"]]
+        release.set()
+        await asyncio.sleep(0.03)
+        return batches, len(batcher)
+
+    batches, pending = asyncio.run(scenario())
+    assert [[row["alert_id"] for row in batch] for batch in batches] == [["a1"], ["a2"]]
+    assert pending == 0
+
+def flaky(writes, failures):
+    calls = 0
+
+    async def write(batch):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        if calls <= failures:
+            raise RuntimeError("database is locked")
+        await writes(batch)
+
+    return write
+
+def test_failed_write_is_retried_with_later_receipts():
+    async def scenario():
+        writes = Recorder()
+        batcher = DeliveryReceiptBatcher(flaky(writes, 1), max_delay=0.01)
+        batcher.add("a1", "sent")
+        await asyncio.sleep(0.015)
+        batcher.add("a2", "sent")
+        await asyncio.sleep(0.1)
+        return writes.batches, batcher.failures
+
+    batches, failures = asyncio.run(scenario())
+    assert [sorted(row["alert_id"] for row in batch) for batch in batches] == [["a1", "a2"]]
+    assert failures == 0
+
+def test_retried_receipt_does_not_overwrite_a_newer_one():
+    async def scenario():
+        writes = Recorder()
+        batcher = DeliveryReceiptBatcher(flaky(writes, 1), max_delay=0.01)
+        batcher.add("a1", "sent")
+        await asyncio.sleep(0.015)
+        # Arrives while the failing write of "sent" is in flight
+        batcher.add("a1", "delivered")
+        await asyncio.sleep(0.1)
+        return writes.batches
+
+    batches = asyncio.run(scenario())
+    assert [[(row["alert_id"], row["new_status"]) for row in batch] for batch in batches] == [[("a1", "delivered")]]
+
+def test_retries_back_off_while_writes_keep_failing():
+    async def scenario():
+        attempts = []
+
+        async def failing(batch):
+            attempts.append(asyncio.get_running_loop().time())
+            raise RuntimeError("database is locked")
+
+        batcher = DeliveryReceiptBatcher(failing, max_delay=0.01, max_retry_delay=0.08)
+        batcher.add("a1", "sent")
+        await asyncio.sleep(0.3)
+        return attempts, len(batcher)
+
+    attempts, pending = asyncio.run(scenario())
+    gaps = [later - earlier for earlier, later in zip(attempts, attempts[1:])]
+    # 0.02, 0.04, then capped at 0.08
+    assert len(attempts) >= 4
+    assert gaps[0] < gaps[1] < gaps[2]
+    assert pending == 1
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from app.services.recording_upload import ChunkedUploadStore, UploadClosed, UploadOffsetMismatch, UploadTooLarge
+
+async def body(*chunks, gate: asyncio.Event = None):
+    for chunk in chunks:
+        if gate is not None:
+            await gate.wait()
+        yield chunk
+
+@pytest.fixture
+def store(tmp_path):
+    return ChunkedUploadStore(str(tmp_path), max_size=64, max_chunk_size=16)
+
+def test_chunks_resume_at_the_stored_offset(store):
+    async def scenario():
+        store.create("s1", "u1")
+        first = await store.append("s1", "u1", 0, body(b"abc", b"def"))
+        with pytest.raises(UploadOffsetMismatch) as mismatch:
+            await store.append("s1", "u1", 0, body(b"xyz"))
+        second = await store.append("s1", "u1", first, body(b"ghi"))
+        return first, mismatch.value.expected, second
+
+    assert asyncio.run(scenario()) == (6, 6, 9)
+    assert store.offset("s1", "u1") == 9
+
+def test_oversized_chunk_is_dropped(store):
+    async def scenario():
+        store.create("s1", "u1")
+        await store.append("s1", "u1", 0, body(b"abc"))
+        with pytest.raises(UploadTooLarge):
+            await store.append("s1", "u1", 3, body(b"x" * 10, b"y" * 10))
+
+    asyncio.run(scenario())
+    assert store.offset("s1", "u1") == 3
+
+def test_locks_are_only_kept_while_in_use(store):
+    async def scenario():
+        store.create("s1", "u1")
+        gate = asyncio.Event()
+        writing = asyncio.create_task(store.append("s1", "u1", 0, body(b"abc", gate=gate)))
+        await asyncio.sleep(0)
+        during = len(store._locks)
+        gate.set()
+        await writing
+        return during, len(store._locks)
+
+    assert asyncio.run(scenario()) == (1, 0)
+
+def test_finalize_waits_for_a_chunk_in_flight(store, tmp_path):
+    async def scenario():
+        store.create("s1", "u1")
+        gate = asyncio.Event()
+        writing = asyncio.create_task(store.append("s1", "u1", 0, body(b"abc", b"def", gate=gate)))
+        await asyncio.sleep(0)
+
+        async def complete():
+            async with store.lock("u1"):
+                return store.offset("s1", "u1"), store.finalize("s1", "u1", ".webm")
+
+        completing = asyncio.create_task(complete())
+        await asyncio.sleep(0)
+        gate.set()
+        await writing
+        return await completing
+
+    size, path = asyncio.run(scenario())
+    assert size == 6
+    with open(path, "rb") as f:
+        assert f.read() == b"abcdef"
+    assert len(store._locks) == 0
+
+def test_chunk_after_finalize_is_refused(store):
+    async def scenario():
+        store.create("s1", "u1")
+        await store.append("s1", "u1", 0, body(b"abc"))
+        async with store.lock("u1"):
+            store.finalize("s1", "u1", ".webm")
+        await store.append("s1", "u1", 0, body(b"abc"))
+
+    with pytest.raises(UploadClosed):
+        asyncio.run(scenario())
+    assert store.offset("s1", "u1") == 0
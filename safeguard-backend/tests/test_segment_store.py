@@ -0,0 +1,151 @@
+import asyncio
+import os
+import struct
+
+import pytest
+
+from app.services.segment_store import INDEX_RECORD, SEQ_LIMIT, SegmentStore, SegmentTooLarge
+
+@pytest.fixture
+def store(tmp_path):
+    store = SegmentStore(str(tmp_path), max_segment_size=1024, max_session_size=4096)
+    yield store
+    asyncio.run(store.close_all())
+
+def read_data(store, session_id):
+    with open(store.data_path(session_id), "rb") as f:
+        return f.read()
+
+def seqs(store, session_id):
+    return [segment["seq"] for segment in store.index(session_id)["segments"]]
+
+def test_segments_are_appended_and_indexed(store):
+    async def scenario():
+        return await store.append("s1", 0, b"abc", "audio/webm"), await store.append("s1", 1, b"defg")
+
+    first, second = asyncio.run(scenario())
+    assert (first["offset"], first["length"]) == (0, 3)
+    assert (second["offset"], second["length"]) == (3, 4)
+    assert read_data(store, "s1") == b"abcdefg"
+    index = store.index("s1")
+    assert index["size"] == 7
+    assert index["mime_type"] == "audio/webm"
+    assert seqs(store, "s1") == [0, 1]
+
+def test_retransmitted_segment_is_not_stored_twice(store):
+    async def scenario():
+        await store.append("s1", 0, b"abc")
+        return await store.append("s1", 0, b"abc")
+
+    assert asyncio.run(scenario()) is None
+    assert read_data(store, "s1") == b"abc"
+
+def test_late_segment_is_stored_not_dropped(store):
+    async def scenario():
+        await store.append("s1", 0, b"aa")
+        await store.append("s1", 2, b"cc")
+        late = await store.append("s1", 1, b"bb")
+        retransmit = await store.append("s1", 1, b"bb")
+        return late, retransmit
+
+    late, retransmit = asyncio.run(scenario())
+    assert (late["seq"], late["offset"]) == (1, 4)
+    assert retransmit is None
+    assert read_data(store, "s1") == b"aaccbb"
+    assert seqs(store, "s1") == [0, 2, 1]
+
+def test_late_segment_is_recognised_after_reopening(store):
+    async def scenario():
+        await store.append("s1", 0, b"aa")
+        await store.append("s1", 2, b"cc")
+        await store.close("s1")
+        late = await store.append("s1", 1, b"bb")
+        stored = await store.append("s1", 2, b"cc")
+        return late, stored
+
+    late, stored = asyncio.run(scenario())
+    assert late is not None
+    assert stored is None
+    assert seqs(store, "s1") == [0, 2, 1]
+
+def test_concurrent_appends_do_not_overlap(store):
+    async def scenario():
+        await asyncio.gather(*(store.append("s1", seq, bytes([seq]) * 8) for seq in range(20)))
+        await asyncio.gather(*(store.append("s1", seq, bytes([seq]) * 8) for seq in range(20)))
+
+    asyncio.run(scenario())
+    data = read_data(store, "s1")
+    assert len(data) == 160
+    for segment in store.index("s1")["segments"]:
+        assert data[segment["offset"]:segment["offset"] + segment["length"]] == bytes([segment["seq"]]) * 8
+    assert sorted(seqs(store, "s1")) == list(range(20))
+
+def test_size_limits(store):
+    async def scenario():
+        with pytest.raises(SegmentTooLarge):
+            await store.append("s1", 0, b"x" * 1025)
+        for seq in range(4):
+            await store.append("s1", seq, b"x" * 1024)
+        with pytest.raises(SegmentTooLarge):
+            await store.append("s1", 4, b"x")
+
+    asyncio.run(scenario())
+    assert store.size("s1") == 4096
+
+def test_failed_write_is_not_indexed(store, monkeypatch):
+    async def scenario():
+        await store.append("s1", 0, b"abc")
+        real_write = os.write
+
+        def disk_full(fd, data):
+            if fd == store.open["s1"].index_fd:
+                raise OSError(28, "No space left on device")
+            return real_write(fd, data)
+
+        monkeypatch.setattr(os, "write", disk_full)
+        with pytest.raises(OSError):
+            await store.append("s1", 1, b"def")
+        monkeypatch.undo()
+        return await store.append("s1", 1, b"def")
+
+    retried = asyncio.run(scenario())
+    assert retried["offset"] == 3
+    assert read_data(store, "s1") == b"abcdef"
+    assert seqs(store, "s1") == [0, 1]
+
+def test_reopen_drops_a_torn_tail(store):
+    async def scenario():
+        await store.append("s1", 0, b"abc")
+        await store.close("s1")
+        # A crash mid-append: data written, index record cut short
+        directory = store.directory("s1")
+        with open(os.path.join(directory, "audio.bin"), "ab") as f:
+            f.write(b"def")
+        with open(os.path.join(directory, "audio.idx"), "ab") as f:
+            f.write(INDEX_RECORD.pack(1, 3, 3, 0.0)[:5])
+        return await store.append("s1", 1, b"XYZ")
+
+    assert asyncio.run(scenario())["offset"] == 3
+    assert read_data(store, "s1") == b"abcXYZ"
+    assert seqs(store, "s1") == [0, 1]
+
+def test_finished_session_is_read_without_reopening(store):
+    async def scenario():
+        await store.append("s1", 0, b"abc")
+        await store.close("s1")
+
+    asyncio.run(scenario())
+    assert store.index("s1")["size"] == 3
+    assert "s1" not in store.open
+    assert store.index("missing") is None
+
+def test_unindexable_seq_leaves_nothing_behind(store):
+    async def scenario():
+        await store.append("s1", 0, b"abc")
+        with pytest.raises(struct.error):
+            await store.append("s1", SEQ_LIMIT, b"def")
+        return await store.append("s1", 1, b"ghi")
+
+    assert asyncio.run(scenario())["offset"] == 3
+    assert read_data(store, "s1") == b"abcghi"
+    assert seqs(store, "s1") == [0, 1]
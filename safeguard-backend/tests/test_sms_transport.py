@@ -0,0 +1,53 @@
+import asyncio
+
+import httpx
+
+from app.services.sms_transport import SMSTransport, TwilioProvider
+
+def transport(*outcomes):
+    """SMSTransport whose provider calls play `outcomes` in turn: an exception or a status code"""
+    calls = []
+
+    def handler(request):
+        outcome = outcomes[len(calls)]
+        calls.append(request)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, json={"sid": "SM1"})
+
+    sms = SMSTransport(
+        TwilioProvider("AC1", "secret", "+15550000000"),
+        base_delay=0,
+        transport=httpx.MockTransport(handler)
+    )
+    return sms, calls
+
+def send(sms):
+    async def scenario():
+        try:
+            return await sms.send("+15551234567", "help")
+        finally:
+            await sms.aclose()
+    return asyncio.run(scenario())
+
+def test_connect_errors_are_retried():
+    sms, calls = transport(httpx.ConnectError("refused"), httpx.ConnectTimeout("slow"), 201)
+    result = send(sms)
+    assert result["success"] is True
+    assert result["attempts"] == 3
+    assert len(calls) == 3
+
+def test_read_timeout_is_not_resent():
+    # The provider may already have accepted the message
+    sms, calls = transport(httpx.ReadTimeout("no response"), 201)
+    result = send(sms)
+    assert result["success"] is False
+    assert len(calls) == 1
+
+def test_throttling_is_retried_and_client_errors_are_not():
+    sms, calls = transport(429, 201)
+    assert send(sms)["attempts"] == 2
+
+    sms, calls = transport(400, 201)
+    assert send(sms)["success"] is False
+    assert len(calls) == 1
@@ -0,0 +1,133 @@
+import asyncio
+import gc
+
+from app.utils.timer_wheel import TimerWheel
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+def make_wheel(**kwargs):
+    clock = FakeClock()
+    return TimerWheel(clock=clock, **kwargs), clock
+
+def test_timer_fires_once_its_tick_is_reached():
+    wheel, clock = make_wheel()
+    fired = []
+    wheel.schedule(3, fired.append, "a")
+
+    assert wheel.run_due(2.5) == 0
+    assert wheel.run_due(3) == 1
+    assert fired == ["a"]
+    assert len(wheel) == 0
+
+def test_partial_delay_rounds_up_to_the_next_tick():
+    wheel, clock = make_wheel()
+    fired = []
+    wheel.schedule(0.2, fired.append, "a")
+
+    wheel.run_due(0.9)
+    assert fired == []
+    wheel.run_due(1)
+    assert fired == ["a"]
+
+def test_cancelled_timer_never_fires():
+    wheel, clock = make_wheel()
+    fired = []
+    timer = wheel.schedule(5, fired.append, "a")
+
+    assert wheel.cancel(timer)
+    assert not timer.active
+    assert not wheel.cancel(timer)
+    wheel.run_due(10)
+    assert fired == []
+    assert len(wheel) == 0
+
+def test_timers_cascade_from_higher_levels():
+    wheel, clock = make_wheel(slot_bits=2, levels=3)
+    fired = []
+    for delay in (1, 3, 4, 9, 17, 63):
+        wheel.schedule(delay, fired.append, delay)
+
+    for now in range(1, 64):
+        wheel.run_due(now)
+        assert fired == [d for d in (1, 3, 4, 9, 17, 63) if d <= now]
+
+def test_overflow_timers_wait_until_their_turn():
+    wheel, clock = make_wheel(slot_bits=2, levels=2)
+    fired = []
+    # The wheel spans 16 ticks; these are parked in overflow
+    wheel.schedule(40, fired.append, "far")
+    wheel.schedule(100, fired.append, "farther")
+    assert len(wheel.overflow) == 2
+
+    wheel.run_due(39)
+    assert fired == []
+    wheel.run_due(40)
+    assert fired == ["far"]
+    wheel.run_due(99)
+    assert fired == ["far"]
+    wheel.run_due(100)
+    assert fired == ["far", "farther"]
+
+def test_cancel_from_overflow():
+    wheel, clock = make_wheel(slot_bits=2, levels=2)
+    fired = []
+    timer = wheel.schedule(40, fired.append, "far")
+
+    assert wheel.cancel(timer)
+    assert not wheel.overflow
+    wheel.run_due(50)
+    assert fired == []
+
+def test_reschedule_moves_the_deadline():
+    wheel, clock = make_wheel()
+    fired = []
+    timer = wheel.schedule(2, fired.append, "a")
+
+    clock.now = 1
+    wheel.reschedule(timer, 5)
+    wheel.run_due(5)
+    assert fired == []
+    wheel.run_due(6)
+    assert fired == ["a"]
+    assert len(wheel) == 0
+
+def test_callback_errors_do_not_stop_other_timers():
+    wheel, clock = make_wheel()
+    fired = []
+
+    def broken():
+        raise RuntimeError("boom")
+
+    wheel.schedule(1, broken)
+    wheel.schedule(1, fired.append, "a")
+    assert wheel.run_due(1) == 2
+    assert fired == ["a"]
+
+def test_coroutine_callbacks_are_held_until_they_finish():
+    async def scenario():
+        wheel, clock = make_wheel()
+        release = asyncio.Event()
+        fired = []
+
+        async def callback(name):
+            await release.wait()
+            fired.append(name)
+
+        wheel.schedule(1, callback, "a")
+        wheel.run_due(1)
+        held = len(wheel._callbacks)
+        gc.collect()
+        release.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return held, fired, len(wheel._callbacks)
+
+    held, fired, remaining = asyncio.run(scenario())
+    assert held == 1
+    assert fired == ["a"]
+    assert remaining == 0
@@ -12,6 +12,8 @@ const VoiceControl = () => {
   const [isEditing, setIsEditing] = useState(!hasSafetyPhrase);
   const [newPhrase, setNewPhrase] = useState(safetyPhrase);
   const [phrasePassword, setPhrasePassword] = useState('');
+  // The phrase this card shows and edits; the oldest when several are active
+  const [phraseId, setPhraseId] = useState(null);
   const [isUpdating, setIsUpdating] = useState(false);
   const [isLoading, setIsLoading] = useState(true);
 
@@ -40,6 +42,7 @@ const VoiceControl = () => {
       console.log('Voice status response:', response.data);
       
       if (response.data.has_phrase) {
+        setPhraseId(response.data.phrases?.[0]?.id || null);
         setSafetyPhrase(response.data.phrase);
         setNewPhrase(response.data.phrase);
         setIsEditing(false);
@@ -93,6 +96,7 @@ const VoiceControl = () => {
       console.log('Train phrase response:', response.data);
 
       if (response.data.success) {
+        setPhraseId(response.data.phrase_id);
         setSafetyPhrase(newPhrase.trim());
         setIsEditing(false);
         setPhrasePassword('');
@@ -146,6 +150,7 @@ const VoiceControl = () => {
 
       // Real backend call
       const response = await voiceAPI.updatePhrase({
+        phrase_id: phraseId,
         phrase: newPhrase.trim(),
         old_password: phrasePassword,
         new_password: phrasePassword, // Using same password for simplicity
@@ -1,7 +1,8 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { useEmergencyStore, useLocationStore, useAuthStore, useAppStore } from '../store/useStore';
 import { emergencyAPI } from '../services/api';
 import socketService from '../services/socketService';
+import RecordingUploader from '../services/recordingUploader';
 import toast from 'react-hot-toast';
 
 export const useEmergency = () => {
@@ -21,13 +22,16 @@ export const useEmergency = () => {
   const { addNotification } = useAppStore();
 
   const [isTriggering, setIsTriggering] = useState(false);
+  // One key per trigger intent: retries after a network error reuse it, so the
+  // server can collapse them even if the first request got through
+  const idempotencyKeyRef = useRef(null);
 
   // Listen for voice emergency triggers
   useEffect(() => {
     const handleVoiceEmergency = (event) => {
-      const { transcript, confidence } = event.detail;
-      console.log('Voice emergency triggered:', transcript, confidence);
-      triggerEmergency('voice', { transcript, confidence });
+      const { transcript, confidence, action } = event.detail;
+      console.log('Voice emergency triggered:', transcript, confidence, action);
+      triggerEmergency('voice', { transcript, confidence, action });
     };
 
     window.addEventListener('voiceEmergencyTrigger', handleVoiceEmergency);
@@ -51,6 +55,11 @@ export const useEmergency = () => {
         toast.error(`🚨 Emergency Alert: ${data.user.name} needs help!`, {
           duration: 10000,
         });
+
+        // Follow the victim live: the server answers with the buffered trail
+        if (data.session_id) {
+          socketService.joinEmergency(data.session_id);
+        }
       }
     };
 
@@ -68,6 +77,18 @@ export const useEmergency = () => {
     };
   }, [user, addNotification]);
 
+  // Stream the victim's position to responders while the session is active
+  useEffect(() => {
+    if (!isEmergencyActive || !currentLocation) return;
+    if (localStorage.getItem('token') === 'demo-token-for-testing') return;
+
+    socketService.sendEmergencyLocation(
+      currentLocation.latitude,
+      currentLocation.longitude,
+      currentLocation.accuracy
+    );
+  }, [isEmergencyActive, currentLocation]);
+
   const triggerEmergency = useCallback(async (triggerType = 'manual', additionalData = {}) => {
     if (isTriggering || isEmergencyActive) {
       toast.error('Emergency already active');
@@ -129,23 +150,33 @@ export const useEmergency = () => {
         return mockResponse;
       }
 
-      // Real backend call
-      const response = await emergencyAPI.trigger(emergencyData);
+      // Real backend call; the key lets the server collapse retries of this same trigger
+      if (!idempotencyKeyRef.current) {
+        idempotencyKeyRef.current = `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+      }
+      const response = await emergencyAPI.trigger(emergencyData, idempotencyKeyRef.current);
       console.log('Emergency API response:', response.data);
       
       if (response.data.success) {
+        idempotencyKeyRef.current = null;
         setEmergencyActive(true, {
           sessionId: response.data.session_id,
           triggerType,
           triggeredAt: new Date().toISOString(),
         });
 
-        setAlarmActive(true);
-        startRecording();
+        // A silent phrase alerts contacts without sounding anything on this device
+        const silent = additionalData.action === 'silent';
+        if (!silent) {
+          setAlarmActive(true);
+        }
+        startRecording(response.data.session_id);
 
-        toast.error('🚨 EMERGENCY ALERT ACTIVE!', {
-          duration: 5000,
-        });
+        if (!silent) {
+          toast.error('🚨 EMERGENCY ALERT ACTIVE!', {
+            duration: 5000,
+          });
+        }
 
         // Show success details
         toast.success(`Emergency contacts notified: ${response.data.contacts_notified}`, {
@@ -175,6 +206,10 @@ export const useEmergency = () => {
     } catch (error) {
       console.error('Emergency trigger error:', error);
       if (error.response) {
+        // A rejected request never ran; a 5xx may have, so its retry keeps the key
+        if (error.response.status < 500) {
+          idempotencyKeyRef.current = null;
+        }
         console.error('Error response:', error.response.data);
         toast.error(`Failed to trigger emergency: ${error.response.data.detail || error.message}`);
       } else {
@@ -224,7 +259,7 @@ export const useEmergency = () => {
     }
   }, [emergencySession, dismissEmergency]);
 
-  const startRecording = useCallback(() => {
+  const startRecording = useCallback((sessionId) => {
     setRecording(true);
     console.log('🎙️ Started emergency recording');
     
@@ -234,12 +269,35 @@ export const useEmergency = () => {
         .then(stream => {
           const mediaRecorder = new MediaRecorder(stream);
           const audioChunks = [];
+          // With a backend session the recording is uploaded as it is made
+          const uploader = sessionId ? new RecordingUploader(sessionId, mediaRecorder.mimeType) : null;
+          let segmentSeq = 0;
 
           mediaRecorder.ondataavailable = event => {
-            audioChunks.push(event.data);
+            if (!event.data || event.data.size === 0) return;
+            if (uploader) {
+              const seq = segmentSeq++;
+              event.data.arrayBuffer().then(buffer => {
+                socketService.sendAudioSegment(sessionId, seq, buffer, mediaRecorder.mimeType);
+              });
+              uploader.add(event.data);
+            } else {
+              audioChunks.push(event.data);
+            }
           };
 
           mediaRecorder.onstop = () => {
+            if (uploader) {
+              stream.getTracks().forEach(track => track.stop());
+              uploader.finish()
+                .then(() => toast.success('Emergency recording uploaded'))
+                .catch(error => {
+                  console.error('Failed to finish recording upload:', error);
+                  toast.error('Emergency recording upload incomplete');
+                });
+              return;
+            }
+
             const audioBlob = new Blob(audioChunks, { type: 'audio/wav' });
             const audioUrl = URL.createObjectURL(audioBlob);
             
@@ -257,7 +315,8 @@ export const useEmergency = () => {
             toast.success('Emergency recording saved');
           };
 
-          mediaRecorder.start();
+          // Emit a chunk every 5 seconds so evidence leaves the device while recording
+          mediaRecorder.start(5000);
           
           // Stop recording after 15 minutes
           setTimeout(() => {
@@ -15,6 +15,8 @@ export const useVoiceRecognition = () => {
   } = useVoiceStore();
 
   const recognitionRef = useRef(null);
+  // Words already streamed per result index of the current recognition run
+  const transcriptStreamRef = useRef({ run: 0, sent: {} });
   const [isInitialized, setIsInitialized] = useState(false);
   const [mediaRecorder, setMediaRecorder] = useState(null);
   const [audioChunks, setAudioChunks] = useState([]);
@@ -55,6 +57,7 @@ export const useVoiceRecognition = () => {
       // Setup event handlers
       recognitionRef.current.onstart = () => {
         console.log('🎤 Speech recognition started');
+        transcriptStreamRef.current = { run: Date.now(), sent: {} };
         setListening(true);
       };
 
@@ -76,6 +79,7 @@ export const useVoiceRecognition = () => {
     for (let i = event.resultIndex; i < event.results.length; i++) {
       const result = event.results[i];
       const transcript = result[0].transcript;
+      streamTranscriptDelta(i, result);
       
       if (result.isFinal) {
         finalTranscript += transcript;
@@ -114,6 +118,27 @@ export const useVoiceRecognition = () => {
     }
   }, [safetyPhrase, setLastTranscript]);
 
+  // Send only the words that changed since the last interim result for this index
+  const streamTranscriptDelta = (index, result) => {
+    const stream = transcriptStreamRef.current;
+    const words = result[0].transcript.trim().split(/\s+/).filter(Boolean);
+    const sent = stream.sent[index] || [];
+    let offset = 0;
+    while (offset < words.length && offset < sent.length && words[offset] === sent[offset]) {
+      offset++;
+    }
+    if (offset === words.length && offset === sent.length && !result.isFinal) return;
+
+    stream.sent[index] = words;
+    socketService.sendTranscriptDelta({
+      utterance: `${stream.run}-${index}`,
+      offset,
+      text: words.slice(offset).join(' '),
+      final: result.isFinal,
+      confidence: result[0].confidence || 0.8,
+    });
+  };
+
   const checkPhraseMatch = (transcript, phrase, confidence) => {
     const spokenLower = transcript.toLowerCase().trim();
     const phraseLower = phrase.toLowerCase().trim();
@@ -240,14 +265,14 @@ export const useVoiceRecognition = () => {
     }
   }, [isListening, setListening]);
 
-  const handleEmergencyTrigger = async (transcript, confidence) => {
+  const handleEmergencyTrigger = async (transcript, confidence, action) => {
     try {
       // Start audio recording for evidence
       await startEmergencyRecording();
       
       // Trigger emergency via custom event
       const event = new CustomEvent('voiceEmergencyTrigger', {
-        detail: { transcript, confidence }
+        detail: { transcript, confidence, action }
       });
       window.dispatchEvent(event);
       
@@ -368,6 +393,24 @@ export const useVoiceRecognition = () => {
     }
   }, [isListening, setListening, mediaRecorder]);
 
+  // The server matched the phrase in streamed interim results and already triggered
+  useEffect(() => {
+    const handleServerTrigger = (data) => {
+      if (data?.type !== 'voice' || !data.session_id) return;
+      console.log('🚨 Safety phrase detected by server:', data.phrase);
+      stopListening();
+      if (data.action !== 'silent') {
+        toast.error('🚨 Safety phrase detected! Emergency triggering...', {
+          duration: 3000,
+        });
+      }
+      handleEmergencyTrigger(data.phrase, data.confidence, data.action);
+    };
+
+    socketService.on('emergency_trigger_received', handleServerTrigger);
+    return () => socketService.off('emergency_trigger_received', handleServerTrigger);
+  }, [stopListening]);
+
   const toggleListening = useCallback(() => {
     if (isListening) {
       stopListening();
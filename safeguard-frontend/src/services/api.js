@@ -55,11 +55,34 @@ export const userAPI = {
 
 // Emergency API
 export const emergencyAPI = {
-  trigger: (data) => api.post('/api/v1/emergency/trigger', data),
+  trigger: (data, idempotencyKey) => api.post('/api/v1/emergency/trigger', data, {
+    headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
+  }),
   dismiss: (sessionId) => api.post('/api/v1/emergency/dismiss', { session_id: sessionId }),
   getStatus: () => api.get('/api/v1/emergency/status'),
 };
 
+// Emergency recording uploads (resumable, appended in chunks at an explicit offset)
+export const recordingAPI = {
+  createUpload: (sessionId, contentType) =>
+    api.post('/api/v1/emergency/recordings/uploads', { session_id: sessionId, content_type: contentType }),
+  getUpload: (uploadId) => api.get(`/api/v1/emergency/recordings/uploads/${uploadId}`),
+  appendChunk: (uploadId, offset, blob) =>
+    api.patch(`/api/v1/emergency/recordings/uploads/${uploadId}`, blob, {
+      headers: { 'Upload-Offset': String(offset), 'Content-Type': 'application/octet-stream' },
+    }),
+  complete: (uploadId) => api.post(`/api/v1/emergency/recordings/uploads/${uploadId}/complete`),
+};
+
+// Safe walk API
+export const safeWalkAPI = {
+  start: (checkInInterval, location) =>
+    api.post('/api/v1/safe-walk/start', { check_in_interval: checkInInterval, location }),
+  checkIn: (walkId, location) => api.post('/api/v1/safe-walk/check-in', { walk_id: walkId, location }),
+  end: (walkId) => api.post(`/api/v1/safe-walk/end?walk_id=${walkId}`),
+  getStatus: () => api.get('/api/v1/safe-walk/status'),
+};
+
 // Location API
 export const locationAPI = {
   update: (data) => api.post('/api/v1/location/update', data),
@@ -0,0 +1,77 @@
+import { recordingAPI } from './api';
+
+const MAX_ATTEMPTS = 6;
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Streams MediaRecorder output to the server while recording. Bytes are kept
+// only until the server confirms them; after a network failure the upload
+// resumes from the server's offset instead of starting over.
+class RecordingUploader {
+  constructor(sessionId, contentType) {
+    this.sessionId = sessionId;
+    this.contentType = contentType || 'audio/webm';
+    this.uploadId = null;
+    this.maxChunkSize = 1024 * 1024;
+    this.offset = 0; // bytes confirmed by the server
+    this.buffer = new Blob([]); // unconfirmed bytes, starting at this.offset
+    this.queue = Promise.resolve();
+  }
+
+  add(blob) {
+    this.buffer = new Blob([this.buffer, blob]);
+    this.queue = this.queue.then(() => this.flush()).catch((error) => {
+      console.error('Recording upload error:', error);
+    });
+    return this.queue;
+  }
+
+  async finish() {
+    await this.queue;
+    await this.flush();
+    if (!this.uploadId) return null;
+    const response = await recordingAPI.complete(this.uploadId);
+    return response.data;
+  }
+
+  async flush() {
+    if (!this.uploadId) {
+      const response = await recordingAPI.createUpload(this.sessionId, this.contentType);
+      this.uploadId = response.data.upload_id;
+      this.maxChunkSize = response.data.max_chunk_size || this.maxChunkSize;
+    }
+
+    let attempt = 0;
+    while (this.buffer.size > 0) {
+      const chunk = this.buffer.slice(0, this.maxChunkSize);
+      try {
+        const response = await recordingAPI.appendChunk(this.uploadId, this.offset, chunk);
+        this.confirm(response.data.offset);
+        attempt = 0;
+      } catch (error) {
+        const serverOffset = error.response?.headers?.['upload-offset'];
+        if (error.response?.status === 409 && serverOffset !== undefined) {
+          this.confirm(Number(serverOffset));
+          continue;
+        }
+        if (++attempt >= MAX_ATTEMPTS) throw error;
+        await sleep(Math.min(16000, 500 * 2 ** attempt));
+        try {
+          const status = await recordingAPI.getUpload(this.uploadId);
+          this.confirm(status.data.offset);
+        } catch (statusError) {
+          // Still offline; retry the same chunk after the next backoff
+        }
+      }
+    }
+  }
+
+  confirm(serverOffset) {
+    const advanced = serverOffset - this.offset;
+    if (advanced > 0) {
+      this.buffer = this.buffer.slice(advanced);
+      this.offset = serverOffset;
+    }
+  }
+}
+
+export default RecordingUploader;
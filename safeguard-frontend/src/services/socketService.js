@@ -45,6 +45,10 @@ class SocketService {
     // Emergency events
     this.socket.on('emergency_alert', (data) => {
       console.log('🚨 Emergency alert received:', data);
+      // Auto-ack so the server can record the alert as delivered
+      if (data?.alert_id) {
+        this.socket.emit('alert_ack', { alert_id: data.alert_id });
+      }
       this.emit('emergency_alert_received', data);
     });
 
@@ -53,6 +57,15 @@ class SocketService {
       this.emit('emergency_dismissed_received', data);
     });
 
+    // Live tracking of an active emergency
+    this.socket.on('emergency_trail', (data) => {
+      this.emit('emergency_trail_received', data);
+    });
+
+    this.socket.on('emergency_location_update', (data) => {
+      this.emit('emergency_location_received', data);
+    });
+
     this.socket.on('emergency_trigger', (data) => {
       console.log('🚨 Emergency trigger:', data);
       this.emit('emergency_trigger_received', data);
@@ -99,6 +112,34 @@ class SocketService {
     }
   }
 
+  // Victim's position during an active emergency (server throttles fan-out to 1 Hz)
+  sendEmergencyLocation(latitude, longitude, accuracy = null) {
+    if (this.socket && this.isConnected) {
+      this.socket.emit('emergency_location', { latitude, longitude, accuracy });
+    }
+  }
+
+  // Responder: join an emergency's room and receive its buffered trail
+  joinEmergency(sessionId) {
+    if (this.socket && this.isConnected) {
+      this.socket.emit('join_emergency', { session_id: sessionId });
+    }
+  }
+
+  // Victim: stream one recorder segment live; responders fetch it back by byte range
+  sendAudioSegment(sessionId, seq, data, mimeType) {
+    if (this.socket && this.isConnected) {
+      this.socket.emit('audio_segment', { session_id: sessionId, seq, data, mime_type: mimeType });
+    }
+  }
+
+  // Interim speech results as word deltas; the server matches them incrementally
+  sendTranscriptDelta(delta) {
+    if (this.socket && this.isConnected) {
+      this.socket.emit('transcript_delta', delta);
+    }
+  }
+
   detectVoicePhrase(transcript, confidence) {
     if (this.socket && this.isConnected) {
       this.socket.emit('voice_phrase_detected', {